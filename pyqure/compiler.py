@@ -0,0 +1,405 @@
+"""Ahead of time compilation of a container, to skip the discovering and the signatures parsing.
+
+At build time, the services of a container (its components, factories and injected functions)
+are compiled into a module: each one gets a specialized call, injecting its parameters
+with the keys they have been resolved to, without any reflection.
+At runtime, this module is loaded instead of discovering the package: it imports
+the application modules, whose decorators build the services with their compiled call.
+
+Usage:
+    python -m pyqure.compiler app app/compiled_dependencies.py
+
+    >>> load_compiled("app.compiled_dependencies")
+"""
+
+import argparse
+import importlib
+import sys
+from functools import update_wrapper
+from inspect import isclass, iscoroutinefunction, isfunction
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, NamedTuple
+
+from pyqure.container import DependencyContainer, Key, dc, resolution_keys
+from pyqure.discover import discover
+from pyqure.exceptions import InjectionError, MissingDependencies
+from pyqure.injectables import Injectable, Pooled, Scoped, is_async
+from pyqure.observers import observed_supply, observing
+from pyqure.plan import DeferredPlan, InjectionPlan
+from pyqure.utils.function import INJECTION_PLAN_ATTRIBUTE, NoDefault
+
+_HEADER = '''"""Dependencies compiled by `python -m pyqure.compiler`, do not edit.
+
+Load them with `pyqure.compiler.load_compiled` instead of discovering the package.
+"""
+
+from typing import Any, Callable
+
+from pyqure.compiler import CompiledPlan, CompiledService
+from pyqure.container import Key'''
+
+# name of a generated function, replaced once its source is known to be shared or not.
+_NAME = "_function"
+
+
+class CompiledService(NamedTuple):
+    """Compiled code of a service.
+
+    Attributes:
+        names: the names of the parameters to inject.
+        keys: the function importing the keys bound to the parameters,
+         None for the ones found by no key at build time.
+        call: the function creating the specialized call of the service, upon its plan.
+    """
+
+    names: tuple[str, ...]
+    keys: Callable[[], tuple[Key[Any] | None, ...]]
+    call: Callable[["CompiledPlan"], Callable[..., Any]]
+
+
+class CompiledPlan:
+    """Injectables bound to the parameters of a compiled service, by the keys found at build time.
+
+    Unlike `InjectionPlan`, the parameters keys are not searched anymore: the injectables are
+    looked up by their key only, and cached until the container changes.
+    The keys are imported on the first call, their types may be defined by modules still importing.
+    The injections are not notified to the observer, only the supplies.
+    """
+
+    __slots__ = ("_bindings", "_compiled", "_keys", "container", "names", "service")
+
+    def __init__(
+        self, service: Callable[..., Any], container: DependencyContainer, compiled: CompiledService
+    ) -> None:
+        self.service = service
+        self.container = container
+        self.names = compiled.names
+        self._compiled = compiled
+        self._keys: tuple[Key[Any] | None, ...] | None = None
+        self._bindings: tuple[int, tuple[Injectable[Any] | None, ...]] = (-1, ())
+
+    def bindings(self) -> tuple[Injectable[Any] | None, ...]:
+        """Injectables bound to each parameter, looked up again only when the container has changed.
+
+        Raises:
+            InjectionError: if an injectable must be awaited or checked out,
+             the container having changed since it has been compiled.
+        """
+        # the overrides are specific to the current context, so they are never cached.
+        if self.container.has_overrides:
+            return self._bind()
+
+        generation, bindings = self._bindings
+        current = self.container.generation
+        if generation != current:
+            bindings = self._bind()
+            self._bindings = (current, bindings)
+
+        return bindings
+
+    def supply(self, index: int, injectable: Injectable[Any] | None) -> Any:
+        """Supply the injectable bound to a parameter.
+
+        Raises:
+            MissingDependencies: if no injectable is bound to the parameter.
+        """
+        if injectable is None:
+            raise MissingDependencies(self.service, [self.names[index]])
+
+        observer = self.container.observer
+        if observer is not None:
+            observer = observing(observer)
+        return injectable.supply() if observer is None else observed_supply(injectable, observer)
+
+    def _bind(self) -> tuple[Injectable[Any] | None, ...]:
+        if self._keys is None:
+            self._keys = self._compiled.keys()
+
+        bindings = tuple(None if key is None else self.container.lookup(key) for key in self._keys)
+        for name, injectable in zip(self.names, bindings, strict=True):
+            if injectable is not None and not _compilable(injectable):
+                raise InjectionError(
+                    f"Cannot inject {name} in compiled {self.service}:"
+                    f" {injectable} must be awaited or checked out, compile the container again."
+                )
+        return bindings
+
+
+def compiled_call(
+    service: Callable[..., Any], container: DependencyContainer
+) -> Callable[..., Any] | None:
+    """Create the call of a service from its compiled code loaded inside the container, if any."""
+    name = _qualified_name(service)
+    compiled = container.compiled_service(name) if name is not None else None
+    if compiled is None:
+        return None
+
+    plan = CompiledPlan(service, container, compiled)
+    call = update_wrapper(compiled.call(plan), service)
+    setattr(call, INJECTION_PLAN_ATTRIBUTE, plan)
+    return call
+
+
+def load_compiled(module_name: str, container: DependencyContainer = dc) -> None:
+    """Import the application modules with the services compiled, instead of discovering them.
+
+    The services are built by their decorators with their compiled call:
+    the modules must not have been imported yet, otherwise their services keep their runtime plan.
+
+    Args:
+        module_name: the module generated by `compile_container`.
+        container: the container the services are registered into.
+    """
+    compiled = importlib.import_module(module_name)
+    container.install_compiled(compiled.SERVICES)
+    for name in compiled.MODULES:
+        importlib.import_module(name)
+
+
+def compile_container(container: DependencyContainer = dc, modules: Iterable[str] = ()) -> str:
+    """Generate the source of a module with the compiled services of the container.
+
+    The services are the suppliers of the registered injectables, and the functions injected
+    by the container which are defined by the modules, at their top level or inside their classes.
+
+    A service is compiled when each of its parameters is bound to a synchronous injectable
+    found by a key, neither pooled nor a collection, or to none.
+    The other services, as the coroutine functions, keep being injected by their runtime plan.
+    A key registered after the compilation is not taken into account until compiling again.
+
+    Args:
+        container: the container whose services are compiled.
+        modules: the modules to import when loading, in order, the ones of the services being added.
+
+    Returns:
+        The source of the module, to load with `load_compiled`.
+    """
+    modules = list(modules)
+    plans = {id(plan): plan for plan in _plans(container, modules)}
+    services: dict[str, str] = {}
+    # the services with the same keys or parameters share their functions, by their source.
+    functions: dict[str, str] = {}
+
+    for plan in plans.values():
+        name = _qualified_name(plan.service)
+        keys = _keys(plan) if name is not None else None
+        if name is None or keys is None:
+            continue
+
+        keys_function = _shared(functions, "_keys", _keys_function(keys))
+        call_function = _shared(functions, "_call", _call_function(plan, keys))
+        names = tuple(param.name for param in plan.params)
+        services[name] = f"CompiledService({names!r}, {keys_function}, {call_function})"
+        modules.append(plan.service.__module__)
+
+    entries = "".join(f"    {name!r}: {compiled},\n" for name, compiled in services.items())
+    blocks = [
+        _HEADER,
+        f"MODULES = {tuple(dict.fromkeys(modules))!r}",
+        *(source.replace(_NAME, name, 1) for source, name in functions.items()),
+        f"SERVICES = {{\n{entries}}}",
+    ]
+    return "\n\n\n".join(blocks) + "\n"
+
+
+def _shared(functions: dict[str, str], prefix: str, source: str) -> str:
+    """Name of the function of the source, the same for all the services generating it."""
+    name = functions.get(source)
+    if name is None:
+        name = functions[source] = f"{prefix}_{len(functions)}"
+    return name
+
+
+def _plans(container: DependencyContainer, modules: Iterable[str]) -> Iterator[InjectionPlan[Any]]:
+    """Plans of the registered suppliers and the injected functions of the modules."""
+    suppliers = [
+        getattr(injectable, "supplier", None) for injectable in container.registrations.values()
+    ]
+    for deferred in [*_deferred_plans(container, suppliers), *_injected(container, modules)]:
+        yield deferred.get()
+
+
+def _injected(
+    container: DependencyContainer, modules: Iterable[str]
+) -> Iterator[DeferredPlan[Any]]:
+    """Plans of the functions injected by the container, defined by the modules or their classes."""
+    for module_name in modules:
+        values = list(vars(importlib.import_module(module_name)).values())
+        for value in list(values):
+            if isclass(value):
+                values.extend(vars(value).values())
+        yield from _deferred_plans(container, values)
+
+
+def _deferred_plans(
+    container: DependencyContainer, values: Iterable[Any]
+) -> Iterator[DeferredPlan[Any]]:
+    """Plans of the values which are functions injected by the container."""
+    for value in values:
+        if not isfunction(value):
+            continue
+        deferred = getattr(value, INJECTION_PLAN_ATTRIBUTE, None)
+        if isinstance(deferred, DeferredPlan) and deferred.container is container:
+            yield deferred
+
+
+def _keys(plan: InjectionPlan[Any]) -> tuple[Key[Any] | None, ...] | None:
+    """Keys the parameters of the plan are bound to, None if the service cannot be compiled."""
+    if iscoroutinefunction(plan.service):
+        return None
+
+    keys: list[Key[Any] | None] = []
+    for param in plan.params:
+        if not param.is_keyword or param.lazy or param.provider or plan.container.lazy:
+            return None
+        injectable = plan.container.resolve(param.name, param.type, param.qualifier)
+        if injectable is None:
+            keys.append(None)
+            continue
+
+        key = next(
+            (
+                key
+                for key in resolution_keys(param.name, param.type, param.qualifier)
+                if plan.container.lookup(key) is injectable
+            ),
+            None,
+        )
+        if key is None or not _compilable(injectable) or not _importable(key.clazz):
+            return None
+        # left to the runtime plan, which refuses it.
+        if plan.retains and isinstance(injectable, Scoped):
+            return None
+        keys.append(key)
+
+    return tuple(keys)
+
+
+def _keys_function(keys: tuple[Key[Any] | None, ...]) -> str:
+    """Source of the function importing the keys, aliasing the modules top level objects.
+
+    The function is named by the `_NAME` placeholder.
+    """
+    imports: dict[tuple[str, str], str] = {}
+    items: list[str] = []
+    for key in keys:
+        if key is None:
+            items.append("None")
+            continue
+        clazz = "None"
+        if key.clazz is not None:
+            top, _, nested = key.clazz.__qualname__.partition(".")
+            alias = imports.setdefault((key.clazz.__module__, top), f"_t{len(imports)}")
+            clazz = f"{alias}.{nested}" if nested else alias
+        items.append(f"Key({clazz}, {key.qualifier!r})")
+
+    body = [
+        f"    from {module} import {name} as {alias}" for (module, name), alias in imports.items()
+    ]
+    if body:
+        body.append("")
+    body.append(f"    return ({', '.join(items)}{',' if len(items) == 1 else ''})")
+    return "\n".join([f"def {_NAME}() -> tuple[Key[Any] | None, ...]:", *body])
+
+
+def _call_function(plan: InjectionPlan[Any], keys: tuple[Key[Any] | None, ...]) -> str:
+    """Source of the function creating the call of the service, injecting its missing parameters.
+
+    The function is named by the `_NAME` placeholder.
+    """
+    injections: list[str] = []
+    positional = False
+    for position, (param, key) in enumerate(zip(plan.params, keys, strict=True)):
+        # without default, the parameter is bound anyway to fail as missing.
+        if key is None and param.default is not NoDefault:
+            continue
+        conditions = [f"{param.name!r} not in kwargs"]
+        if param.position != sys.maxsize:
+            conditions.insert(0, f"count <= {param.position}")
+            positional = True
+        if param.default is not NoDefault:
+            conditions.append(f"bindings[{position}] is not None")
+        injections.append(f"        if {' and '.join(conditions)}:")
+        injections.append(
+            f"            kwargs[{param.name!r}] = supply({position}, bindings[{position}])"
+        )
+
+    body = []
+    if positional:
+        body.append("        count = len(args)")
+    if injections:
+        body.append("        bindings = plan.bindings()")
+    return "\n".join(
+        [
+            f"def {_NAME}(plan: CompiledPlan) -> Callable[..., Any]:",
+            "    service = plan.service",
+            "    supply = plan.supply",
+            "",
+            "    def call(*args: Any, **kwargs: Any) -> Any:",
+            *body,
+            *injections,
+            "        return service(*args, **kwargs)",
+            "",
+            "    return call",
+        ]
+    )
+
+
+def _compilable(injectable: Injectable[Any]) -> bool:
+    """Whether the injectable is supplied as it is, neither awaited nor checked out."""
+    return not is_async(injectable) and not isinstance(injectable, Pooled)
+
+
+def _importable(clazz: Any) -> bool:
+    """Whether the type of a key can be imported back from its module."""
+    if clazz is None:
+        return True
+    qualname = getattr(clazz, "__qualname__", None)
+    module = sys.modules.get(getattr(clazz, "__module__", None) or "")
+    if not isinstance(qualname, str) or module is None or "<" in qualname:
+        return False
+
+    value: Any = module
+    for name in qualname.split("."):
+        value = getattr(value, name, None)
+    return value is clazz
+
+
+def _qualified_name(service: Callable[..., Any]) -> str | None:
+    """Name of the service to find its compiled code, None if it's not defined at a module level."""
+    module = getattr(service, "__module__", None)
+    qualname = getattr(service, "__qualname__", None)
+    if not isinstance(module, str) or not isinstance(qualname, str) or "<" in qualname:
+        return None
+    return f"{module}.{qualname}"
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Compile the container of a package into a module."""
+    parser = argparse.ArgumentParser(prog="python -m pyqure.compiler", description=__doc__)
+    parser.add_argument("package", help="the package to discover")
+    parser.add_argument("output", type=Path, help="the file where to write the compiled module")
+    parser.add_argument(
+        "--container",
+        default="pyqure.container:dc",
+        help="the container of the package, as module:attribute (default: pyqure.container:dc)",
+    )
+    args = parser.parse_args(argv)
+
+    module_name, _, attribute = args.container.partition(":")
+    container = getattr(importlib.import_module(module_name), attribute)
+    report = discover(args.package, container=container)
+
+    # the modules registering nothing and injecting nothing are not imported when loading.
+    output = args.output.resolve()
+    modules = [
+        name
+        for name in report.durations
+        if (name in report.registering or any(_injected(container, [name])))
+        and Path(getattr(sys.modules[name], "__file__", None) or ".").resolve() != output
+    ]
+    output.write_text(compile_container(container, modules))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,50 @@
-from contextlib import contextmanager
-from logging import Logger
+import importlib
+from asyncio import FIRST_COMPLETED, Task, ensure_future, to_thread
+from asyncio import wait as async_wait
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED as FIRST_DONE
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import AbstractContextManager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from logging import getLogger
 from pathlib import Path
-from typing import Any, Generic, Iterator, NamedTuple, TypeVar
+from time import perf_counter
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ClassVar,
+    Generic,
+    Iterable,
+    Iterator,
+    Literal,
+    NamedTuple,
+    Sequence,
+    TypeVar,
+    overload,
+)
+from weakref import WeakSet
 
-from typing_extensions import Self
+from typing_extensions import Self, override
 
-from pyqure.exceptions import DependencyError, InvalidRegisteredType
-from pyqure.injectables import Injectable
-from pyqure.utils.types import filter_mro, is_union
+from pyqure.exceptions import (
+    CircularDependencyError,
+    DependencyError,
+    FrozenContainerError,
+    InvalidRegisteredType,
+    MissingComponents,
+)
+from pyqure.graph import DependencyGraph
+from pyqure.injectables import AsyncSingleton, Injectable, Scope, Singleton, is_async
+from pyqure.observers import LookupPath, Observer, observed_supply, observing
+from pyqure.utils.function import INJECTION_PLAN_ATTRIBUTE
+from pyqure.utils.types import collection_item, filter_mro, is_union, unpack_types
 
-logger = Logger("pyqure")
+if TYPE_CHECKING:
+    from pyqure.compiler import CompiledService
+
+logger = getLogger("pyqure")
 
 T = TypeVar("T")
 
@@ -33,28 +68,249 @@ def Alias(qualifier: str) -> Key[T]:
     return Key(None, qualifier)
 
 
+def resolution_keys(name: str, type_: Any, qualifier: str | None = None) -> tuple[Key[Any], ...]:
+    """Keys to look up for a parameter, by order of priority.
+
+    The alias of the parameter name comes first,
+    then for each type (the last one having the priority) the name and the qualifier keys.
+    """
+    keys: list[Key[Any]] = [Alias(name)]
+    for clss in reversed(unpack_types(type_)):
+        keys.extend((Key(clss, name), Key(clss, qualifier)))
+
+    return tuple(dict.fromkeys(keys))
+
+
+class _Overlay(NamedTuple):
+    """Overrides entered in a context, on top of the ones of the enclosing contexts."""
+
+    injectables: dict[Key[Any], Injectable[Any]]
+    # keys explicitly overridden, without their parent classes.
+    explicit: frozenset[Key[Any]]
+    parent: "_Overlay | None"
+
+
+# injectables by key, and primary key by type, to look up.
+_Tables = tuple[dict[Key[Any], Injectable[Any]], dict[type[Any], Key[Any]]]
+# injectables by key, and primary injectable by type, of a frozen container.
+_Frozen = tuple[dict[Key[Any], Injectable[Any]], dict[type[Any], Injectable[Any]]]
+# injectables, primary keys, registration and tags replaced by a registration, None if missing.
+_Snapshot = tuple[
+    dict[Key[Any], Injectable[Any] | None],
+    dict[type[Any], Key[Any] | None],
+    Injectable[Any] | None,
+    tuple[str, ...],
+]
+
+
 class DependencyContainer:
     """Container of the whole dependency tree registered."""
 
+    # number of registrations done by all the containers, to know whether some code registers.
+    _registrations_count: ClassVar[int] = 0
+
     def __init__(
         self,
+        *,
+        detect_cycles: bool = False,
+        parent: "DependencyContainer | None" = None,
+        observer: Observer | None = None,
+        lazy: bool = False,
     ) -> None:
+        """Create a container.
+
+        Args:
+            detect_cycles: whether to check at each registration that the injectable
+             does not depend on itself, directly or not.
+            parent: the container to read through for the keys not registered in this one.
+            observer: the observer notified of the look ups, supplies and injections.
+            lazy: whether to inject all the dependencies lazily, as if annotated `Lazy`,
+             except the constants and the injectables to await or check out.
+        """
+        self._parent = parent
+        self._observer = observer
+        self._lazy = lazy
+        self._flat: tuple[int, _Tables] | None = None
+        self._frozen: _Frozen | None = None
+        # frozen children, merging the injectables of this container: to be thawed before it.
+        self._frozen_children: WeakSet[DependencyContainer] = WeakSet()
         self._primary: dict[type[Any], Key[Any]] = {}
         self._injectables: dict[Key[Any], Injectable[Any]] = {}
-        self._overrides: dict[Key[Any], Injectable[Any]] = {}
+        self._overlay: ContextVar[_Overlay | None] = ContextVar(
+            f"pyqure_overrides_{id(self)}", default=None
+        )
+        self._registrations: dict[Key[Any], Injectable[Any]] = {}
+        # registered keys by type and parent classes, in registration order.
+        self._implementations: dict[type[Any], dict[Key[Any], None]] = {}
+        # registered keys by tag, in registration order, and the tags of each key.
+        self._tags: dict[str, dict[Key[Any], None]] = {}
+        self._key_tags: dict[Key[Any], tuple[str, ...]] = {}
+        self._generation = 0
+        self._detect_cycles = detect_cycles
+        self._deferred: dict[str, set[str]] = {}
+        # compiled code of the services decorated from now on, by their qualified name.
+        self._compiled: dict[str, "CompiledService"] = {}
+        self._graph: tuple[int, DependencyGraph[Key[Any]]] | None = None
+        self._resolutions: dict[
+            tuple[str, Any, str | None], tuple[int, Injectable[Any] | None]
+        ] = {}
+
+    @property
+    def generation(self) -> int:
+        """Counter incremented on each mutation of the container or one of its parents.
+
+        It allows to cache what has been resolved from the container until its next change.
+        """
+        if self._parent is None:
+            return self._generation
+        return self._generation + self._parent.generation
+
+    @property
+    def observer(self) -> Observer | None:
+        """Observer notified of the look ups, supplies and injections, if any."""
+        return self._observer
+
+    def observe(self, observer: Observer | None) -> Self:
+        """Set the observer notified of the look ups, supplies and injections, None to remove it."""
+        self._observer = observer
+        return self
+
+    @property
+    def registrations(self) -> MappingProxyType[Key[Any], Injectable[Any]]:
+        """Read-only view of the injectables registered in this container, not in its parents.
+
+        The injectables are by the key they have been registered with, in registration order.
+        """
+        return MappingProxyType(self._registrations)
+
+    @classmethod
+    def registrations_count(cls) -> int:
+        """Number of registrations done by all the containers, to know whether some code registers."""
+        return cls._registrations_count
+
+    def primary_key(self, clazz: type[Any]) -> Key[Any] | None:
+        """Key of the injectable registered in this container as primary for the type, if any."""
+        return self._primary.get(clazz)
+
+    def install_compiled(self, services: Mapping[str, "CompiledService"]) -> None:
+        """Install the compiled code of services, used by the ones decorated from now on.
+
+        See `pyqure.compiler.load_compiled`.
+
+        Args:
+            services: the compiled code of the services, by their qualified name.
+        """
+        self._compiled.update(services)
 
-    def register(self, key: Key[T], component: Injectable[T], *, primary: bool = False) -> Self:
+    def compiled_service(self, name: str) -> "CompiledService | None":
+        """Compiled code installed for a service, by its qualified name, if any."""
+        return self._compiled.get(name) if self._compiled else None
+
+    @property
+    def lazy(self) -> bool:
+        """Whether all the dependencies are injected lazily, see `Lazy`."""
+        return self._lazy
+
+    @property
+    def has_overrides(self) -> bool:
+        """Whether some overrides are active in the current context, here or in the parents."""
+        return self._overlay.get() is not None or (
+            self._parent is not None and self._parent.has_overrides
+        )
+
+    @property
+    def frozen(self) -> bool:
+        """Whether the container is frozen, see `freeze`."""
+        return self._frozen is not None
+
+    def freeze(self) -> Self:
+        """Freeze the container once the startup is done, to optimize its reading.
+
+        The injectables of the container and its parents, and the primary ones by type,
+        are merged into a single table: a lookup is then one dictionary hit, two for a primary one
+        upon a qualifier not registered. The deferred modules are imported right away.
+        Any further registration is rejected, overrides are still allowed.
+
+        Raises:
+            FrozenContainerError: if the parent container is not frozen, as it may still change.
+        """
+        if self._parent is not None and not self._parent.frozen:
+            raise FrozenContainerError("The parent container must be frozen first.")
+
+        while self._deferred:
+            self.__import_deferred_all()
+
+        injectables, primaries = self.__merge()
+        primary_injectables = {clazz: injectables[key] for clazz, key in primaries.items()}
+        for clazz, injectable in primary_injectables.items():
+            injectables.setdefault(Key(clazz, None), injectable)
+
+        self._frozen = (injectables, primary_injectables)
+        if self._parent is not None:
+            self._parent._frozen_children.add(self)
+        return self
+
+    def thaw(self) -> Self:
+        """Unfreeze the container to allow registrations again, mostly for tests.
+
+        Raises:
+            FrozenContainerError: if some children are still frozen, as they merged its injectables.
+        """
+        if any(child.frozen for child in self._frozen_children):
+            raise FrozenContainerError("The frozen children containers must be thawed first.")
+
+        self._frozen = None
+        if self._parent is not None:
+            self._parent._frozen_children.discard(self)
+        self._generation += 1
+        return self
+
+    def child(self) -> "DependencyContainer":
+        """Create a container reading through this one.
+
+        The child only stores its own registrations, which take precedence over the parent ones.
+        The keys it does not know are looked up in the parent,
+        so the parent singletons are shared by all its children.
+
+        Examples:
+            >>> tenant = container.child()
+            >>> tenant[Alias("tenant_id")] = Constant("acme")
+        """
+        return DependencyContainer(
+            detect_cycles=self._detect_cycles, parent=self, observer=self._observer, lazy=self._lazy
+        )
+
+    def flatten(self) -> Self:
+        """Merge the parents injectables into a single lookup table, once the container is stable.
+
+        Then a lookup is a single dictionary hit instead of one by parent.
+        The table is rebuilt on the next lookup after a change, here or in the parents.
+        """
+        if self._parent is not None:
+            self._flat = (self.generation, self.__merge())
+        return self
+
+    def register(
+        self,
+        key: Key[T],
+        component: Injectable[T],
+        *,
+        primary: bool = False,
+        tags: Sequence[str] = (),
+    ) -> Self:
         """Register a new injectable among the dependencies.
 
         Notes:
             Can add some options to the injectable registering impossible with __setitem__
                 * primary : specify that to use the injectable for a class over others.
+                * tags : labels to find the injectable with others, see `lookup_tagged`.
+                  Registering the key again replaces its tags.
 
         Examples:
             >>> container.register(Key(int, "42"), Constant(42), primary=True).register(Key(int, "72"), Constant(72))
             >>> assert container[Class(int)] == 42
         """
-        self.__register(key, component, primary)
+        self.__register(key, component, primary, tags)
 
         return self
 
@@ -76,46 +332,818 @@ class DependencyContainer:
             * Check if an injectable has been set as primary for this type
             * Raise error
         """
-        clss, qualifier = key
-        if key in self._overrides:
-            return self._overrides[key].supply()  # type: ignore[no-any-return]
+        injectable = self.lookup(key)
+        if injectable is None:
+            raise DependencyError(f"No component found based on key: {key}.")
+
+        if self._observer is not None:
+            observer = observing(self._observer)
+            if observer is not None:
+                return observed_supply(injectable, observer)  # type: ignore[no-any-return]
+        return injectable.supply()
+
+    @overload
+    def resolve_many(self, keys: Mapping[str, Key[Any]]) -> dict[str, Any]: ...
+
+    @overload
+    def resolve_many(self, keys: Iterable[Key[Any]]) -> list[Any]: ...
+
+    def resolve_many(
+        self, keys: Mapping[str, Key[Any]] | Iterable[Key[Any]]
+    ) -> dict[str, Any] | list[Any]:
+        """Retrieve the injectables of several keys at once.
+
+        All the keys are looked up before supplying any injectable,
+        and an injectable found for several keys is supplied once for the whole batch.
+
+        Args:
+            keys: the keys to retrieve, or the keys by name.
+
+        Returns:
+            The values in the order of the keys, or by name.
+
+        Raises:
+            MissingComponents: with all the keys not found.
+
+        Examples:
+            >>> repository, service = container.resolve_many([Class(Repository), Class(Service)])
+            >>> handlers = container.resolve_many({"create": Alias("create"), "delete": Alias("delete")})
+        """
+        names = keys if isinstance(keys, Mapping) else None
+        batch = list(keys if names is None else names.values())
+        injectables = self.__lookup_many(batch)
+        if any(injectable is None for injectable in injectables):
+            missing = [
+                key
+                for key, injectable in zip(batch, injectables, strict=True)
+                if injectable is None
+            ]
+            raise MissingComponents(missing)
+
+        identities = set(map(id, injectables))
+
+        # sampled once for the whole batch.
+        observer = observing(self._observer)
+        if observer is None and len(identities) == len(injectables):
+            values = [injectable.supply() for injectable in injectables]  # type: ignore[union-attr]
+        else:
+            # an injectable found for several keys is supplied once.
+            supplied: dict[int, Any] = {}
+            for injectable in injectables:
+                if id(injectable) not in supplied:
+                    supplied[id(injectable)] = (
+                        injectable.supply()  # type: ignore[union-attr]
+                        if observer is None
+                        else observed_supply(injectable, observer)  # type: ignore[arg-type]
+                    )
+            values = [supplied[id(injectable)] for injectable in injectables]
+
+        if names is not None:
+            return dict(zip(names, values, strict=True))
+        return values
+
+    def __lookup_many(self, keys: list[Key[Any]]) -> list[Injectable[Any] | None]:
+        """Look up the keys, checking the overrides and the observer once for the whole batch."""
+        if self._observer is not None or self.has_overrides:
+            return [self.lookup(key) for key in keys]
+
+        get = (self._frozen or self.__tables())[0].get
+        lookup = self.lookup
+        # the primaries, parents and deferred modules are left to the full look up.
+        return [injectable if (injectable := get(key)) is not None else lookup(key) for key in keys]
+
+    def lookup_all(self, key: Key[T]) -> dict[Key[Any], Injectable[T]]:
+        """Retrieve the injectables registered for the type of the key or its subclasses, without supplying them.
+
+        The qualifier of the key, if any, only keeps the keys registered with it.
+        The registered keys are indexed by type, so only the matching ones are looked up,
+        the parents ones first, in registration order.
+        Each key gives the injectable registered under it, even if a subclass registered
+        afterwards shadows it for its parent classes, unless the key itself is overridden.
+        An injectable registered under several keys is returned once, for the first one.
+
+        Returns:
+            The injectables by their registered key.
+        """
+        clazz, qualifier = key
+        if self._deferred or self._parent is not None:
+            self.__import_deferred_chain(key)
+
+        registered: dict[Key[Any], None] = {}
+        for container in reversed(self.__chain()):
+            registered.update(container._implementations.get(clazz, {}))  # type: ignore[arg-type]
+
+        found: dict[Key[Any], Injectable[T]] = {}
+        seen: set[int] = set()
+        for registered_key in registered:
+            if qualifier is not None and registered_key.qualifier != qualifier:
+                continue
+            injectable = self.__registration(registered_key)
+            if injectable is not None and id(injectable) not in seen:
+                seen.add(id(injectable))
+                found[registered_key] = injectable
+        return found
+
+    def get_all(self, key: Key[T]) -> list[T]:
+        """Retrieve the injectables registered for the type of the key or its subclasses.
+
+        See `lookup_all`.
+
+        Examples:
+            >>> @component
+            ... class CreateHandler(Handler): ...
+            >>> @component
+            ... class DeleteHandler(Handler): ...
+            >>> handlers = container.get_all(Class(Handler))
+        """
+        return [self.__supply(injectable) for injectable in self.lookup_all(key).values()]
+
+    def lookup_tagged(
+        self, *tags: str, match: Literal["all", "any"] = "all"
+    ) -> dict[Key[Any], Injectable[Any]]:
+        """Retrieve the injectables registered with the tags, without supplying them.
+
+        The keys are indexed by tag: matching all the tags only walks the keys of the rarest one,
+        matching any of them the keys of each one, so the cost depends on the matches only.
+        Each key gives the injectable registered under it, as for `lookup_all`.
+
+        Args:
+            tags: the tags looked for.
+            match: whether the keys must have all the tags, or any of them.
+
+        Returns:
+            The injectables by their registered key, in registration order.
+        """
+        indexes = [self.__tagged(tag) for tag in tags]
+        if match == "any":
+            keys: Iterable[Key[Any]] = {key: None for index in indexes for key in index}
+        else:
+            rarest = min(indexes, key=len, default={})
+            keys = [key for key in rarest if all(key in index for index in indexes)]
+
+        found: dict[Key[Any], Injectable[Any]] = {}
+        for key in keys:
+            injectable = self.__registration(key)
+            if injectable is not None:
+                found[key] = injectable
+        return found
+
+    def get_tagged(self, *tags: str, match: Literal["all", "any"] = "all") -> list[Any]:
+        """Retrieve the injectables registered with the tags.
+
+        See `lookup_tagged`.
+
+        Examples:
+            >>> @component(tags=["event-handler", "billing"])
+            ... class InvoiceHandler: ...
+            >>> handlers = container.get_tagged("event-handler", "billing")
+        """
+        return [
+            self.__supply(injectable)
+            for injectable in self.lookup_tagged(*tags, match=match).values()
+        ]
 
-        if key in self._injectables:
-            return self._injectables[key].supply()  # type: ignore[no-any-return]
+    def __tagged(self, tag: str) -> dict[Key[Any], None]:
+        """Keys registered with the tag, here or in the parents."""
+        if self._parent is None:
+            return self._tags.get(tag, {})
 
-        if clss in self._primary:
-            return self._injectables[self._primary[clss]].supply()  # type: ignore[no-any-return]
+        keys: dict[Key[Any], None] = {}
+        for container in reversed(self.__chain()):
+            keys.update(container._tags.get(tag, {}))
+        return keys
 
-        raise DependencyError(f"No component found based on key: {key}.")
+    def __supply(self, injectable: Injectable[T]) -> T:
+        if self._observer is not None:
+            observer = observing(self._observer)
+            if observer is not None:
+                return observed_supply(injectable, observer)  # type: ignore[no-any-return]
+        return injectable.supply()
 
     def __contains__(self, key: Key[Any]) -> bool:
         """Check whether an injectable exists for this key."""
-        clss, qualifier = key
-        return clss in self._primary or key in self._injectables or key in self._overrides
+        return self.lookup(key) is not None
+
+    def lookup(self, key: Key[T]) -> Injectable[T] | None:
+        """Retrieve the injectable registered for the key, without supplying it.
+
+        It follows the same look up order as `__getitem__`.
+
+        Returns:
+            The injectable if found, otherwise None.
+        """
+        injectable = self.__overridden(key)
+        frozen = self._frozen
+
+        if injectable is None and frozen is not None:
+            injectable = frozen[0].get(key)
+            if injectable is None:
+                injectable = frozen[1].get(key.clazz)  # type: ignore[arg-type]
+        elif injectable is None:
+            if self._parent is not None and self._flat is None:
+                injectable = self.__read_through(key)
+            else:
+                injectables, primaries = self.__tables()
+                injectable = injectables.get(key)
+                if injectable is None:
+                    primary = primaries.get(key.clazz)  # type: ignore[arg-type]
+                    if primary is not None:
+                        injectable = injectables[primary]
+
+            if (
+                injectable is None
+                and (self._deferred or self._parent is not None)
+                and self.__import_deferred_chain(key)
+            ):
+                # the observer is notified by the new look up.
+                return self.lookup(key)
+
+        if self._observer is not None:
+            observer = observing(self._observer)
+            if observer is not None:
+                observer.on_lookup(key, self.__path(key, injectable))
+
+        return injectable
+
+    def __path(self, key: Key[T], injectable: Injectable[T] | None) -> LookupPath:
+        """Way the injectable of the key has been found, only computed for the observer."""
+        if injectable is None:
+            return "miss"
+        if self.__overridden(key) is not None:
+            return "override"
+
+        injectables, _ = self._frozen or self.__tables()
+        if injectables.get(key) is injectable:
+            return "registered"
+        if self._frozen is None and self._flat is None:
+            for parent in self.__chain()[1:]:
+                if parent._injectables.get(key) is injectable:
+                    return "parent"
+        return "primary"
+
+    def __overridden(self, key: Key[T], explicit: bool = False) -> Injectable[T] | None:
+        """Injectable overriding the key in the current context, here or in the parents.
+
+        Args:
+            key: the key overridden.
+            explicit: whether to ignore the overrides of its subclasses.
+        """
+        container: DependencyContainer | None = self
+        while container is not None:
+            overlay = container._overlay.get()
+            while overlay is not None:
+                injectable = overlay.injectables.get(key)
+                if injectable is not None and (not explicit or key in overlay.explicit):
+                    return injectable
+                overlay = overlay.parent
+            container = container._parent
+        return None
+
+    def __registration(self, key: Key[T]) -> Injectable[T] | None:
+        """Injectable registered under the key by the closest container, unless it is overridden.
+
+        Unlike `lookup`, neither the subclasses registered nor their overrides replace it.
+        """
+        injectable = self.__overridden(key, explicit=True)
+        if injectable is not None:
+            return injectable
+
+        for container in self.__chain():
+            injectable = container._registrations.get(key)
+            if injectable is not None:
+                return injectable
+        return None
+
+    def __chain(self) -> list["DependencyContainer"]:
+        """The container and its parents, the closest first."""
+        chain: list[DependencyContainer] = []
+        container: DependencyContainer | None = self
+        while container is not None:
+            chain.append(container)
+            container = container._parent
+        return chain
+
+    def __read_through(self, key: Key[T]) -> Injectable[T] | None:
+        """Look up the key through the parents, as in the tables merged by `flatten`.
+
+        The key registered in the closest container wins, then the closest primary of its type.
+        """
+        chain = self.__chain()
+        for container in chain:
+            injectable = container._injectables.get(key)
+            if injectable is not None:
+                return injectable
+
+        for container in chain:
+            primary = container._primary.get(key.clazz)  # type: ignore[arg-type]
+            if primary is not None:
+                for owner in chain:
+                    injectable = owner._injectables.get(primary)
+                    if injectable is not None:
+                        return injectable
+        return None
+
+    def __import_deferred_chain(self, key: Key[Any]) -> bool:
+        """Import the deferred modules which may register the key, here or in the parents.
+
+        Returns:
+            True if some modules have been imported, otherwise False.
+        """
+        imported = False
+        container: DependencyContainer | None = self
+        while container is not None:
+            if container._deferred and container.__import_deferred(key):
+                imported = True
+            container = container._parent
+        return imported
+
+    def __tables(self) -> _Tables:
+        """Injectables and primary keys to look up, the flattened ones if any."""
+        flat = self._flat
+        if flat is None:
+            return self._injectables, self._primary
+
+        generation = self.generation
+        if flat[0] != generation:
+            flat = self._flat = (generation, self.__merge())
+        return flat[1]
+
+    def __merge(self) -> _Tables:
+        """Injectables and primary keys of the container and its parents, its own winning."""
+        injectables: dict[Key[Any], Injectable[Any]] = {}
+        primaries: dict[type[Any], Key[Any]] = {}
+        for container in reversed(self.__chain()):
+            injectables.update(container._injectables)
+            primaries.update(container._primary)
+        return injectables, primaries
+
+    def defer(self, module_name: str, names: Iterable[str]) -> None:
+        """Defer the import of a module registering injectables, until one of their keys is looked up.
+
+        A key matches the names by its qualifier, or by the name of its type or one of its parents.
+
+        Args:
+            module_name: the module to import.
+            names: the qualifiers and the type names (with their parents) of the keys registered.
+
+        Raises:
+            FrozenContainerError: if the container is frozen.
+        """
+        self.__check_not_frozen()
+        for name in names:
+            self._deferred.setdefault(name, set()).add(module_name)
+        # resolutions not found so far may be found now.
+        self._generation += 1
+
+    def resolve(
+        self, name: str, type_: Any, qualifier: str | None = None
+    ) -> Injectable[Any] | None:
+        """Resolve the injectable matching a parameter, by its name, type and qualifier.
+
+        The keys of `resolution_keys` are looked up in order, the first found wins.
+        The result, even when nothing is found, is cached until the next mutation of the container,
+        unless some overrides are active in the current context.
+
+        Returns:
+            The injectable if found, otherwise None.
+        """
+        if self.has_overrides:
+            return self.__resolve(name, type_, qualifier)
+
+        signature = (name, type_, qualifier)
+        generation = self.generation
+        cached = self._resolutions.get(signature)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+
+        injectable = self.__resolve(name, type_, qualifier)
+        self._resolutions[signature] = (generation, injectable)
+        return injectable
+
+    def __resolve(self, name: str, type_: Any, qualifier: str | None) -> Injectable[Any] | None:
+        for key in resolution_keys(name, type_, qualifier):
+            injectable = self.lookup(key)
+            if injectable is not None:
+                return injectable
+
+        # a list or a dict by name of all the components registered for the type.
+        collection = collection_item(type_)
+        if collection is not None and self.lookup_all(Key(collection[0], qualifier)):
+            return _Collection(self, Key(collection[0], qualifier), named=collection[1])
+        return None
+
+    def override(self, key: Key[T], component: Injectable[T]) -> AbstractContextManager[None]:
+        """Override a certain key with component within the context.
+
+        See `override_all`.
+        """
+        return self.override_all({key: component})
 
     @contextmanager
-    def override(self, key: Key[T], component: Injectable[T]) -> Iterator[None]:
-        """Override a certain key with component within the context."""
-        self._overrides[key] = component
+    def override_all(self, overrides: Mapping[Key[Any], Injectable[Any]]) -> Iterator[None]:
+        """Override several keys with their component within the context.
+
+        As for registering, the parent classes of the keys are overridden too,
+        unless explicitly overridden by another key.
+        The overrides are only visible in the current context (thread or asyncio task),
+        and the ones created from it (ex: tasks created inside, `asyncio.to_thread`).
+        Entering and exiting does not depend on the number of overrides already active.
+
+        Examples:
+            >>> with container.override_all({Class(Repository): Constant(repository), Alias("url"): Constant(url)}):
+            ...     run()
+        """
+        injectables = {
+            expanded: component for key, component in overrides.items() for expanded in _expand(key)
+        }
+        injectables.update(overrides)
+
+        token = self._overlay.set(_Overlay(injectables, frozenset(overrides), self._overlay.get()))
         try:
             yield
         finally:
-            del self._overrides[key]
+            self._overlay.reset(token)
+
+    def scope(self) -> Scope:
+        """Open a scope, where each `Scoped` injectable is built once and disposed on exit.
+
+        Examples:
+            >>> with container.scope():
+            ...     handle(request)
+        """
+        return Scope()
+
+    def warmup(self, max_workers: int | None = None) -> dict[Key[Any], float]:
+        """Build eagerly all the registered singletons.
+
+        The singletons are built following their dependencies order,
+        the independent ones being built concurrently on a thread pool.
+        Asynchronous singletons are left to `awarmup`.
+
+        Args:
+            max_workers: the maximum number of threads building the singletons.
+
+        Returns:
+            The build duration in seconds of each singleton, by its registered key.
+
+        Raises:
+            CircularDependencyError: if singletons depend on each other.
+        """
+        nodes, pending, dependents = self._build_order(Singleton)
+        timings: dict[Key[Any], float] = {}
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            running: dict[Future[float], Key[Any]] = {}
+
+            def start(node: Key[Any]) -> None:
+                running[executor.submit(_timed_supply, nodes[node])] = node
+
+            for node in [node for node, dependencies in pending.items() if not dependencies]:
+                start(node)
+
+            while running:
+                done, _ = wait(running, return_when=FIRST_DONE)
+                for future in done:
+                    node = running.pop(future)
+                    timings[node] = future.result()
+                    for dependent in _release(node, pending, dependents):
+                        start(dependent)
+
+        _check_all_built(nodes, timings)
+        return timings
+
+    async def awarmup(self) -> dict[Key[Any], float]:
+        """Build eagerly all the registered singletons, asynchronous ones included.
+
+        The singletons are built following their dependencies order,
+        the independent ones being built concurrently:
+        the asynchronous singletons as tasks, the others in threads.
+
+        Returns:
+            The build duration in seconds of each singleton, by its registered key.
+
+        Raises:
+            CircularDependencyError: if singletons depend on each other.
+        """
+        nodes, pending, dependents = self._build_order(Singleton, AsyncSingleton)
+        timings: dict[Key[Any], float] = {}
+        running: dict[Task[float], Key[Any]] = {}
+
+        def start(node: Key[Any]) -> None:
+            running[ensure_future(_async_timed_supply(nodes[node]))] = node
+
+        for node in [node for node, dependencies in pending.items() if not dependencies]:
+            start(node)
+
+        while running:
+            done, _ = await async_wait(running, return_when=FIRST_COMPLETED)
+            for task in done:
+                node = running.pop(task)
+                timings[node] = task.result()
+                for dependent in _release(node, pending, dependents):
+                    start(dependent)
+
+        _check_all_built(nodes, timings)
+        return timings
 
-    def __register(self, key: Key[T], component: Injectable[T], primary: bool = False) -> None:
-        """Intern method registering an injectable."""
-        clzz, qualifier = key
+    def graph(self) -> DependencyGraph[Key[Any]]:
+        """Graph of the dependencies between the registered injectables.
 
-        if clzz:
-            if is_union(clzz):
-                raise InvalidRegisteredType(clzz)
+        The nodes are the registered keys, and the edges the parameters of their suppliers
+        resolved to other registered injectables.
+        An injectable registered under several keys is represented by the first one.
+        The graph is cached until the next mutation of the container.
+        """
+        generation = self.generation
+        if self._graph is None or self._graph[0] != generation:
+            keys = self._keys_by_injectable()
+            edges = {
+                key: [keys[id(dep)] for dep in _dependencies(injectable) if id(dep) in keys]
+                for key, injectable in self._registrations.items()
+            }
+            self._graph = (generation, DependencyGraph(edges))
+
+        return self._graph[1]
+
+    def validate(self) -> Self:
+        """Validate the registered injectables do not depend on each other.
+
+        Raises:
+            CircularDependencyError: if some injectables depend on each other.
+        """
+        self.graph().check()
+        return self
+
+    def _keys_by_injectable(self) -> dict[int, Key[Any]]:
+        """First registered key of each injectable, by its identity."""
+        keys: dict[int, Key[Any]] = {}
+        for key, injectable in self._registrations.items():
+            keys.setdefault(id(injectable), key)
+        return keys
+
+    def _build_order(
+        self, *types: type[Any]
+    ) -> tuple[
+        dict[Key[Any], Injectable[Any]], dict[Key[Any], set[Key[Any]]], DependencyGraph[Key[Any]]
+    ]:
+        """Compute the dependencies between the registered injectables of the types.
+
+        The dependencies going through injectables of other types (ex: factories)
+        are followed until reaching an injectable of the types.
+
+        Returns:
+            The injectables by their key, the dependencies of each one and their dependents.
+        """
+        graph = self.graph()
+        keys = self._keys_by_injectable()
+        nodes = {
+            key: injectable
+            for key, injectable in self._registrations.items()
+            if isinstance(injectable, types) and keys[id(injectable)] == key
+        }
+        pending: dict[Key[Any], set[Key[Any]]] = {}
+
+        for node in nodes:
+            pending[node] = set()
+            seen: set[Key[Any]] = set()
+            stack = list(graph.dependencies(node))
+            while stack:
+                dependency = stack.pop()
+                if dependency in seen:
+                    continue
+                seen.add(dependency)
+                if dependency in nodes:
+                    pending[node].add(dependency)
+                else:
+                    stack.extend(graph.dependencies(dependency))
+
+        return nodes, pending, DependencyGraph(pending)
+
+    def __import_deferred(self, key: Key[Any]) -> bool:
+        """Import the deferred modules which may register the key.
 
-            for cls in filter_mro(clzz):
-                self._injectables[Key(cls, qualifier)] = component
+        Returns:
+            True if some modules have been imported, otherwise False.
+        """
+        clazz, qualifier = key
+        names = [qualifier] if qualifier else []
+        if clazz is not None:
+            try:
+                classes = filter_mro(clazz)
+            except (AttributeError, TypeError):  # typing special forms have no mro
+                classes = [clazz]
+            names.extend(getattr(cls, "__qualname__", str(cls)) for cls in classes)
+
+        modules = {module for name in names for module in self._deferred.pop(name, ())}
+        for module in sorted(modules):
+            logger.debug(f"Import deferred module {module} for key {key}")
+            importlib.import_module(module)
+
+        return bool(modules)
+
+    def __import_deferred_all(self) -> None:
+        """Import all the deferred modules."""
+        modules = set().union(*self._deferred.values())
+        self._deferred.clear()
+        for module in sorted(modules):
+            importlib.import_module(module)
+
+    def __check_not_frozen(self) -> None:
+        if self._frozen is not None:
+            raise FrozenContainerError("The container is frozen, it cannot be changed anymore.")
+
+    def __register(
+        self,
+        key: Key[T],
+        component: Injectable[T],
+        primary: bool = False,
+        tags: Sequence[str] = (),
+    ) -> None:
+        """Intern method registering an injectable.
+
+        With cycles detection, the registration is undone when the injectable depends on itself.
+        """
+        self.__check_not_frozen()
+        keys = _expand(key)
+        previous = self.__snapshot(key, keys) if self._detect_cycles else None
+        for expanded in keys:
+            self._injectables[expanded] = component
+            if expanded.clazz is not None:
+                self._implementations.setdefault(expanded.clazz, {})[key] = None
                 if primary:
-                    self._primary[cls] = key
+                    self._primary[expanded.clazz] = key
+
+        self._registrations[key] = component
+        if tags or key in self._key_tags:
+            self.__tag(key, tuple(tags))
+        self._generation += 1
+        DependencyContainer._registrations_count += 1
+
+        if previous is not None:
+            try:
+                self.__check_cycle(key, component)
+            except CircularDependencyError:
+                self.__restore(key, previous)
+                raise
+
+    def __snapshot(self, key: Key[Any], keys: list[Key[Any]]) -> _Snapshot:
+        """Entries a registration of the key is about to replace."""
+        return (
+            {expanded: self._injectables.get(expanded) for expanded in keys},
+            {
+                expanded.clazz: self._primary.get(expanded.clazz)
+                for expanded in keys
+                if expanded.clazz
+            },
+            self._registrations.get(key),
+            self._key_tags.get(key, ()),
+        )
+
+    def __restore(self, key: Key[Any], previous: _Snapshot) -> None:
+        """Undo a registration of the key, restoring the entries it has replaced."""
+        injectables, primaries, registration, tags = previous
+        _restore(self._injectables, injectables)
+        _restore(self._primary, primaries)
+        _restore(self._registrations, {key: registration})
+        self.__tag(key, tags)
+        if registration is None:
+            for expanded in injectables:
+                if expanded.clazz is not None:
+                    self._implementations[expanded.clazz].pop(key, None)
+        # a new generation, as what has been resolved meanwhile must not be reused.
+        self._generation += 1
+
+    def __tag(self, key: Key[Any], tags: tuple[str, ...]) -> None:
+        """Replace the tags of the key."""
+        for tag in self._key_tags.pop(key, ()):
+            self._tags[tag].pop(key, None)
+        if tags:
+            self._key_tags[key] = tags
+            for tag in tags:
+                self._tags.setdefault(tag, {})[key] = None
+
+    def __check_cycle(self, key: Key[Any], component: Injectable[Any]) -> None:
+        """Check the injectable does not depend on itself, only walking its dependencies.
+
+        Raises:
+            CircularDependencyError: if the injectable depends on itself.
+        """
+        seen: set[int] = set()
+        stack = _dependencies(component)
+        while stack:
+            dependency = stack.pop()
+            if dependency is component:
+                # describe the whole cycles when all their injectables are registered here.
+                self.validate()
+                raise CircularDependencyError(f"{key} depends on itself.")
+            if id(dependency) not in seen:
+                seen.add(id(dependency))
+                stack.extend(_dependencies(dependency))
+
+
+@dataclass(eq=False, slots=True)
+class _Collection(Injectable[Any]):
+    """Injectable of all the components registered for a type, as a list or by name.
+
+    The components are looked up on each supply, so the overrides are taken into account.
+    By name, a component is identified by its qualifier, otherwise by its type name.
+    """
+
+    container: DependencyContainer
+    key: Key[Any]
+    named: bool = False
+
+    @override
+    def supply(self) -> list[Any] | dict[str, Any]:
+        observer = observing(self.container.observer)
+        values = {
+            key: injectable.supply() if observer is None else observed_supply(injectable, observer)
+            for key, injectable in self.container.lookup_all(self.key).items()
+        }
+        if self.named:
+            return {_name(key): value for key, value in values.items()}
+        return list(values.values())
+
+
+def _name(key: Key[Any]) -> str:
+    """Qualifier of the key, otherwise the name of its type."""
+    if key.qualifier:
+        return key.qualifier
+    return str(getattr(key.clazz, "__name__", key.clazz))
+
+
+def _restore(table: dict[Any, Any], entries: Mapping[Any, Any]) -> None:
+    """Set back the entries into the table, removing the ones which were missing (None)."""
+    for entry, value in entries.items():
+        if value is None:
+            table.pop(entry, None)
         else:
-            self._injectables[key] = component
+            table[entry] = value
+
+
+def _expand(key: Key[T]) -> list[Key[Any]]:
+    """Keys of the type and its parent classes, with the same qualifier.
+
+    Raises:
+        InvalidRegisteredType: if the type is an union.
+    """
+    clzz, qualifier = key
+    if not clzz:
+        return [key]
+    if is_union(clzz):
+        raise InvalidRegisteredType(clzz)
+
+    return [Key(cls, qualifier) for cls in filter_mro(clzz)]
+
+
+def _dependencies(injectable: Injectable[Any]) -> list[Injectable[Any]]:
+    """Injectables required by the supplier of an injectable, found through its injection plan."""
+    supplier = getattr(injectable, "supplier", None)
+    plan = getattr(supplier, INJECTION_PLAN_ATTRIBUTE, None)
+    if plan is None:
+        return []
+
+    return [dependency for dependency in plan.bindings() if dependency is not None]
+
+
+def _release(
+    node: Key[Any], pending: dict[Key[Any], set[Key[Any]]], dependents: DependencyGraph[Key[Any]]
+) -> list[Key[Any]]:
+    """Mark a node as built, and return its dependents ready to be built."""
+    ready = []
+    for dependent in dependents.dependents(node):
+        pending[dependent].discard(node)
+        if not pending[dependent]:
+            ready.append(dependent)
+    return ready
+
+
+def _check_all_built(
+    nodes: dict[Key[Any], Injectable[Any]], timings: dict[Key[Any], float]
+) -> None:
+    """Ensure all the nodes have been built, otherwise some of them are depending on each other."""
+    not_built = [str(key) for key in nodes if key not in timings]
+    if not_built:
+        raise CircularDependencyError(
+            f"Circular dependencies between the singletons: {', '.join(not_built)}."
+        )
+
+
+def _timed_supply(injectable: Injectable[Any]) -> float:
+    """Supply the injectable, returning the duration in seconds."""
+    start = perf_counter()
+    injectable.supply()
+    return perf_counter() - start
+
+
+async def _async_timed_supply(injectable: Injectable[Any]) -> float:
+    """Supply the injectable, asynchronous or not, returning the duration in seconds."""
+    start = perf_counter()
+    if is_async(injectable):
+        await injectable.supply()
+    else:
+        await to_thread(injectable.supply)
+    return perf_counter() - start
 
 
 dc: DependencyContainer = DependencyContainer()
@@ -1,15 +1,131 @@
+import ast
+import hashlib
 import importlib
 import inspect
+import json
+import os
 import pkgutil
+import sys
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from itertools import islice
+from logging import DEBUG
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Iterable, NamedTuple
 
-from pyqure.container import logger
+from pyqure.container import DependencyContainer, Key, dc, logger
 
+MANIFEST_VERSION = 1
 
-def discover(package_name: str | None = None) -> None:
+ModuleEntry = dict[str, Any]
+
+PRESCREEN_MARKER = b"pyqure"
+
+
+@dataclass(slots=True)
+class DiscoveryReport:
+    """Report of a discovering, to find out what dominates the startup.
+
+    Attributes:
+        durations: the import duration in seconds of each module imported, by module name.
+        skipped: the modules not imported, as pre-screened or unchanged since the last discovering.
+        registering: the modules imported whose import registered some injectables, in order.
+    """
+
+    durations: dict[str, float] = field(default_factory=dict)
+    skipped: list[str] = field(default_factory=list)
+    registering: list[str] = field(default_factory=list)
+
+    @property
+    def total(self) -> float:
+        """Total duration in seconds of the imports."""
+        return sum(self.durations.values())
+
+    def slowest(self, count: int = 10) -> list[tuple[str, float]]:
+        """Slowest modules to import with their duration, the slowest first."""
+        return sorted(self.durations.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+@dataclass(frozen=True, slots=True)
+class _Filters:
+    """Filters of the modules to discover."""
+
+    include: tuple[str, ...] = ()
+    exclude: tuple[str, ...] = ()
+    max_depth: int | None = None
+
+    def includes(self, module_name: str) -> bool:
+        return not self.include or any(fnmatchcase(module_name, glob) for glob in self.include)
+
+    def excludes(self, module_name: str) -> bool:
+        return any(fnmatchcase(module_name, glob) for glob in self.exclude)
+
+    def dump(self) -> list[Any]:
+        """Serializable form, to know whether a manifest was walked with the same filters."""
+        return [list(self.include), list(self.exclude), self.max_depth]
+
+
+@dataclass(frozen=True, slots=True)
+class _Discovery:
+    """Options and report of an ongoing discovering."""
+
+    container: DependencyContainer
+    filters: _Filters
+    prescreen: bool
+    report: DiscoveryReport
+
+    def screens_out(self, path: str | None) -> bool:
+        """Whether the module source is skipped by the pre-screen."""
+        return self.prescreen and not _mentions_pyqure(path)
+
+
+def discover(  # noqa: PLR0913
+    package_name: str | None = None,
+    *,
+    container: DependencyContainer = dc,
+    state_file: Path | str | None = None,
+    lazy: bool = False,
+    include: Iterable[str] = (),
+    exclude: Iterable[str] = (),
+    max_depth: int | None = None,
+    prescreen: bool = False,
+) -> DiscoveryReport:
     """Discover recursively all psub-package to perform auto-loading of modules, and so the injectables defined.
 
     If the package is provided, the discovering will be performed from it as root.
     Otherwise, it will use the package where the function is being called.
+
+    With a state file (ex: `DEFAULT_DEPENDENCIES_STATE_FILE`), a manifest of the discovered modules
+    is persisted, with the keys they register inside the container and their source state.
+    On the next discovering, the package is not walked again unless its directories changed,
+    and the unchanged modules which did not register anything are not imported.
+
+    In lazy mode, the modules are not imported: their sources are scanned for the injectables
+    decorated with `@component` or `@factory`, and their import is deferred until one of their keys
+    is looked up inside the container. Modules using `@configuration`, or whose injectables cannot be
+    statically known, are imported right away: as the ones registering otherwise at import
+    (ex: `container[key] = ...`, `register`) or importing pyqure registering functions under another name.
+
+    The modules can be filtered with glob patterns upon their full name (ex: `*.tests.*`).
+    An excluded package is not walked, whereas the sub-packages are walked even if not included.
+    With the pre-screen, the modules whose source never mentions pyqure are not imported:
+    it's opt-in, as a module may register through decorators re-exported by another package.
+    The manifest records the modules screened out, to examine them again once the pre-screen is off.
+
+    Args:
+        package_name: the root package to discover.
+        container: the container whose registered keys are recorded in the manifest,
+         or where the lazy imports are deferred.
+        state_file: the file where to persist the manifest.
+        lazy: whether to defer the modules import until their injectables are needed.
+        include: the patterns of the modules to discover, all of them if empty.
+        exclude: the patterns of the modules and packages not to discover.
+        max_depth: the depth of the sub-packages to walk, the root package modules being at 1.
+        prescreen: whether to skip the modules whose source never mentions pyqure.
+
+    Returns:
+        The import duration of each module, and the modules skipped.
     """
     package_to_discover = package_name
 
@@ -19,14 +135,406 @@ def discover(package_name: str | None = None) -> None:
     if package_to_discover is None:
         raise ValueError("Should be call inside a package not a script.")
 
+    if lazy and state_file is not None:
+        raise ValueError("The lazy discovering does not import modules, it cannot use a manifest.")
+
     package = importlib.import_module(package_to_discover)
-    for _, module_name, is_pkg in pkgutil.walk_packages(
-        package.__path__, package_to_discover + "."
+    filters = _Filters(tuple(include), tuple(exclude), max_depth)
+    report = DiscoveryReport()
+    discovery = _Discovery(container, filters, prescreen, report)
+
+    if lazy:
+        _discover_lazily(package, discovery)
+        return report
+
+    if state_file is None:
+        for module_name, path in _walk(package, discovery).modules.items():
+            # the walked packages are already imported.
+            if module_name in report.durations:
+                continue
+            if discovery.screens_out(path):
+                report.skipped.append(module_name)
+            else:
+                _import(module_name, report)
+        return report
+
+    manifest = _read_manifest(Path(state_file))
+    previous = manifest.get(package_to_discover, {})
+    previous_modules: dict[str, ModuleEntry] = previous.get("modules", {})
+
+    directories = previous.get("directories", {})
+    if (
+        directories
+        and previous.get("filters") == filters.dump()
+        and all(_mtime(Path(path)) == mtime for path, mtime in directories.items())
     ):
-        if not is_pkg:
-            imported_module = importlib.import_module(module_name)
-            for name, _ in inspect.getmembers(imported_module):
-                logger.debug(f"Add component {name} in {module_name}")
+        modules = {name: entry["path"] for name, entry in previous_modules.items()}
+    else:
+        modules, directories = _walk(package, discovery)
+
+    manifest[package_to_discover] = {
+        "directories": directories,
+        "filters": filters.dump(),
+        "modules": {
+            name: _discover_module(name, path, previous_modules.get(name), discovery)
+            for name, path in modules.items()
+        },
+    }
+    _write_manifest(Path(state_file), manifest)
+    return report
+
+
+class _Tree(NamedTuple):
+    """Modules found by walking a package."""
+
+    modules: dict[str, str | None]
+    directories: dict[str, int | None]
+
+
+def _walk(package: Any, discovery: _Discovery) -> _Tree:
+    """Walk the package to find its modules and their source file.
+
+    The sub-packages are imported to be walked, as `pkgutil.walk_packages` does.
+
+    Returns:
+        The source path of each module, and the modification time of the directories walked.
+    """
+    tree = _Tree({}, {path: _mtime(Path(path)) for path in package.__path__})
+    _walk_path(package.__path__, package.__name__ + ".", 1, discovery, tree)
+    return tree
+
+
+def _walk_path(
+    path: Iterable[str],
+    prefix: str,
+    depth: int,
+    discovery: _Discovery,
+    tree: _Tree,
+) -> None:
+    """Walk recursively the modules of a package path, in the order of `pkgutil.walk_packages`."""
+    filters = discovery.filters
+    for finder, module_name, is_pkg in pkgutil.iter_modules(path, prefix):
+        if filters.excludes(module_name):
+            continue
+
+        directory = getattr(finder, "path", None)
+        source: str | None = None
+        if directory is not None:
+            tree.directories[directory] = _mtime(Path(directory))
+            name = module_name.rpartition(".")[2]
+            file = Path(directory, name, "__init__.py") if is_pkg else Path(directory, f"{name}.py")
+            source = str(file) if file.is_file() else None
+
+        if filters.includes(module_name):
+            tree.modules[module_name] = source
+
+        if not is_pkg or (filters.max_depth is not None and depth >= filters.max_depth):
+            continue
+
+        try:
+            sub_package = _import(module_name, discovery.report)
+        except ImportError:
+            continue
+        _walk_path(
+            getattr(sub_package, "__path__", None) or [],
+            module_name + ".",
+            depth + 1,
+            discovery,
+            tree,
+        )
+
+
+def _discover_module(
+    module_name: str,
+    path: str | None,
+    entry: ModuleEntry | None,
+    discovery: _Discovery,
+) -> ModuleEntry:
+    """Import the module if needed, and return its up-to-date manifest entry."""
+    container, report = discovery.container, discovery.report
+    stat = _stat(Path(path)) if path else None
+
+    if entry is not None and stat is not None and path is not None and path == entry["path"]:
+        mtime, size = stat
+        unchanged = (mtime, size) == (entry["mtime"], entry["size"]) or (
+            size == entry["size"] and _hash(Path(path)) == entry["hash"]
+        )
+        # a module screened out is examined again once the pre-screen is off.
+        if unchanged and (discovery.prescreen or not entry.get("screened", False)):
+            if entry["registers"]:
+                _import(module_name, report)
+            else:
+                report.skipped.append(module_name)
+            return entry | {"mtime": mtime}
+
+    already_imported = module_name in sys.modules
+    count = DependencyContainer.registrations_count()
+    registrations = container.registrations
+    size_before = len(registrations)
+
+    screened = not already_imported and discovery.screens_out(path)
+    if screened:
+        report.skipped.append(module_name)
+    else:
+        _import(module_name, report)
+
+    added = len(registrations) - size_before
+    keys = list(islice(reversed(registrations), added))[::-1]
+
+    return {
+        "path": path,
+        "mtime": stat[0] if stat else None,
+        "size": stat[1] if stat else None,
+        "hash": _hash(Path(path)) if path else None,
+        # a module already imported may register through its importer, so it is always imported.
+        "registers": already_imported or count != DependencyContainer.registrations_count(),
+        "screened": screened,
+        "keys": [_describe_key(key, container) for key in keys],
+    }
+
+
+def _discover_lazily(package: Any, discovery: _Discovery) -> None:
+    """Scan the package modules to defer their import until their injectables are needed."""
+    report = discovery.report
+    scans: dict[str, _Scan | None] = {}
+    for module_name, path in _walk(package, discovery).modules.items():
+        if module_name in report.durations:
+            continue
+        if discovery.screens_out(path):
+            report.skipped.append(module_name)
+        else:
+            scans[module_name] = _scan(Path(path)) if path else None
+
+    # bases of the classes by their name, to match the keys registered upon parents.
+    bases: dict[str, set[str]] = {}
+    for scan in scans.values():
+        for name, class_bases in (scan.bases if scan else {}).items():
+            bases.setdefault(name, set()).update(class_bases)
+
+    for module_name, scan in scans.items():
+        if scan is None:
+            _import(module_name, report)
+        elif scan.names:
+            discovery.container.defer(module_name, _with_parents(scan.names, bases))
+
+
+def _with_parents(names: set[str], bases: dict[str, set[str]]) -> set[str]:
+    """Add to the names the ones of their parent classes, recursively."""
+    found = set(names)
+    stack = list(names)
+    while stack:
+        for base in bases.get(stack.pop(), ()):
+            if base not in found:
+                found.add(base)
+                stack.append(base)
+    return found
+
+
+class _Scan(NamedTuple):
+    """Result of the static scan of a module."""
+
+    names: set[str]
+    bases: dict[str, set[str]]
+
+
+_REGISTERING_DECORATORS = {"component", "factory"}
+# pyqure names which may register through code the scan does not follow.
+_REGISTERING_NAMES = {"*", "dc", "create_injectable"}
+_REGISTERING_METHODS = {"register", "__setitem__"}
+
+
+def _scan(path: Path) -> _Scan | None:
+    """Statically scan a module source for the keys registered by its decorated injectables.
+
+    Returns:
+        The qualifiers and type names of the keys, with the bases of the classes defined,
+        or None if the module has to be imported to know them.
+    """
+    try:
+        tree = ast.parse(path.read_bytes())
+    except (OSError, SyntaxError, ValueError):
+        return None
+
+    if _registers_otherwise(tree):
+        return None
+
+    names: set[str] = set()
+    bases: dict[str, set[str]] = {}
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef):
+            bases[node.name] = {base for base in map(_name, node.bases) if base}
+
+        if not isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+
+        for decorator in node.decorator_list:
+            registered = _registered_names(node, decorator)
+            if registered is None:
+                return None
+            names |= registered
+
+    return _Scan(names, bases)
+
+
+def _registers_otherwise(tree: ast.Module) -> bool:
+    """Whether the module may register injectables without the decorators the scan recognises.
+
+    That is when it imports pyqure names registering in a way the scan does not follow,
+    as a decorator under another name, or when it assigns an item or calls `register` at import.
+    The code of the functions is not run at import, so it is not taken into account.
+    """
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.ImportFrom) or not (node.module or "").startswith("pyqure"):
+            continue
+        for alias in node.names:
+            if alias.name in _REGISTERING_NAMES:
+                return True
+            renamed = alias.asname is not None and alias.asname != alias.name
+            if renamed and alias.name in {*_REGISTERING_DECORATORS, "configuration"}:
+                return True
+
+    stack: list[ast.AST] = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.Assign, ast.AugAssign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            if any(isinstance(target, ast.Subscript) for target in targets):
+                return True
+        if isinstance(node, ast.Call) and _name(node.func) in _REGISTERING_METHODS:
+            return True
+        stack.extend(
+            child
+            for child in ast.iter_child_nodes(node)
+            if not isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda))
+        )
+    return False
+
+
+def _registered_names(
+    node: ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef, decorator: ast.expr
+) -> set[str] | None:
+    """Qualifiers and type names of the keys registered by a decorator.
+
+    Returns:
+        The names, empty if the decorator does not register,
+        or None if the module has to be imported to know them.
+    """
+    call = decorator if isinstance(decorator, ast.Call) else None
+    keywords = call.keywords if call else []
+    kind = _name(call.func if call else decorator)
+
+    if kind == "configuration" or any(keyword.arg is None for keyword in keywords):
+        return None
+    if kind not in _REGISTERING_DECORATORS:
+        return set()
+
+    # functions are registered upon their name by default, and their return type.
+    names = {node.name}
+    if not isinstance(node, ast.ClassDef) and node.returns is not None:
+        returned = _name(node.returns)
+        if returned:
+            names.add(returned)
+
+    qualifier = next((keyword.value for keyword in keywords if keyword.arg == "qualifier"), None)
+    if qualifier is not None:
+        if not isinstance(qualifier, ast.Constant) or not isinstance(qualifier.value, str):
+            return None
+        names.add(qualifier.value)
+
+    return names
+
+
+def _name(node: ast.expr) -> str | None:
+    """Name of the class or function referenced by an expression, without its module."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Subscript):
+        return _name(node.value)
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value.rpartition(".")[2].partition("[")[0] or None
+    return None
+
+
+def _import(module_name: str, report: DiscoveryReport) -> Any:
+    """Import a module to register the injectables it defines, recording its import duration."""
+    count = DependencyContainer.registrations_count()
+    start = perf_counter()
+    imported_module = importlib.import_module(module_name)
+    if module_name not in report.durations:
+        report.durations[module_name] = perf_counter() - start
+        if count != DependencyContainer.registrations_count():
+            report.registering.append(module_name)
+
+    if logger.isEnabledFor(DEBUG):
+        for name, _ in inspect.getmembers(imported_module):
+            logger.debug(f"Add component {name} in {module_name}")
+
+    return imported_module
+
+
+def _mentions_pyqure(path: str | None) -> bool:
+    """Whether the module source mentions pyqure, True if it cannot be read."""
+    if path is None:
+        return True
+    try:
+        return PRESCREEN_MARKER in Path(path).read_bytes()
+    except OSError:
+        return True
+
+
+def _describe_key(key: Key[Any], container: DependencyContainer) -> dict[str, Any]:
+    """Serializable description of a registered key."""
+    clazz, qualifier = key
+    return {
+        "type": None if clazz is None else f"{clazz.__module__}:{clazz.__qualname__}",
+        "qualifier": qualifier,
+        "primary": clazz is not None and container.primary_key(clazz) == key,
+    }
+
+
+def _read_manifest(state_file: Path) -> dict[str, Any]:
+    """Read the manifest by package, empty if it does not exist or is outdated."""
+    try:
+        content = json.loads(state_file.read_text())
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(content, dict) or content.get("version") != MANIFEST_VERSION:
+        return {}
+    return content.get("packages", {})  # type: ignore[no-any-return]
+
+
+def _write_manifest(state_file: Path, manifest: dict[str, Any]) -> None:
+    """Write atomically the manifest, not to leave it corrupted when processes run concurrently."""
+    temporary = state_file.with_name(f"{state_file.name}.{os.getpid()}.tmp")
+    temporary.write_text(json.dumps({"version": MANIFEST_VERSION, "packages": manifest}))
+    temporary.replace(state_file)
+
+
+def _stat(path: Path) -> tuple[int, int] | None:
+    """Modification time in nanoseconds and size of a file, or None if it does not exist."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _mtime(path: Path) -> int | None:
+    """Modification time in nanoseconds of a file or directory, or None if it does not exist."""
+    stat = _stat(path)
+    return stat[0] if stat else None
+
+
+def _hash(path: Path) -> str | None:
+    """Hash of the content of a file, or None if it cannot be read."""
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
 
 
 def _get_package_caller(lvl: int = 1) -> str | None:
@@ -1,7 +1,5 @@
 from typing import Any, Callable, Iterable
 
-from pyqure.utils.types import unpack_types
-
 
 class PyqureError(Exception):
     """Pyqure general error."""
@@ -15,12 +13,43 @@ class InvalidRegisteredType(DependencyError):
     """Exception raised when invalid type used to register an injectable."""
 
     def __init__(self, type_: type[Any]) -> None:
+        # imported here as the types utilities depend on the injectables, which raise pyqure errors
+        from pyqure.utils.types import unpack_types  # noqa: PLC0415
+
         super().__init__(
             f"Union types cannot be used for registered injectables:"
             f" you provide {type_}, try registering separately one of {unpack_types(type_)}."
         )
 
 
+class CircularDependencyError(DependencyError):
+    """Exception raised when an injectable depends, directly or not, on itself."""
+
+
+class FrozenContainerError(DependencyError):
+    """Exception raised when a frozen container is mutated."""
+
+
+class MissingComponents(DependencyError):
+    """Exception raised when no component is found for some of the keys resolved together."""
+
+    def __init__(self, missing: Iterable[Any]) -> None:
+        super().__init__(f"No component found based on keys: {', '.join(map(str, missing))}.")
+        self.missing = missing
+
+
+class PoolError(DependencyError):
+    """Exception raised when a pool is misused."""
+
+
+class PoolExhaustedError(PoolError):
+    """Exception raised when no pooled instance has been available in time."""
+
+
+class ScopeError(DependencyError):
+    """Exception raised when a scoped injectable is supplied outside of an active scope."""
+
+
 class InjectionError(PyqureError):
     """Injection error."""
 
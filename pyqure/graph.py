@@ -0,0 +1,169 @@
+from collections import deque
+from typing import Generic, Hashable, Iterable, Iterator, Mapping, TypeVar
+
+from pyqure.exceptions import CircularDependencyError
+
+N = TypeVar("N", bound=Hashable)
+
+
+class DependencyGraph(Generic[N]):
+    """Immutable graph of dependencies between nodes.
+
+    The edges go from a node to the nodes it depends on.
+    The orders returned are deterministic: they follow the insertion order of the nodes.
+
+    Examples:
+        >>> graph = DependencyGraph({"app": ["db", "cache"], "cache": ["db"], "db": []})
+        >>> graph.topological_order()
+        ['db', 'cache', 'app']
+        >>> graph.dependents("db")
+        ('app', 'cache')
+    """
+
+    __slots__ = ("_dependencies", "_dependents", "_order")
+
+    def __init__(self, edges: Mapping[N, Iterable[N]]) -> None:
+        self._dependencies: dict[N, tuple[N, ...]] = {}
+        dependents: dict[N, list[N]] = {}
+
+        for node, dependencies in edges.items():
+            self._dependencies[node] = tuple(dict.fromkeys(dependencies))
+            dependents.setdefault(node, [])
+            for dependency in self._dependencies[node]:
+                dependents.setdefault(dependency, []).append(node)
+                self._dependencies.setdefault(dependency, ())
+
+        self._dependents = {node: tuple(nodes) for node, nodes in dependents.items()}
+        self._order: list[N] | None = None
+
+    def __iter__(self) -> Iterator[N]:
+        return iter(self._dependencies)
+
+    def __len__(self) -> int:
+        return len(self._dependencies)
+
+    def __contains__(self, node: object) -> bool:
+        return node in self._dependencies
+
+    def dependencies(self, node: N) -> tuple[N, ...]:
+        """Nodes the node directly depends on."""
+        return self._dependencies[node]
+
+    def dependents(self, node: N) -> tuple[N, ...]:
+        """Nodes directly depending on the node."""
+        return self._dependents[node]
+
+    def transitive_dependents(self, node: N) -> list[N]:
+        """Nodes depending, directly or not, on the node, the closest first.
+
+        It's the nodes to invalidate when the node changes.
+        """
+        seen = {node}
+        found: list[N] = []
+        queue = deque([node])
+
+        while queue:
+            for dependent in self._dependents[queue.popleft()]:
+                if dependent not in seen:
+                    seen.add(dependent)
+                    found.append(dependent)
+                    queue.append(dependent)
+
+        return found
+
+    def cycles(self) -> list[list[N]]:
+        """Groups of nodes depending on each other (strongly connected components).
+
+        A node depending on itself is a cycle on its own.
+        """
+        index: dict[N, int] = {}
+        low: dict[N, int] = {}
+        stack: list[N] = []
+        on_stack: set[N] = set()
+        cycles: list[list[N]] = []
+
+        for root in self._dependencies:
+            if root in index:
+                continue
+
+            # iterative Tarjan algorithm, to not be limited by the recursion depth.
+            work = [(root, iter(self._dependencies[root]))]
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                node, dependencies = work[-1]
+                dependency = next(dependencies, None)
+
+                if dependency is None:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        if len(component) > 1 or node in self._dependencies[node]:
+                            cycles.append(component[::-1])
+                elif dependency not in index:
+                    index[dependency] = low[dependency] = len(index)
+                    stack.append(dependency)
+                    on_stack.add(dependency)
+                    work.append((dependency, iter(self._dependencies[dependency])))
+                elif dependency in on_stack:
+                    low[node] = min(low[node], index[dependency])
+
+        return cycles
+
+    def topological_order(self) -> list[N]:
+        """Nodes ordered so that each node comes after its dependencies.
+
+        The reversed order is the one to follow to shut down the nodes.
+
+        Raises:
+            CircularDependencyError: if some nodes depend on each other.
+        """
+        if self._order is None:
+            remaining = {
+                node: len(dependencies) for node, dependencies in self._dependencies.items()
+            }
+            queue = deque(node for node, count in remaining.items() if count == 0)
+            order: list[N] = []
+
+            while queue:
+                node = queue.popleft()
+                order.append(node)
+                for dependent in self._dependents[node]:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        queue.append(dependent)
+
+            if len(order) != len(self._dependencies):
+                raise CircularDependencyError(_describe(self.cycles()))
+
+            self._order = order
+
+        return list(self._order)
+
+    def check(self) -> None:
+        """Check the graph has no cycle.
+
+        Raises:
+            CircularDependencyError: if some nodes depend on each other.
+        """
+        cycles = self.cycles()
+        if cycles:
+            raise CircularDependencyError(_describe(cycles))
+
+
+def _describe(cycles: list[list[N]]) -> str:
+    """Describe the cycles for an error message."""
+    return "Circular dependencies detected: " + "; ".join(
+        " -> ".join(str(node) for node in [*cycle, cycle[0]]) for cycle in cycles
+    )
@@ -1,11 +1,40 @@
+from asyncio import Future, ensure_future, get_running_loop, shield
+from collections import deque
+from contextlib import AsyncExitStack, ExitStack
+from contextvars import ContextVar, Token
 from dataclasses import dataclass, field
-from typing import Callable, Protocol, TypeVar
+from inspect import isawaitable, iscoroutinefunction
+from threading import Condition, Lock, RLock, get_ident, local
+from time import monotonic
+from types import TracebackType
+from typing import Annotated, Any, Awaitable, Callable, Generic, Iterator, Protocol, TypeVar
+from weakref import finalize
 
-from typing_extensions import override
+from typing_extensions import Self, override
+
+from pyqure.exceptions import (
+    CircularDependencyError,
+    PoolError,
+    PoolExhaustedError,
+    ScopeError,
+)
 
 T = TypeVar("T", covariant=True)
 
 
+class Unset:
+    """Used as a sentinel to define that a lazy value has not been built yet."""
+
+
+# singletons awaited by each thread blocked on their construction, to detect deadlocks.
+_waiting: dict[int, "Singleton[Any]"] = {}
+_waiting_lock = Lock()
+# ids of the asynchronous singletons being built by the current task and its parents.
+_async_building: ContextVar[frozenset[int]] = ContextVar("_async_building", default=frozenset())
+# scope active in the current context, caching the scoped injectables instances.
+_current_scope: ContextVar["Scope | None"] = ContextVar("_current_scope", default=None)
+
+
 class Qualifier(str):
     """Marker to specify alias for injectable."""
 
@@ -23,6 +52,46 @@ def qualifier(alias: str) -> Qualifier:
     return Qualifier(alias)
 
 
+class LazyMarker:
+    """Marker of the parameters to inject lazily, see `Lazy`."""
+
+
+LAZY = LazyMarker()
+
+Lazy = Annotated[T, LAZY]
+"""Annotation of a parameter injected as a `LazyProxy`, its injectable being supplied on first use.
+
+Examples:
+    ```python
+    @inject
+    def handle(event: Event, audit: Lazy[AuditLog]) -> None:
+        ...
+    ```
+"""
+
+
+class ProviderMarker:
+    """Marker of the parameters to inject as providers, see `Provider`."""
+
+
+PROVIDER = ProviderMarker()
+
+Provider = Annotated[Callable[[], T], PROVIDER]
+"""Annotation of a parameter injected as a function supplying the injectable on each call.
+
+The injectable is resolved once for the call injected, so the provider goes straight to its supply:
+it's meant to build many instances of a factory inside a loop.
+
+Examples:
+    ```python
+    @inject
+    def import_rows(rows: list[Row], new_entity: Provider[Entity]) -> None:
+        for row in rows:
+            entity = new_entity()
+    ```
+"""
+
+
 class Injectable(Protocol[T]):
     """Injectable object contrat."""
 
@@ -30,6 +99,18 @@ class Injectable(Protocol[T]):
         """Supply the injectable component/value."""
 
 
+class AsyncInjectable(Protocol[T]):
+    """Asynchronous injectable object contrat."""
+
+    async def supply(self) -> T:
+        """Supply the injectable component/value."""
+
+
+def is_async(injectable: Injectable[Any] | AsyncInjectable[Any]) -> bool:
+    """Check whether the injectable supplies its value asynchronously or not."""
+    return iscoroutinefunction(injectable.supply)
+
+
 @dataclass(slots=True)
 class Constant(Injectable[T]):
     """Component to create Injectable constant.
@@ -51,17 +132,72 @@ class Singleton(Injectable[T]):
 
     Singleton is lazy evaluated by design, the component is only instantiated
     when needed.
+
+    The construction is thread safe: a single thread builds the value while the others wait for it.
+    Once built, the value is read without any lock.
+
+    Raises:
+        CircularDependencyError: if the construction requires, directly or not, the singleton itself.
     """
 
     supplier: Callable[..., T]
-    value: T | None = field(init=False, default=None)
+    value: Any = field(init=False, default=Unset)
+    _lock: Lock = field(init=False, default_factory=Lock, repr=False, compare=False)
+    _builder: int | None = field(init=False, default=None, repr=False, compare=False)
 
     @override
     def supply(self) -> T:
-        if self.value is None:
-            self.value = self.supplier()
+        value = self.value
+        if value is Unset:
+            return self._build()
 
-        return self.value
+        return value  # type: ignore[no-any-return]
+
+    def _build(self) -> T:
+        """Build the value, only once whatever the number of threads asking for it."""
+        thread = get_ident()
+        if self._builder == thread:
+            raise CircularDependencyError(f"{self._name} depends on itself.")
+
+        if not self._lock.acquire(blocking=False):
+            self._wait(thread)
+
+        try:
+            if self.value is Unset:
+                self._builder = thread
+                try:
+                    self.value = self.supplier()
+                finally:
+                    self._builder = None
+
+            return self.value  # type: ignore[no-any-return]
+        finally:
+            self._lock.release()
+
+    def _wait(self, thread: int) -> None:
+        """Wait for the thread building the value, unless it is waiting, directly or not, for us."""
+        with _waiting_lock:
+            builder, seen = self._builder, set()
+            while builder is not None and builder not in seen:
+                if builder == thread:
+                    raise CircularDependencyError(
+                        f"{self._name} is awaited by its own construction in another thread."
+                    )
+                seen.add(builder)
+                awaited = _waiting.get(builder)
+                builder = awaited._builder if awaited is not None else None
+
+            _waiting[thread] = self
+
+        try:
+            self._lock.acquire()
+        finally:
+            with _waiting_lock:
+                del _waiting[thread]
+
+    @property
+    def _name(self) -> str:
+        return f"Singleton({getattr(self.supplier, '__qualname__', self.supplier)})"
 
 
 @dataclass(slots=True)
@@ -76,3 +212,553 @@ class Factory(Injectable[T]):
     @override
     def supply(self) -> T:
         return self.supplier()
+
+
+@dataclass(slots=True)
+class AsyncSingleton(AsyncInjectable[T]):
+    """Asynchronous singleton injectable.
+
+    As `Singleton`, it's lazy evaluated and built only once:
+    all the tasks awaiting it while it's being built share the same construction.
+
+    Raises:
+        CircularDependencyError: if the construction requires, directly or not, the singleton itself.
+    """
+
+    supplier: Callable[..., Awaitable[T]]
+    value: Any = field(init=False, default=Unset)
+    _building: "Future[T] | None" = field(init=False, default=None, repr=False, compare=False)
+
+    @override
+    async def supply(self) -> T:
+        value = self.value
+        if value is not Unset:
+            return value  # type: ignore[no-any-return]
+
+        if id(self) in _async_building.get():
+            raise CircularDependencyError(
+                f"AsyncSingleton({getattr(self.supplier, '__qualname__', self.supplier)})"
+                f" depends on itself."
+            )
+
+        building = self._building
+        if building is None or building.get_loop() is not get_running_loop():
+            building = self._building = ensure_future(self._build())
+
+        # shielded so a cancelled task does not cancel the construction shared with the others.
+        return await shield(building)
+
+    async def _build(self) -> T:
+        _async_building.set(_async_building.get() | {id(self)})
+        try:
+            self.value = await self.supplier()
+            return self.value  # type: ignore[no-any-return]
+        finally:
+            self._building = None
+
+
+@dataclass(slots=True)
+class AsyncFactory(AsyncInjectable[T]):
+    """Asynchronous factory injectable.
+
+    Each time the injectable is needed, a new instance is created.
+    """
+
+    supplier: Callable[..., Awaitable[T]]
+
+    @override
+    async def supply(self) -> T:
+        return await self.supplier()
+
+
+@dataclass(slots=True)
+class Scoped(Injectable[T]):
+    """Scoped injectable.
+
+    A single instance is built by active scope (see `Scope`), and disposed when the scope exits.
+    By default, the instance is disposed by calling its `close` method if any,
+    or its `aclose` one when the scope is exited asynchronously.
+
+    Examples:
+        >>> container[Class(Session)] = Scoped(Session, dispose=Session.rollback)
+        >>> with container.scope():
+        ...     assert container[Class(Session)] is container[Class(Session)]
+
+    Raises:
+        ScopeError: if supplied outside of an active scope.
+    """
+
+    supplier: Callable[..., T]
+    dispose: Callable[[T], Any] | None = None
+
+    @override
+    def supply(self) -> T:
+        scope = _current_scope.get()
+        if scope is None:
+            raise ScopeError(
+                f"Scoped({getattr(self.supplier, '__qualname__', self.supplier)})"
+                f" is supplied outside of a scope, use `container.scope()`."
+            )
+
+        return scope.get(self)
+
+
+class Scope:
+    """Scope caching an instance of each `Scoped` injectable, while it's active.
+
+    The scope is active within its context, as context manager or asynchronous context manager.
+    It's propagated by `contextvars`: to the asyncio tasks created inside it,
+    and to the threads run with a copy of the context (ex: `asyncio.to_thread`).
+    On exit, the instances are disposed in the reverse order of their creation.
+
+    Examples:
+        >>> async with container.scope():
+        ...     await handle(request)
+    """
+
+    __slots__ = ("_building", "_instances", "_lock", "_token")
+
+    def __init__(self) -> None:
+        self._instances: dict[int, tuple[Scoped[Any], Any]] = {}
+        self._building: set[int] = set()
+        self._lock = RLock()
+        self._token: Token[Scope | None] | None = None
+
+    def get(self, scoped: Scoped[T]) -> T:
+        """Instance of the scoped injectable, built on its first need within the scope.
+
+        Raises:
+            CircularDependencyError: if the construction requires, directly or not, the injectable itself.
+        """
+        found = self._instances.get(id(scoped))
+        if found is None:
+            with self._lock:
+                found = self._instances.get(id(scoped))
+                if found is None:
+                    if id(scoped) in self._building:
+                        raise CircularDependencyError(
+                            f"Scoped({getattr(scoped.supplier, '__qualname__', scoped.supplier)})"
+                            f" depends on itself."
+                        )
+                    self._building.add(id(scoped))
+                    try:
+                        found = self._instances[id(scoped)] = (scoped, scoped.supplier())
+                    finally:
+                        self._building.discard(id(scoped))
+
+        return found[1]
+
+    def close(self) -> None:
+        """Dispose the instances built within the scope."""
+        with ExitStack() as stack:
+            for scoped, value in self._release():
+                stack.callback(scoped.dispose or _close, value)
+
+    async def aclose(self) -> None:
+        """Dispose the instances built within the scope, awaiting the asynchronous disposals."""
+        async with AsyncExitStack() as stack:
+            for scoped, value in self._release():
+                stack.push_async_callback(_adispose, scoped.dispose or _aclose, value)
+
+    def __enter__(self) -> Self:
+        self._activate()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self._deactivate()
+        self.close()
+
+    async def __aenter__(self) -> Self:
+        self._activate()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self._deactivate()
+        await self.aclose()
+
+    def _activate(self) -> None:
+        if self._token is not None:
+            raise ScopeError("The scope is already active.")
+        self._token = _current_scope.set(self)
+
+    def _deactivate(self) -> None:
+        if self._token is not None:
+            _current_scope.reset(self._token)
+            self._token = None
+
+    def _release(self) -> list[tuple[Scoped[Any], Any]]:
+        with self._lock:
+            instances = list(self._instances.values())
+            self._instances.clear()
+        return instances
+
+
+@dataclass(frozen=True, slots=True)
+class PoolStats:
+    """Statistics of a pool.
+
+    Attributes:
+        size: the number of instances built and not disposed.
+        idle: the number of instances waiting to be checked out.
+        in_use: the number of instances checked out.
+        checkouts: the number of instances checked out so far.
+        misses: the number of checkouts which had to build an instance.
+        waits: the number of checkouts which had to wait for an instance.
+        wait_time: the total time in seconds spent waiting for instances.
+        evictions: the number of idle instances disposed for having been idle too long.
+        invalidations: the number of instances disposed for having failed their validation.
+    """
+
+    size: int
+    idle: int
+    in_use: int
+    checkouts: int
+    misses: int
+    waits: int
+    wait_time: float
+    evictions: int
+    invalidations: int
+
+    @property
+    def utilization(self) -> float:
+        """Ratio of the instances in use among the ones built."""
+        return self.in_use / self.size if self.size else 0.0
+
+
+@dataclass(slots=True)
+class Pooled(Injectable[T]):
+    """Pooled injectable, for resources expensive to build but not safe to share.
+
+    Each supply checks out an instance, built only when none is idle and the pool is not full.
+    Injected by `@inject`, the instance is returned to the pool when the call returns,
+    so it must not be kept beyond. Otherwise, it has to be returned with `release`.
+    When the pool is full, the checkout blocks until an instance is returned.
+    Instances failing the validation on checkout, or idle for more than `max_idle` seconds,
+    are disposed like the scoped ones (see `Scoped`).
+
+    Examples:
+        >>> container[Class(Parser)] = Pooled(Parser, max_size=4, validate=Parser.is_alive)
+        >>> @component(lifetime=partial(Pooled, max_size=4))
+        ... class Session: ...
+
+    A registered component keeps the instances injected beyond its construction,
+    so pooled instances are only injected in the functions decorated by `@inject`.
+
+    Raises:
+        PoolExhaustedError: if no instance is available before the timeout.
+    """
+
+    supplier: Callable[..., T]
+    max_size: int = 8
+    validate: Callable[[T], bool] | None = None
+    max_idle: float | None = None
+    timeout: float | None = None
+    dispose: Callable[[T], Any] | None = None
+    _idle: deque[tuple[float, T]] = field(
+        init=False, default_factory=deque, repr=False, compare=False
+    )
+    _lent: dict[int, Any] = field(init=False, default_factory=dict, repr=False, compare=False)
+    _condition: Condition = field(init=False, default_factory=Condition, repr=False, compare=False)
+    _counters: dict[str, Any] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._counters = dict.fromkeys(
+            ("size", "checkouts", "misses", "waits", "evictions", "invalidations"), 0
+        )
+        self._counters["wait_time"] = 0.0
+
+    @override
+    def supply(self) -> T:
+        value = self._checkout(retry=False)
+        while value is not Unset:
+            if self.validate is None or self.validate(value):
+                return value  # type: ignore[no-any-return]
+            self._discard(value, "invalidations")
+            value = self._checkout(retry=True)
+        return self._build()
+
+    def release(self, value: Any) -> None:
+        """Return an instance checked out to the pool.
+
+        Raises:
+            PoolError: if the instance is not checked out of this pool.
+        """
+        with self._condition:
+            if self._lent.pop(id(value), Unset) is not value:
+                raise PoolError(f"{value!r} is not checked out of {self._name}.")
+            self._idle.append((monotonic(), value))
+            self._condition.notify()
+
+    def close(self) -> None:
+        """Dispose the idle instances."""
+        with self._condition:
+            idle = [value for _, value in self._idle]
+            self._idle.clear()
+            self._counters["size"] -= len(idle)
+        for value in idle:
+            (self.dispose or _close)(value)
+
+    def stats(self) -> PoolStats:
+        """Snapshot of the pool statistics."""
+        with self._condition:
+            return PoolStats(idle=len(self._idle), in_use=len(self._lent), **self._counters)
+
+    def _checkout(self, retry: bool) -> Any:
+        """Check out an idle instance, or reserve the place to build one (returning `Unset`).
+
+        A retry, after an instance has failed its validation, is not counted again.
+        """
+        start = monotonic()
+        with self._condition:
+            evicted = self._evict(start)
+            counters = self._counters
+            if not self._idle and counters["size"] >= self.max_size:
+                counters["waits"] += not retry
+                while not self._idle and counters["size"] >= self.max_size:
+                    remaining = (
+                        None if self.timeout is None else self.timeout - (monotonic() - start)
+                    )
+                    if (remaining is not None and remaining <= 0) or not self._condition.wait(
+                        remaining
+                    ):
+                        raise PoolExhaustedError(
+                            f"No instance of {self._name} available in {self.timeout} seconds."
+                        )
+                counters["wait_time"] += monotonic() - start
+
+            counters["checkouts"] += not retry
+            if self._idle:
+                value: Any = self._idle.pop()[1]
+                self._lent[id(value)] = value
+            else:
+                counters["size"] += 1
+                counters["misses"] += 1
+                value = Unset
+
+        for instance in evicted:
+            (self.dispose or _close)(instance)
+        return value
+
+    def _build(self) -> T:
+        try:
+            value = self.supplier()
+        except BaseException:
+            with self._condition:
+                self._counters["size"] -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._lent[id(value)] = value
+        return value
+
+    def _discard(self, value: Any, reason: str) -> None:
+        with self._condition:
+            del self._lent[id(value)]
+            self._counters["size"] -= 1
+            self._counters[reason] += 1
+            self._condition.notify()
+        (self.dispose or _close)(value)
+
+    def _evict(self, now: float) -> list[T]:
+        """Remove the instances idle for too long, the oldest being first, to dispose them."""
+        evicted: list[T] = []
+        while self._idle and self.max_idle is not None and now - self._idle[0][0] > self.max_idle:
+            evicted.append(self._idle.popleft()[1])
+        self._counters["size"] -= len(evicted)
+        self._counters["evictions"] += len(evicted)
+        return evicted
+
+    @property
+    def _name(self) -> str:
+        return f"Pooled({getattr(self.supplier, '__qualname__', self.supplier)})"
+
+
+@dataclass(slots=True)
+class ThreadLocal(Injectable[T]):
+    """Thread local injectable, for resources expensive to build but not thread safe.
+
+    A single instance is built by thread, on its first supply there.
+    Once built, the instance of the thread is read without any lock.
+    When the thread ends, its instance is disposed like the scoped ones (see `Scoped`),
+    by the thread collecting it.
+
+    Examples:
+        >>> container[Class(Connection)] = ThreadLocal(Connection)
+        >>> @component(lifetime=ThreadLocal)
+        ... class Parser: ...
+
+    Raises:
+        CircularDependencyError: if the construction requires, directly or not, the injectable itself.
+    """
+
+    supplier: Callable[..., T]
+    dispose: Callable[[T], Any] | None = None
+    _local: local = field(init=False, default_factory=local, repr=False, compare=False)
+
+    @override
+    def supply(self) -> T:
+        try:
+            return self._local.value  # type: ignore[no-any-return]
+        except AttributeError:
+            return self._build()
+
+    def _build(self) -> T:
+        thread_local = self._local
+        if getattr(thread_local, "building", False):
+            raise CircularDependencyError(
+                f"ThreadLocal({getattr(self.supplier, '__qualname__', self.supplier)})"
+                f" depends on itself."
+            )
+
+        thread_local.building = True
+        try:
+            value = self.supplier()
+        finally:
+            thread_local.building = False
+
+        # the guard is dropped with the thread local data, when the thread ends.
+        thread_local.guard = _Guard()
+        finalize(thread_local.guard, self.dispose or _close, value)
+        thread_local.value = value
+        return value
+
+
+@dataclass(frozen=True, slots=True)
+class Proxied(Injectable[T]):
+    """Injectable supplying a `LazyProxy` of another one, only supplied on the proxy first use.
+
+    The injectable is not a dependency of the construction anymore:
+    it does not appear in the dependencies graph, and may refer back to the dependent one.
+    """
+
+    injectable: Injectable[T]
+
+    @override
+    def supply(self) -> T:
+        return LazyProxy(self.injectable)  # type: ignore[return-value]
+
+
+@dataclass(frozen=True, slots=True)
+class Provided(Injectable[Callable[[], T]]):
+    """Injectable supplying the `supply` method of another one, see `Provider`."""
+
+    injectable: Injectable[T]
+
+    @override
+    def supply(self) -> Callable[[], T]:
+        return self.injectable.supply
+
+
+class LazyProxy(Generic[T]):
+    """Transparent proxy of an injectable, supplied on the first use of the proxy then kept.
+
+    The attributes, the calls and the usual operators are forwarded to the supplied value,
+    `isinstance` included. The proxy is meant to be used by the call it's injected into:
+    used concurrently the first time, a factory may be supplied more than once.
+    """
+
+    __slots__ = ("_LazyProxy__injectable", "_LazyProxy__value")
+
+    def __init__(self, injectable: Injectable[T]) -> None:
+        object.__setattr__(self, "_LazyProxy__injectable", injectable)
+        object.__setattr__(self, "_LazyProxy__value", Unset)
+
+    def __resolve(self) -> Any:
+        value = self.__value
+        if value is Unset:
+            value = self.__injectable.supply()
+            object.__setattr__(self, "_LazyProxy__value", value)
+        return value
+
+    @property  # type: ignore[misc]
+    def __class__(self) -> type[Any]:
+        return type(self.__resolve())
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.__resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.__resolve(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self.__resolve(), name)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        """Call the supplied value."""
+        return self.__resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        if self.__value is Unset:
+            return f"LazyProxy({self.__injectable!r})"
+        return repr(self.__value)
+
+    def __str__(self) -> str:
+        return str(self.__resolve())
+
+    def __bool__(self) -> bool:
+        return bool(self.__resolve())
+
+    def __eq__(self, other: object) -> bool:
+        return self.__resolve() == other  # type: ignore[no-any-return]
+
+    def __hash__(self) -> int:
+        return hash(self.__resolve())
+
+    def __len__(self) -> int:
+        return len(self.__resolve())
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.__resolve())
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self.__resolve()
+
+    def __getitem__(self, key: Any) -> Any:
+        return self.__resolve()[key]
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self.__resolve()[key] = value
+
+    def __delitem__(self, key: Any) -> None:
+        del self.__resolve()[key]
+
+    def __enter__(self) -> Any:
+        return self.__resolve().__enter__()
+
+    def __exit__(self, *exc_info: Any) -> Any:
+        return self.__resolve().__exit__(*exc_info)
+
+
+class _Guard:
+    """Object only referenced by the thread local data, to be notified of its release."""
+
+    __slots__ = ("__weakref__",)
+
+
+def _close(value: Any) -> None:
+    close = getattr(value, "close", None)
+    if callable(close):
+        close()
+
+
+async def _aclose(value: Any) -> None:
+    close = getattr(value, "aclose", None) or getattr(value, "close", None)
+    if callable(close):
+        await _adispose(close)
+
+
+async def _adispose(dispose: Callable[..., Any], *args: Any) -> None:
+    result = dispose(*args)
+    if isawaitable(result):
+        await result
@@ -1,5 +1,6 @@
 from functools import wraps
-from inspect import Parameter, isclass, signature
+from inspect import Parameter, isclass, iscoroutinefunction, isfunction, signature
+from pathlib import Path
 from typing import (
     Any,
     Callable,
@@ -9,23 +10,28 @@ from typing import (
     overload,
 )
 
+from pyqure.compiler import compiled_call
 from pyqure.container import Alias, DependencyContainer, Key, dc
 from pyqure.discover import _get_package_caller, discover
-from pyqure.exceptions import InjectionError, MissingDependencies
+from pyqure.exceptions import InjectionError
 from pyqure.injectables import (
+    AsyncFactory,
+    AsyncSingleton,
     Factory,
     Injectable,
     Qualifier,
     Singleton,
 )
-from pyqure.utils.function import NoDefault, Param, Parameters, ParamName
-from pyqure.utils.types import is_interface, unpack_types
+from pyqure.plan import Checkouts, DeferredPlan, release
+from pyqure.utils.function import INJECTION_PLAN_ATTRIBUTE
+from pyqure.utils.types import is_interface
 
 T = TypeVar("T")
 P = ParamSpec("P")
 R = ParamSpec("R")
 
 Service = type[T] | Callable[..., T]
+Lifetime = Callable[[Callable[..., Any]], Injectable[Any]]
 
 
 def create_injectable(
@@ -43,11 +49,9 @@ def create_injectable(
     Examples:
         >>> container[Key(Service, "my-service")] = create_injectable(Service)
     """
-    service_ = _create_new_service_call(service, container)
-    if is_factory:
-        return Factory(service_)
+    service_ = _create_new_service_call(service, container, retains=True)
 
-    return Singleton(service_)
+    return _injectable_type(service, is_factory)(service_)
 
 
 @overload
@@ -64,20 +68,25 @@ def component(
     container: DependencyContainer = dc,
     qualifier: Qualifier | str | None = None,
     primary: bool = False,
+    lifetime: Lifetime | None = None,
+    tags: Sequence[str] = (),
 ) -> Callable[[Service[T]], Service[T]]: ...
 
 
-def component(
+def component(  # noqa: PLR0913
     service: Service[T] | None = None,
     *,
     container: DependencyContainer = dc,
     qualifier: Qualifier | str | None = None,
     primary: bool = False,
+    lifetime: Lifetime | None = None,
+    tags: Sequence[str] = (),
 ) -> Service[T] | Callable[[Service[T]], Service[T]]:
     """Register a class or a function as a component (`Singleton` injectable).
 
     * Upon class, all parent classes are automatically registered.
     * Upon **typed** function, all parent classes of the return are automatically registered.
+    * Upon coroutine function, it's registered as `AsyncSingleton` injectable.
 
     Args:
         service: function or class to register
@@ -85,6 +94,9 @@ def component(
         qualifier: can be passed to specify an alias to the component,
          and identify it for injection over other components of same type.
         primary: allow to prioritize component over others of same type if no qualifier set for injection.
+        lifetime: the injectable type to register the component with instead of `Singleton`,
+         ex: `Scoped` to build it once by scope.
+        tags: labels to find the component with others, see `DependencyContainer.get_tagged`.
 
     Examples:
         >>> @component
@@ -92,10 +104,23 @@ def component(
 
         >>> @component(qualifier="foo")
         ... class FooService(Service): ...
+
+        >>> @component(lifetime=Scoped)
+        ... class UnitOfWork: ...
+
+        >>> @component(tags=["event-handler"])
+        ... class InvoiceHandler: ...
     """
 
     def decorator(serv: Callable[P, T] | type[T]) -> Callable[P, T] | type[T]:
-        _register(serv, container=container, is_factory=False, qualifier=qualifier, primary=primary)
+        _register(
+            serv,
+            container=container,
+            qualifier=qualifier,
+            primary=primary,
+            lifetime=_injectable_type(serv, is_factory=False, lifetime=lifetime),
+            tags=tags,
+        )
         return serv
 
     if service is None:
@@ -118,6 +143,7 @@ def factory(
     container: DependencyContainer = dc,
     qualifier: Qualifier | str | None = None,
     primary: bool = False,
+    tags: Sequence[str] = (),
 ) -> Callable[[Service[T]], Service[T]]: ...
 
 
@@ -127,11 +153,13 @@ def factory(
     container: DependencyContainer = dc,
     qualifier: Qualifier | str | None = None,
     primary: bool = False,
+    tags: Sequence[str] = (),
 ) -> Service[T] | Callable[[Service[T]], Service[T]]:
     """Register a class or a function as a factory (`Factory` injectable).
 
     * Upon class, all parent classes are automatically registered.
     * Upon **typed** function, all parent classes of the return are automatically registered.
+    * Upon coroutine function, it's registered as `AsyncFactory` injectable.
 
     Args:
         service: function or class to register
@@ -140,10 +168,18 @@ def factory(
          and identify it for injection over other components of same type.
          For function, qualifier default value is the function name.
         primary: allow to prioritize component over others of same type if no qualifier set for injection.
+        tags: labels to find the factory with others, see `DependencyContainer.get_tagged`.
     """
 
     def decorator(serv: Service[T]) -> Service[T]:
-        _register(serv, container=container, is_factory=True, qualifier=qualifier, primary=primary)
+        _register(
+            serv,
+            container=container,
+            qualifier=qualifier,
+            primary=primary,
+            lifetime=_injectable_type(serv, is_factory=True),
+            tags=tags,
+        )
         return serv
 
     if service is None:
@@ -169,15 +205,25 @@ def configuration(
     container: DependencyContainer = dc,
     autoload: bool = False,
     packages_to_load: list[str] | None = None,
+    state_file: Path | str | None = None,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    max_depth: int | None = None,
+    prescreen: bool = False,
 ) -> Callable[[ConfigurationFunc], ConfigurationFunc]: ...
 
 
-def configuration(
+def configuration(  # noqa: PLR0913
     config: ConfigurationFunc | None = None,
     *,
     container: DependencyContainer = dc,
     autoload: bool = False,
     packages_to_load: list[str] | None = None,
+    state_file: Path | str | None = None,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    max_depth: int | None = None,
+    prescreen: bool = False,
 ) -> ConfigurationFunc | Callable[[ConfigurationFunc], ConfigurationFunc]:
     """Define a function as container configuration.
 
@@ -189,6 +235,11 @@ def configuration(
     Args:
         autoload: whether to discover injectables or not.
         packages_to_load: from where perform the discovering.
+        state_file: the file persisting the discovering manifest, to speed up the next ones.
+        include: the patterns of the modules to discover, all of them if empty.
+        exclude: the patterns of the modules and packages not to discover.
+        max_depth: the depth of the sub-packages to walk.
+        prescreen: whether to skip the modules whose source never mentions pyqure.
         container: the container where registering the service.
         config: configuration function.
 
@@ -209,7 +260,15 @@ def configuration(
         if autoload:
             packages: Sequence[str | None] = packages_to_load or [_get_package_caller(2)]  # type: ignore[list-item]
             for pkg in packages:
-                discover(pkg)
+                discover(
+                    pkg,
+                    container=container,
+                    state_file=state_file,
+                    include=include,
+                    exclude=exclude,
+                    max_depth=max_depth,
+                    prescreen=prescreen,
+                )
         configs(container)
         return configs
 
@@ -242,6 +301,12 @@ def inject(
         * does a service is registered by this alias key
         * does a service is registered by this type and parameter name key
         * does the parameter is annotated with a qualifier ex: param: Annotated[Service, qualifier("alias")], so look up for a service with Key(Service, "alias")
+        * does the parameter is a `list[Service]` or a `dict[str, Service]`, so all the services registered for the type are injected, see `DependencyContainer.get_all`
+
+    A parameter annotated `Provider[Service]` is injected with a function supplying the service found
+    on each call, see `Provider`.
+
+    Upon coroutine function, the asynchronous injectables are awaited concurrently before the call.
     """
 
     def decorator(service_: Callable[P, T]) -> Callable[..., T]:
@@ -253,109 +318,120 @@ def inject(
     return decorator(service)
 
 
-def _register(
+def _register(  # noqa: PLR0913
     service: Service[T],
     *,
     container: DependencyContainer,
     qualifier: Qualifier | str | None,
     primary: bool,
-    is_factory: bool = False,
+    lifetime: Lifetime,
+    tags: Sequence[str],
 ) -> Service[T]:
     """**Internal** function to register a service as injectable inside the container."""
-    service_ = _create_new_service_call(service, container)
+    service_ = _create_new_service_call(service, container, retains=True)
     key = _create_key(service, qualifier)
 
-    if is_factory:
-        container.register(key, Factory(service_), primary=primary)
-    else:
-        container.register(key, Singleton(service_), primary=primary)
+    container.register(key, lifetime(service_), primary=primary, tags=tags)
     return service_
 
 
+def _injectable_type(
+    service: Service[T], is_factory: bool, lifetime: Lifetime | None = None
+) -> Callable[[Callable[..., Any]], Injectable[T]]:
+    """**Internal** function choosing the injectable type for the service."""
+    if lifetime is not None:
+        if iscoroutinefunction(service):
+            raise InjectionError(
+                f"The service {service} provided is invalid:"
+                f" a lifetime cannot be set upon coroutine function."
+            )
+        return lifetime
+
+    if iscoroutinefunction(service):
+        return AsyncFactory if is_factory else AsyncSingleton  # type: ignore[return-value]
+
+    return Factory if is_factory else Singleton
+
+
 def _create_key(service: Service[T], qualifier: Qualifier | str | None) -> Key[T]:
     """**Internal** function to create the key of the service."""
     if isclass(service):
         return Key(service, qualifier)
 
-    return_type = signature(service).return_annotation
+    return_type = _return_type(service)
 
     if return_type in (Any, Parameter.empty):
         return Alias(qualifier or service.__name__)
     return Key(return_type, qualifier or service.__name__)
 
 
+def _return_type(service: Callable[..., Any]) -> Any:
+    """**Internal** function reading the return annotation of the service.
+
+    The annotations of a plain function are read directly, without parsing its whole signature.
+    """
+    if isfunction(service) and not hasattr(service, "__wrapped__"):
+        return service.__annotations__.get("return", Parameter.empty)
+    return signature(service).return_annotation
+
+
 def _create_new_service_call(
-    service: Service[T], container: DependencyContainer
+    service: Service[T], container: DependencyContainer, *, retains: bool = False
 ) -> Service[T] | Callable[..., T]:
-    """Create a new service function callable to be either called by its arguments or by injection."""
+    """Create a new service function callable to be either called by its arguments or by injection.
+
+    The service retains its arguments when it builds a component, see `InjectionPlan`.
+    """
     if isclass(service) and is_interface(service):
         raise InjectionError(
             f"The service {service} provided is invalid:"
             f" it's impossible to instantiate abstract or protocol classes."
         )
-    parameters = Parameters(service)
+    # the compiled services are called without any reflection, see `pyqure.compiler`.
+    compiled = compiled_call(service, container)
+    if compiled is not None:
+        return compiled
+
+    # the signature is parsed on the first call, the services never called cost no reflection.
+    deferred = DeferredPlan(service, container, retains=retains)
+
+    if iscoroutinefunction(service):
+
+        @wraps(service)
+        async def async_decorator(*args: Any, **kwargs: Any) -> Any:
+            plan = deferred.plan or deferred.get()
+            if plan.binds(args, kwargs):
+                return await service(*args, **kwargs)
+
+            checkouts: Checkouts = []
+            call_args, call_kwargs = await plan.aresolve(args, kwargs, checkouts)
+            if not checkouts:
+                return await service(*call_args, **call_kwargs)
+            try:
+                return await service(*call_args, **call_kwargs)
+            finally:
+                release(checkouts)
+
+        setattr(async_decorator, INJECTION_PLAN_ATTRIBUTE, deferred)
+        return async_decorator  # type: ignore[return-value]
 
     @wraps(service)
     def decorator(*args: Any, **kwargs: Any) -> T:
+        plan = deferred.plan or deferred.get()
         # If it can be called normally
-        if _is_callable_with_binding(service, *args, **kwargs):
+        if plan.binds(args, kwargs):
             return service(*args, **kwargs)
 
-        # else we search to inject the dependencies
-        submitted_args = parameters.partial_bind(args, kwargs)
-        all_args = (
-            _resolve_arguments_injectable(parameters.missing(kwargs=submitted_args), container)
-            | submitted_args
-        )
-
-        missing = set(parameters.mandatory) - set(all_args)
-
-        if missing:
-            raise MissingDependencies(service, missing)
-
-        return service(**all_args)
-
+        # else we inject the dependencies following the plan
+        checkouts: Checkouts = []
+        call_args, call_kwargs = plan.resolve(args, kwargs, checkouts)
+        if not checkouts:
+            return service(*call_args, **call_kwargs)
+        # the pooled instances are returned once the call is done
+        try:
+            return service(*call_args, **call_kwargs)
+        finally:
+            release(checkouts)
+
+    setattr(decorator, INJECTION_PLAN_ATTRIBUTE, deferred)
     return decorator
-
-
-def _resolve_arguments_injectable(
-    arguments: dict[ParamName, Param], container: DependencyContainer
-) -> dict[ParamName, Any]:
-    """Resolve for each argument, the available injectable value corresponding to it if it exists.
-
-    Returns:
-        A dict of arguments with their value for injection to the service.
-    """
-    resolved: dict[ParamName, Any] = {}
-
-    for name, arg in arguments.items():
-        if Alias(name) in container:
-            resolved[name] = container[Alias(name)]
-            continue
-
-        for type_ in unpack_types(arg.type):
-            if Key(type_, name) in container:
-                resolved[name] = container[Key(type_, name)]
-                continue
-            if Key(type_, arg.qualifier) in container:
-                resolved[name] = container[Key(type_, arg.qualifier)]
-                continue
-
-        if name not in resolved and arg.default is not NoDefault:
-            resolved[name] = arg.default
-
-    return resolved
-
-
-def _is_callable_with_binding(f: Callable[..., Any], *args: Any, **kwargs: Any) -> bool:
-    """Check whether the function is callable with this arguments mapping.
-
-    Returns:
-         True if that's the case, otherwise False.
-    """
-    try:
-        signature(f).bind(*args, **kwargs)
-    except TypeError:
-        return False
-    else:
-        return True
@@ -0,0 +1,203 @@
+"""Observers of the containers activity, to measure the dependency injection cost.
+
+An observer is set upon a container, with `DependencyContainer(observer=...)` or `container.observe`.
+Without observer, the only cost is a check of its absence.
+"""
+
+import math
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from threading import Lock
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Callable, Literal, Protocol
+
+from typing_extensions import override
+
+from pyqure.injectables import AsyncInjectable, Injectable
+
+if TYPE_CHECKING:
+    from pyqure.container import Key
+
+LookupPath = Literal["override", "registered", "primary", "parent", "miss"]
+"""Way a key has been found inside a container, or not."""
+
+
+class Observer(Protocol):
+    """Receiver of the containers events.
+
+    An observer may also define a `sampled() -> bool` method, asked before each event
+    is measured: when it returns False, the event is neither measured nor notified.
+    """
+
+    def on_lookup(self, key: "Key[Any]", path: LookupPath) -> None:
+        """Called on each look up of a key, with the way it has been found."""
+
+    def on_supply(
+        self, injectable: Injectable[Any], duration: float, error: BaseException | None
+    ) -> None:
+        """Called on each supply of an injectable, with its duration in seconds.
+
+        The duration includes the construction of the value, if the injectable builds one.
+        """
+
+    def on_inject(self, service: Callable[..., Any], duration: float) -> None:
+        """Called on each call injecting dependencies, with the duration in seconds of the injection."""
+
+
+@dataclass(slots=True)
+class Histogram:
+    """Distribution of durations, counted in buckets of powers of two microseconds."""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    buckets: Counter[int] = field(default_factory=Counter)
+
+    def add(self, duration: float) -> None:
+        """Count a duration in seconds."""
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        microseconds = duration * 1e6
+        self.buckets[math.ceil(math.log2(microseconds)) if microseconds > 1 else 0] += 1
+
+    @property
+    def mean(self) -> float:
+        """Mean duration in seconds."""
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, quantile: float) -> float:
+        """Upper bound in seconds of the bucket holding the quantile (ex: 0.99)."""
+        rank = quantile * self.count
+        seen = 0
+        for exponent in sorted(self.buckets):
+            seen += self.buckets[exponent]
+            if seen >= rank:
+                return min(2.0**exponent / 1e6, self.max)
+        return self.max
+
+
+class HistogramObserver(Observer):
+    """Observer collecting in memory the counts and durations, by injectable and service name.
+
+    Examples:
+        >>> observer = HistogramObserver()
+        >>> container.observe(observer)
+        >>> observer.supplies["Service"].quantile(0.99)
+    """
+
+    def __init__(self) -> None:
+        self.lookups: Counter[LookupPath] = Counter()
+        self.supplies: dict[str, Histogram] = {}
+        self.errors: Counter[str] = Counter()
+        self.injections: dict[str, Histogram] = {}
+        self._lock = Lock()
+
+    def sampled(self) -> bool:
+        """Keep all the events."""
+        return True
+
+    @override
+    def on_lookup(self, key: "Key[Any]", path: LookupPath) -> None:
+        with self._lock:
+            self.lookups[path] += 1
+
+    @override
+    def on_supply(
+        self, injectable: Injectable[Any], duration: float, error: BaseException | None
+    ) -> None:
+        name = _name(getattr(injectable, "supplier", injectable))
+        with self._lock:
+            self.supplies.setdefault(name, Histogram()).add(duration)
+            if error is not None:
+                self.errors[name] += 1
+
+    @override
+    def on_inject(self, service: Callable[..., Any], duration: float) -> None:
+        with self._lock:
+            self.injections.setdefault(_name(service), Histogram()).add(duration)
+
+
+class SampledObserver(Observer):
+    """Observer forwarding only a sample of the events, to limit the cost in production.
+
+    The sample is drawn by `sampled`, before the event is measured:
+    a dropped event costs a random draw, the events notified are all forwarded.
+
+    Examples:
+        >>> container.observe(SampledObserver(HistogramObserver(), rate=0.01))
+    """
+
+    def __init__(
+        self, observer: Observer, rate: float, sample: Callable[[], float] = random.random
+    ) -> None:
+        """Create a sampled observer.
+
+        Args:
+            observer: the observer receiving the events sampled.
+            rate: the ratio of events forwarded, between 0 and 1.
+            sample: the random generator of numbers between 0 and 1.
+        """
+        self.observer = observer
+        self.rate = rate
+        self._sample = sample
+
+    def sampled(self) -> bool:
+        """Draw whether to keep the next event, then whether the forwarded observer keeps it."""
+        return self._sample() < self.rate and observing(self.observer) is not None
+
+    @override
+    def on_lookup(self, key: "Key[Any]", path: LookupPath) -> None:
+        self.observer.on_lookup(key, path)
+
+    @override
+    def on_supply(
+        self, injectable: Injectable[Any], duration: float, error: BaseException | None
+    ) -> None:
+        self.observer.on_supply(injectable, duration, error)
+
+    @override
+    def on_inject(self, service: Callable[..., Any], duration: float) -> None:
+        self.observer.on_inject(service, duration)
+
+
+def observing(observer: Observer | None) -> Observer | None:
+    """The observer if it keeps the next event, otherwise None: the event is then not measured."""
+    if observer is None:
+        return None
+    sampled = getattr(observer, "sampled", None)
+    return observer if sampled is None or sampled() else None
+
+
+def observed_supply(injectable: Injectable[Any], observer: Observer) -> Any:
+    """Supply the injectable, notifying the observer of the duration.
+
+    The observer has to be sampled beforehand, see `observing`.
+    """
+    start = perf_counter()
+    try:
+        value = injectable.supply()
+    except BaseException as error:
+        observer.on_supply(injectable, perf_counter() - start, error)
+        raise
+
+    observer.on_supply(injectable, perf_counter() - start, None)
+    return value
+
+
+async def observed_asupply(injectable: AsyncInjectable[Any], observer: Observer) -> Any:
+    """Supply the asynchronous injectable, notifying the observer of the duration, see `observed_supply`."""
+    start = perf_counter()
+    try:
+        value = await injectable.supply()
+    except BaseException as error:
+        observer.on_supply(injectable, perf_counter() - start, error)
+        raise
+
+    observer.on_supply(injectable, perf_counter() - start, None)
+    return value
+
+
+def _name(supplier: Any) -> str:
+    return getattr(supplier, "__qualname__", None) or type(supplier).__name__
@@ -0,0 +1,462 @@
+import sys
+from asyncio import gather
+from dataclasses import dataclass
+from inspect import Parameter
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Generic, TypeVar
+
+from pyqure.container import DependencyContainer
+from pyqure.exceptions import InjectionError, MissingDependencies
+from pyqure.injectables import (
+    AsyncInjectable,
+    Constant,
+    Injectable,
+    Pooled,
+    Provided,
+    Proxied,
+    Scoped,
+    is_async,
+)
+from pyqure.observers import Observer, observed_asupply, observed_supply, observing
+from pyqure.utils.function import NoDefault, Parameters, ParamName
+
+T = TypeVar("T")
+
+_KEYWORD_ONLY = sys.maxsize
+
+# ways of supplying the injectable bound to a parameter.
+_SUPPLIED = 0
+_AWAITED = 1
+_CHECKED_OUT = 2
+# scoped injectable refused by a service keeping it beyond the call.
+_SCOPED = 3
+
+Checkouts = list[tuple[Pooled[Any], Any]]
+"""Pooled instances checked out for a call, with their pool."""
+
+# held while parsing a signature, for a deferred plan to be compiled only once.
+_COMPILING = Lock()
+
+
+@dataclass(frozen=True, slots=True)
+class ParamPlan:
+    """Resolution plan of a single parameter.
+
+    Attributes:
+        name: the parameter name.
+        type: the parameter type.
+        qualifier: the qualifier annotated on the parameter.
+        default: the default value used when none of the keys is found.
+        position: the position of the parameter, or `sys.maxsize` for keyword only one.
+        is_keyword: whether the parameter can be passed by keyword.
+        lazy: whether the parameter is annotated to be injected lazily, see `Lazy`.
+        provider: whether the parameter is annotated to be injected as a provider, see `Provider`.
+    """
+
+    name: ParamName
+    type: Any
+    qualifier: str | None
+    default: Any
+    position: int
+    is_keyword: bool
+    lazy: bool = False
+    provider: bool = False
+
+
+class InjectionPlan(Generic[T]):
+    """Resolution plan of a service, compiled once from its signature.
+
+    The plan knows for each parameter how to resolve it and its default value,
+    so a call never goes through the signature reflection again.
+    The injectables bound to the parameters are cached until the container changes.
+
+    Attributes:
+        retains: whether the service keeps its arguments beyond the call, like the components do,
+         in which case the pooled and scoped injectables cannot be injected.
+    """
+
+    __slots__ = (
+        "_bindings",
+        "_keyword_positions",
+        "_positional_count",
+        "_required",
+        "_var_keyword",
+        "_var_positional",
+        "container",
+        "params",
+        "retains",
+        "service",
+    )
+
+    def __init__(
+        self,
+        service: Callable[..., T],
+        parameters: Parameters,
+        container: DependencyContainer,
+        *,
+        retains: bool = False,
+    ) -> None:
+        self.service = service
+        self.container = container
+        self.retains = retains
+
+        params: list[ParamPlan] = []
+        self._var_positional = False
+        self._var_keyword = False
+
+        for name, param in parameters.value.items():
+            kind = parameters.signature.parameters[name].kind
+            if kind is Parameter.VAR_POSITIONAL:
+                self._var_positional = True
+            elif kind is Parameter.VAR_KEYWORD:
+                self._var_keyword = True
+            else:
+                is_keyword_only = kind is Parameter.KEYWORD_ONLY
+                params.append(
+                    ParamPlan(
+                        name=name,
+                        type=param.type,
+                        qualifier=param.qualifier,
+                        default=param.default,
+                        position=_KEYWORD_ONLY if is_keyword_only else len(params),
+                        is_keyword=kind is not Parameter.POSITIONAL_ONLY,
+                        lazy=param.lazy,
+                        provider=param.provider,
+                    )
+                )
+
+        self.params = tuple(params)
+        self._positional_count = sum(param.position != _KEYWORD_ONLY for param in self.params)
+        self._keyword_positions = {
+            param.name: param.position for param in self.params if param.is_keyword
+        }
+        self._required = tuple(param for param in self.params if param.default is NoDefault)
+        self._bindings: tuple[int, tuple[Injectable[Any] | None, ...], tuple[int, ...]] = (
+            -1,
+            (),
+            (),
+        )
+
+    def binds(self, args: tuple[Any, ...], kwargs: dict[str, Any]) -> bool:
+        """Check whether the service is callable with these arguments only.
+
+        It's an equivalent of `Signature.bind` relying on the compiled plan.
+        """
+        count = len(args)
+        if count > self._positional_count and not self._var_positional:
+            return False
+
+        for name in kwargs:
+            position = self._keyword_positions.get(name)
+            if position is None:
+                if not self._var_keyword:
+                    return False
+            elif position < count:
+                return False
+
+        return all(
+            param.position < count or (param.is_keyword and param.name in kwargs)
+            for param in self._required
+        )
+
+    def resolve(
+        self, args: tuple[Any, ...], kwargs: dict[str, Any], checkouts: Checkouts | None = None
+    ) -> tuple[list[Any], dict[str, Any]]:
+        """Complete the submitted arguments with the injectables found.
+
+        Args:
+            args: the positional arguments submitted.
+            kwargs: the keyword arguments submitted.
+            checkouts: where to record the pooled instances checked out, to `release` them
+             once the call is done. They are otherwise left to the caller.
+
+        Returns:
+            The positional and keyword arguments to call the service with.
+
+        Raises:
+            MissingDependencies: if a mandatory parameter has been neither submitted nor found.
+            InjectionError: if an asynchronous injectable has been found.
+        """
+        # sampled once for the injection and its supplies, a dropped one is not measured.
+        observer = self.container.observer
+        if observer is not None:
+            observer = observing(observer)
+        start = perf_counter() if observer is not None else 0.0
+        try:
+            call_args, call_kwargs, pending = self._complete(args, kwargs, checkouts, observer)
+        except BaseException:
+            if checkouts:
+                release(checkouts)
+            raise
+
+        if observer is not None:
+            observer.on_inject(self.service, perf_counter() - start)
+
+        if pending:
+            if checkouts:
+                release(checkouts)
+            raise InjectionError(
+                f"Cannot inject asynchronous dependencies in synchronous {self.service}:"
+                f" {', '.join(param.name for param, _ in pending)}."
+            )
+
+        return call_args, call_kwargs
+
+    async def aresolve(
+        self, args: tuple[Any, ...], kwargs: dict[str, Any], checkouts: Checkouts | None = None
+    ) -> tuple[list[Any], dict[str, Any]]:
+        """Complete the submitted arguments with the injectables found, awaiting asynchronous ones.
+
+        The asynchronous injectables are awaited concurrently.
+
+        Args:
+            args: the positional arguments submitted.
+            kwargs: the keyword arguments submitted.
+            checkouts: where to record the pooled instances checked out, see `resolve`.
+
+        Returns:
+            The positional and keyword arguments to call the service with.
+
+        Raises:
+            MissingDependencies: if a mandatory parameter has been neither submitted nor found.
+        """
+        observer = self.container.observer
+        if observer is not None:
+            observer = observing(observer)
+        start = perf_counter() if observer is not None else 0.0
+        try:
+            call_args, call_kwargs, pending = self._complete(args, kwargs, checkouts, observer)
+            if pending:
+                values = await gather(
+                    *(
+                        injectable.supply()
+                        if observer is None
+                        else observed_asupply(injectable, observer)
+                        for _, injectable in pending
+                    )
+                )
+        except BaseException:
+            if checkouts:
+                release(checkouts)
+            raise
+
+        if pending:
+            for (param, _), value in zip(pending, values, strict=True):
+                if param.position == _KEYWORD_ONLY:
+                    call_kwargs[param.name] = value
+                else:
+                    call_args[param.position] = value
+
+        if observer is not None:
+            observer.on_inject(self.service, perf_counter() - start)
+        return call_args, call_kwargs
+
+    def bindings(self) -> tuple[Injectable[Any] | None, ...]:
+        """Injectables bound to each parameter, recompiled only when the container has changed."""
+        return self._compile()[0]
+
+    def _compile(self) -> tuple[tuple[Injectable[Any] | None, ...], tuple[int, ...]]:
+        """Bind the injectables to the parameters if the container has changed since last time.
+
+        Returns:
+            The injectables bound to each parameter, and the way of supplying them.
+        """
+        # the overrides are specific to the current context, so they are never cached.
+        if self.container.has_overrides:
+            return self._bind()
+
+        generation, bindings, supplies = self._bindings
+        current = self.container.generation
+
+        if generation != current:
+            bindings, supplies = self._bind()
+            self._bindings = (current, bindings, supplies)
+
+        return bindings, supplies
+
+    def _bind(self) -> tuple[tuple[Injectable[Any] | None, ...], tuple[int, ...]]:
+        lazy = self.container.lazy
+        bound: list[Injectable[Any] | None] = []
+        supplies: list[int] = []
+        for param in self.params:
+            injectable = self.container.resolve(param.name, param.type, param.qualifier)
+            # a provider supplies the instance of the scope active on each of its calls.
+            scoped = self.retains and isinstance(injectable, Scoped) and not param.provider
+            if param.provider:
+                injectable = _provided(self.service, param, injectable)
+            elif param.lazy or lazy:
+                injectable = _proxied(self.service, param, injectable)
+            bound.append(injectable)
+            supplies.append(_SCOPED if scoped else _supply(injectable))
+
+        return tuple(bound), tuple(supplies)
+
+    def _complete(
+        self,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        checkouts: Checkouts | None,
+        observer: Observer | None,
+    ) -> tuple[list[Any], dict[str, Any], list[tuple[ParamPlan, AsyncInjectable[Any]]]]:
+        """Complete the submitted arguments with the injectables found.
+
+        The supplies are notified to the observer, already sampled for the injection.
+
+        Returns:
+            The positional and keyword arguments to call the service with,
+            and the asynchronous injectables left to await for their parameters.
+        """
+        count = len(args)
+        call_args: list[Any] = list(args[: self._positional_count])
+        call_kwargs = dict(kwargs)
+        missing: list[ParamName] = []
+        pending: list[tuple[ParamPlan, AsyncInjectable[Any]]] = []
+        bindings, supplies = self._compile()
+
+        for param, injectable, supply in zip(self.params, bindings, supplies, strict=True):
+            if param.position < count:
+                continue
+            if param.name in call_kwargs:
+                value = call_kwargs.pop(param.name)
+            elif supply is _AWAITED:
+                pending.append((param, injectable))  # type: ignore[arg-type]
+                value = None
+            elif injectable is not None:
+                if supply is _SCOPED:
+                    raise InjectionError(
+                        f"Cannot inject scoped dependency {param.name} in {self.service}:"
+                        f" the instance would be kept beyond its scope."
+                    )
+                value = (
+                    injectable.supply()
+                    if observer is None
+                    else observed_supply(injectable, observer)
+                )
+                if supply is _CHECKED_OUT:
+                    self._check_out(param, injectable, value, checkouts)
+            elif param.default is not NoDefault:
+                value = param.default
+            else:
+                missing.append(param.name)
+                continue
+
+            if param.position == _KEYWORD_ONLY:
+                call_kwargs[param.name] = value
+            else:
+                call_args.append(value)
+
+        if missing:
+            raise MissingDependencies(self.service, missing)
+
+        call_args.extend(args[self._positional_count :])
+        return call_args, call_kwargs, pending
+
+    def _check_out(
+        self, param: ParamPlan, pooled: Any, value: Any, checkouts: Checkouts | None
+    ) -> None:
+        """Record the pooled instance checked out for the call, to release it once done."""
+        if self.retains:
+            pooled.release(value)
+            raise InjectionError(
+                f"Cannot inject pooled dependency {param.name} in {self.service}:"
+                f" the instance would be kept beyond the call."
+            )
+        if checkouts is not None:
+            checkouts.append((pooled, value))
+
+
+class DeferredPlan(Generic[T]):
+    """Injection plan of a service compiled on its first use, not when the service is decorated.
+
+    The signature parsing, with its forward references resolution, is only paid by the services
+    actually called in the process. Whatever the threads using the plan, it's compiled once.
+
+    Attributes:
+        plan: the compiled plan, None until its first use.
+    """
+
+    __slots__ = ("container", "plan", "retains", "service")
+
+    def __init__(
+        self, service: Callable[..., T], container: DependencyContainer, *, retains: bool = False
+    ) -> None:
+        self.service = service
+        self.container = container
+        self.retains = retains
+        self.plan: InjectionPlan[T] | None = None
+
+    def get(self) -> InjectionPlan[T]:
+        """Get the plan, compiling it on the first call."""
+        plan = self.plan
+        if plan is None:
+            with _COMPILING:
+                plan = self.plan
+                if plan is None:
+                    plan = InjectionPlan(
+                        self.service, Parameters(self.service), self.container, retains=self.retains
+                    )
+                    self.plan = plan
+        return plan
+
+    def bindings(self) -> tuple[Injectable[Any] | None, ...]:
+        """Injectables bound to each parameter, see `InjectionPlan.bindings`."""
+        return self.get().bindings()
+
+
+def release(checkouts: Checkouts) -> None:
+    """Return the pooled instances checked out to their pool, the last checked out first."""
+    while checkouts:
+        pool, value = checkouts.pop()
+        pool.release(value)
+
+
+def _provided(
+    service: Callable[..., Any], param: ParamPlan, injectable: Injectable[Any] | None
+) -> Injectable[Any] | None:
+    """Injectable bound to a parameter injected as a provider.
+
+    Raises:
+        InjectionError: if the injectable is pooled, its instances having to be checked out.
+    """
+    if injectable is None:
+        return None
+    if isinstance(injectable, Pooled):
+        raise InjectionError(
+            f"Cannot inject a provider of {param.name} in {service}:"
+            f" {injectable} must be checked out."
+        )
+    return Provided(injectable)
+
+
+def _proxied(
+    service: Callable[..., Any], param: ParamPlan, injectable: Injectable[Any] | None
+) -> Injectable[Any] | None:
+    """Injectable bound to a parameter injected lazily, the container being lazy or not.
+
+    For a lazy container, the constants and the injectables which cannot be supplied on first use
+    are injected as they are.
+
+    Raises:
+        InjectionError: if the parameter is annotated lazy upon an injectable to await or check out.
+    """
+    if injectable is None:
+        return None
+    if is_async(injectable) or isinstance(injectable, Pooled):
+        if param.lazy:
+            raise InjectionError(
+                f"Cannot inject lazily {param.name} in {service}:"
+                f" {injectable} must be awaited or checked out."
+            )
+        return injectable
+    if isinstance(injectable, Constant) and not param.lazy:
+        return injectable
+    return Proxied(injectable)
+
+
+def _supply(injectable: Injectable[Any] | None) -> int:
+    if injectable is None:
+        return _SUPPLIED
+    if is_async(injectable):
+        return _AWAITED
+    return _CHECKED_OUT if isinstance(injectable, Pooled) else _SUPPLIED
@@ -0,0 +1,155 @@
+"""Report of the container startup, to find out the singletons gating its readiness."""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Mapping
+
+from pyqure.container import DependencyContainer, Key
+from pyqure.exceptions import DependencyError
+from pyqure.graph import DependencyGraph
+from pyqure.injectables import AsyncSingleton, Singleton, Unset
+
+
+@dataclass(frozen=True, slots=True)
+class StartupReport:
+    """Construction durations of the registered injectables, combined with their dependencies.
+
+    The exclusive duration of an injectable is its own construction, its dependencies being built.
+    The inclusive one adds the exclusive durations of all its dependencies, direct or not.
+    The critical path is the chain of dependencies whose construction is the longest:
+    it's the minimal startup duration, whatever the number of threads building the singletons.
+
+    Attributes:
+        graph: the dependencies between the registered keys.
+        durations: the exclusive construction duration in seconds of each key built.
+    """
+
+    graph: DependencyGraph[Key[Any]]
+    durations: Mapping[Key[Any], float]
+
+    def exclusive(self, key: Key[Any]) -> float:
+        """Construction duration in seconds of the key alone, 0 if not built."""
+        return self.durations.get(key, 0.0)
+
+    def inclusive(self, key: Key[Any]) -> float:
+        """Construction duration in seconds of the key and all its dependencies."""
+        seen = {key}
+        stack = [key]
+        while stack:
+            for dependency in self.graph.dependencies(stack.pop()):
+                if dependency not in seen:
+                    seen.add(dependency)
+                    stack.append(dependency)
+        return sum(self.exclusive(node) for node in seen)
+
+    def fan_in(self, key: Key[Any]) -> int:
+        """Number of keys directly depending on the key."""
+        return len(self.graph.dependents(key))
+
+    def critical_path(self) -> list[Key[Any]]:
+        """Longest chain of construction, the first dependency first.
+
+        Raises:
+            CircularDependencyError: if some injectables depend on each other.
+        """
+        finish: dict[Key[Any], float] = {}
+        previous: dict[Key[Any], Key[Any] | None] = {}
+
+        for node in self.graph.topological_order():
+            slowest = max(self.graph.dependencies(node), key=finish.__getitem__, default=None)
+            previous[node] = slowest
+            finish[node] = self.exclusive(node) + (finish[slowest] if slowest is not None else 0.0)
+
+        path: list[Key[Any]] = []
+        last = max(finish, key=finish.__getitem__, default=None)
+        while last is not None:
+            path.append(last)
+            last = previous[last]
+        return path[::-1]
+
+    def critical_duration(self) -> float:
+        """Construction duration in seconds of the critical path."""
+        return sum(self.exclusive(key) for key in self.critical_path())
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serializable report, the components by inclusive duration, the longest first."""
+        critical_path = self.critical_path()
+        components = [
+            {
+                "key": _label(key),
+                "exclusive": self.exclusive(key),
+                "inclusive": self.inclusive(key),
+                "fan_in": self.fan_in(key),
+                "dependencies": [_label(dependency) for dependency in self.graph.dependencies(key)],
+            }
+            for key in self.graph
+        ]
+        return {
+            "critical_path": [_label(key) for key in critical_path],
+            "critical_duration": sum(self.exclusive(key) for key in critical_path),
+            "components": sorted(components, key=lambda component: -component["inclusive"]),
+        }
+
+    def to_json(self, indent: int | None = 2) -> str:
+        """Report as JSON, see `to_dict`."""
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_dot(self) -> str:
+        """Report as a Graphviz graph, the critical path highlighted in red."""
+        path = self.critical_path()
+        critical_path = set(path)
+        # edges go from a key to its dependency, the previous one on the path.
+        critical_edges = set(zip(path[1:], path, strict=False))
+        lines = ["digraph startup {", "    rankdir=LR;"]
+        for key in self.graph:
+            color = ', color="red"' if key in critical_path else ""
+            lines.append(
+                f'    "{_label(key)}" [label="{_label(key)}\\n'
+                f'{self.exclusive(key) * 1e3:.3f} ms / {self.inclusive(key) * 1e3:.3f} ms"{color}];'
+            )
+        for key in self.graph:
+            for dependency in self.graph.dependencies(key):
+                color = ' [color="red"]' if (key, dependency) in critical_edges else ""
+                lines.append(f'    "{_label(key)}" -> "{_label(dependency)}"{color};')
+        lines.append("}")
+        return "\n".join(lines)
+
+
+def startup_report(
+    container: DependencyContainer, durations: Mapping[Key[Any], float] | None = None
+) -> StartupReport:
+    """Report the startup of the container.
+
+    Args:
+        container: the container whose registered injectables are reported.
+        durations: the construction durations measured by `DependencyContainer.warmup`,
+         the container is warmed up if not provided.
+
+    Examples:
+        >>> report = startup_report(container)
+        >>> Path("startup.dot").write_text(report.to_dot())
+
+    Raises:
+        DependencyError: if the durations are not provided while some singletons are already built,
+         as their construction could not be measured anymore.
+    """
+    if durations is None:
+        built = [_label(key) for key in container.graph() if _is_built(container.lookup(key))]
+        if built:
+            raise DependencyError(
+                f"Cannot measure the startup, some singletons are already built: {', '.join(built)}."
+                f" Provide the durations measured by the warmup instead."
+            )
+        durations = container.warmup()
+    return StartupReport(container.graph(), durations)
+
+
+def _is_built(injectable: Any) -> bool:
+    return isinstance(injectable, (Singleton, AsyncSingleton)) and injectable.value is not Unset
+
+
+def _label(key: Key[Any]) -> str:
+    """Short readable name of a key."""
+    clazz, qualifier = key
+    name = "" if clazz is None else getattr(clazz, "__name__", str(clazz))
+    return f"{name}@{qualifier}" if qualifier else name
@@ -1,13 +1,16 @@
 import sys
 from dataclasses import dataclass
 from inspect import Parameter, Signature, signature
-from typing import Annotated, Any, Callable, ForwardRef, Sequence
+from typing import Annotated, Any, Callable, ForwardRef, Sequence, get_args
 
 from pyqure.injectables import Qualifier
-from pyqure.utils.types import extract_type_info, has_parameter_type
+from pyqure.utils.types import extract_type_info, has_parameter_type, is_lazy, is_provider
 
 ParamName = Annotated[str, "Parameter name"]
 
+# attribute holding the injection plan of the functions created by the injection decorators.
+INJECTION_PLAN_ATTRIBUTE = "__injection_plan__"
+
 
 class AnyType:
     """Used as a sentinel to define the parameter type when no type used in the signature."""
@@ -26,6 +29,8 @@ class Param:
     name: str
     default: Any
     qualifier: Qualifier | None
+    lazy: bool = False
+    provider: bool = False
 
 
 class Parameters:
@@ -71,6 +76,10 @@ class Parameters:
 
         for name, parameter in sig.parameters.items():
             annotation, qualifier = extract_type_info(parameter.annotation)
+            provider = is_provider(parameter.annotation)
+            if provider:
+                # the type supplied by the provider function.
+                annotation = get_args(annotation)[-1]
 
             if isinstance(annotation, (str, ForwardRef)) and func_module:
                 annotation_name = (
@@ -86,6 +95,8 @@ class Parameters:
                 name=name,
                 default=_get_default_value(parameter),
                 qualifier=qualifier,
+                lazy=is_lazy(parameter.annotation),
+                provider=provider,
             )
 
         return parameters
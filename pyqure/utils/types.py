@@ -3,9 +3,10 @@ from inspect import Parameter, isabstract
 from types import GenericAlias, NoneType, UnionType
 from typing import Annotated, Protocol, Sequence, TypeGuard, Union, get_args, get_origin
 
-from pyqure.injectables import Qualifier
+from pyqure.injectables import LAZY, PROVIDER, Qualifier
 
 _OPTIONAL_SIZE = 2
+_DICT_SIZE = 2
 
 
 def unpack_types(type_: type) -> tuple[type, ...]:
@@ -47,6 +48,16 @@ def is_annotated(type_: type) -> TypeGuard[type[Annotated]]:  # type: ignore[val
     return get_origin(type_) is Annotated
 
 
+def collection_item(type_: type) -> tuple[type, bool] | None:
+    """Item type of a `list[T]` or `dict[str, T]` type, and whether it's a dict, otherwise None."""
+    origin, args = get_origin(type_), get_args(type_)
+    if origin is list and len(args) == 1:
+        return args[0], False
+    if origin is dict and len(args) == _DICT_SIZE and args[0] is str:
+        return args[1], True
+    return None
+
+
 def is_interface(type_: type) -> bool:
     """Check whether class is an interface or not.
 
@@ -68,6 +79,20 @@ def filter_mro(clazz: type) -> Sequence[type]:
     return mro
 
 
+def is_lazy(type_: type) -> bool:
+    """Check whether the type is annotated to be injected lazily, see `Lazy`."""
+    return _is_marked(type_, LAZY)
+
+
+def is_provider(type_: type) -> bool:
+    """Check whether the type is annotated to be injected as a provider, see `Provider`."""
+    return _is_marked(type_, PROVIDER)
+
+
+def _is_marked(type_: type, marker: object) -> bool:
+    return is_annotated(type_) and any(arg is marker for arg in get_args(type_)[1:])
+
+
 def extract_type_info(type_: type) -> tuple[type, Qualifier | None]:
     """You shouldn't use it directly outside the project.
 
@@ -0,0 +1 @@
+"""Benchmarks of pyqure hot paths, run with `python -m tests.benchmarks`."""
@@ -0,0 +1,61 @@
+"""Run the benchmarks and compare them to the stored baseline.
+
+Usage:
+    python -m tests.benchmarks                  # compare to the baseline, fail on regressions
+    python -m tests.benchmarks --save           # store the results as the new baseline
+    python -m tests.benchmarks -k inject        # only the benchmarks whose name contains "inject"
+
+The baseline stores absolute timings, so it's specific to the machine it has been saved on:
+save one on the machine comparing before looking for regressions (ex: on the main branch).
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from tests.benchmarks.suite import BENCHMARKS, measure, regressions
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks", description=__doc__)
+    parser.add_argument("-k", dest="pattern", default="", help="filter the benchmarks by name")
+    parser.add_argument("--save", action="store_true", help="store the results as baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="slowdown ratio over the baseline flagged as regression (default: 0.25)",
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE, help="the baseline file")
+    args = parser.parse_args(argv)
+
+    baseline: dict[str, float] = (
+        json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    )
+    if baseline and not args.save:
+        print(f"Comparing to {args.baseline}, only meaningful if saved on this machine.")
+    results: dict[str, float] = {}
+
+    for name, setup in BENCHMARKS.items():
+        if args.pattern not in name:
+            continue
+        results[name] = measure(setup)
+        reference = baseline.get(name)
+        comparison = f"{results[name] / reference:6.2f}x" if reference else "   new"
+        print(f"{name:<30} {results[name] * 1e6:12.3f} µs {comparison}")
+
+    if args.save:
+        args.baseline.write_text(json.dumps(baseline | results, indent=2, sort_keys=True) + "\n")
+        return 0
+
+    slower = regressions(results, baseline, args.threshold)
+    for name, ratio in slower.items():
+        print(f"Regression: {name} is {ratio:.2f}x slower than its baseline.", file=sys.stderr)
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+"""Benchmarks of the registration, resolution, injection and discovering paths.
+
+Each benchmark is a setup function returning the callable to time.
+"""
+
+import atexit
+import shutil
+import sys
+import tempfile
+import textwrap
+import timeit
+from pathlib import Path
+from typing import Any, Callable
+
+from pyqure.compiler import load_compiled
+from pyqure.compiler import main as compiler
+from pyqure.container import Alias, Class, DependencyContainer, Key
+from pyqure.discover import discover
+from pyqure.injectables import Constant, Factory, Provider, Singleton, ThreadLocal
+from pyqure.injection import component, inject
+
+Benchmark = Callable[[], Callable[[], Any]]
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+MRO_DEPTH = 50
+REGISTERED_KEYS = 1_000
+DISCOVERED_MODULES = 2_000
+DISCOVERED_PACKAGE = "pyqure_benchmarked"
+COMPILED_PACKAGE = "pyqure_compiled_benchmark"
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+    """Register a benchmark setup under a name."""
+
+    def decorator(setup: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+def measure(setup: Benchmark, repeat: int = 5) -> float:
+    """Best duration in seconds of a call of the benchmark."""
+    timer = timeit.Timer(setup())
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def regressions(
+    results: dict[str, float], baseline: dict[str, float], threshold: float
+) -> dict[str, float]:
+    """Benchmarks slower than their baseline by more than the threshold, with their ratio."""
+    ratios = {
+        name: duration / baseline[name] for name, duration in results.items() if name in baseline
+    }
+    return {name: ratio for name, ratio in ratios.items() if ratio > 1 + threshold}
+
+
+def _hierarchy(depth: int) -> type:
+    """Leaf class of a single inheritance chain."""
+    clazz: type = object
+    for level in range(depth):
+        clazz = type(f"Level{level}", (clazz,), {})
+    return clazz
+
+
+def _container() -> DependencyContainer:
+    container = DependencyContainer()
+    for index in range(REGISTERED_KEYS):
+        container[Key(int, f"key{index}")] = Constant(index)
+    return container
+
+
+def _service(count: int) -> Callable[..., int]:
+    """Function summing its `count` integer parameters."""
+    names = [f"p{index}" for index in range(count)]
+    params = ", ".join(f"{name}: int" for name in names)
+    namespace: dict[str, Any] = {}
+    exec(f"def service({params}) -> int:\n    return sum([{', '.join(names)}])", namespace)
+    return namespace["service"]  # type: ignore[no-any-return]
+
+
+def _injected(count: int) -> tuple[Callable[..., int], DependencyContainer]:
+    container = DependencyContainer()
+    for index in range(count):
+        container[Key(int, f"p{index}")] = Constant(index)
+    return inject(container=container)(_service(count)), container
+
+
+def _handler(container: DependencyContainer) -> Callable[..., int]:
+    """Function taking 12 lists built by factories, only using the first one."""
+    names = [f"p{index}" for index in range(12)]
+    for name in names:
+        container[Key(list, name)] = Factory(lambda: list(range(1_000)))
+    namespace: dict[str, Any] = {}
+    params = ", ".join(f"{name}: list" for name in names)
+    exec(f"def handler({params}) -> int:\n    return len(p0)", namespace)
+    return inject(container=container)(namespace["handler"])
+
+
+@benchmark("register_deep_mro")
+def register_deep_mro() -> Callable[[], Any]:
+    leaf = _hierarchy(MRO_DEPTH)
+    component = Constant(leaf())
+    return lambda: DependencyContainer().register(Class(leaf), component)
+
+
+@benchmark("getitem_hit")
+def getitem_hit() -> Callable[[], Any]:
+    container = _container()
+    key = Key(int, f"key{REGISTERED_KEYS // 2}")
+    return lambda: container[key]
+
+
+@benchmark("getitem_miss")
+def getitem_miss() -> Callable[[], Any]:
+    container = _container()
+    key = Key(str, "missing")
+    return lambda: key in container
+
+
+@benchmark("getitem_primary")
+def getitem_primary() -> Callable[[], Any]:
+    container = _container()
+    container.register(Key(str, "primary"), Constant("primary"), primary=True)
+    key = Key(str, "other")
+    return lambda: container[key]
+
+
+@benchmark("getitem_frozen")
+def getitem_frozen() -> Callable[[], Any]:
+    container = _container().freeze()
+    key = Key(int, f"key{REGISTERED_KEYS // 2}")
+    return lambda: container[key]
+
+
+@benchmark("getitem_loop_12")
+def getitem_loop_12() -> Callable[[], Any]:
+    container = _container()
+    keys = [Key(int, f"key{index}") for index in range(12)]
+    return lambda: [container[key] for key in keys]
+
+
+@benchmark("resolve_many_12")
+def resolve_many_12() -> Callable[[], Any]:
+    container = _container()
+    keys = [Key(int, f"key{index}") for index in range(12)]
+    return lambda: container.resolve_many(keys)
+
+
+@benchmark("get_all_10_among_1000")
+def get_all_10_among_1000() -> Callable[[], Any]:
+    container = _container()
+    handler = type("Handler", (), {})
+    for index in range(10):
+        container[Key(handler, f"handler{index}")] = Constant(handler())
+    return lambda: container.get_all(Class(handler))
+
+
+@benchmark("get_tagged_100_among_10000")
+def get_tagged_100_among_10000() -> Callable[[], Any]:
+    container = DependencyContainer()
+    for index in range(10_000):
+        tags = ["handler", f"group{index % 100}"]
+        container.register(Key(int, f"key{index}"), Constant(index), tags=tags)
+    return lambda: container.get_tagged("handler", "group42")
+
+
+@benchmark("inject_0_params")
+def inject_0_params() -> Callable[[], Any]:
+    return _injected(0)[0]
+
+
+@benchmark("inject_5_params")
+def inject_5_params() -> Callable[[], Any]:
+    return _injected(5)[0]
+
+
+@benchmark("inject_20_params")
+def inject_20_params() -> Callable[[], Any]:
+    return _injected(20)[0]
+
+
+@benchmark("inject_20_params_partial")
+def inject_20_params_partial() -> Callable[[], Any]:
+    service = _injected(20)[0]
+    kwargs = {f"p{index}": index for index in range(0, 20, 2)}
+    return lambda: service(**kwargs)
+
+
+@benchmark("inject_20_params_all_passed")
+def inject_20_params_all_passed() -> Callable[[], Any]:
+    service = _injected(20)[0]
+    args = tuple(range(20))
+    return lambda: service(*args)
+
+
+@benchmark("inject_12_factories_1_used")
+def inject_12_factories_1_used() -> Callable[[], Any]:
+    return _handler(DependencyContainer())
+
+
+@benchmark("inject_12_factories_1_used_lazy")
+def inject_12_factories_1_used_lazy() -> Callable[[], Any]:
+    return _handler(DependencyContainer(lazy=True))
+
+
+@benchmark("factory_getitem_loop_100")
+def factory_getitem_loop_100() -> Callable[[], Any]:
+    container = _container()
+    key: Key[Any] = Alias("new_entity")
+    container[key] = Factory(object)
+    return lambda: [container[key] for _ in range(100)]
+
+
+@benchmark("factory_provider_loop_100")
+def factory_provider_loop_100() -> Callable[[], Any]:
+    container = _container()
+    container[Alias("new_entity")] = Factory(object)
+
+    @inject(container=container)
+    def build(new_entity: Provider[Any]) -> list[Any]:
+        return [new_entity() for _ in range(100)]
+
+    return build
+
+
+@benchmark("singleton_supply")
+def singleton_supply() -> Callable[[], Any]:
+    singleton = Singleton(object)
+    singleton.supply()
+    return singleton.supply
+
+
+@benchmark("thread_local_supply")
+def thread_local_supply() -> Callable[[], Any]:
+    thread_local = ThreadLocal(object)
+    thread_local.supply()
+    return thread_local.supply
+
+
+@benchmark("factory_supply")
+def factory_supply() -> Callable[[], Any]:
+    return Factory(object).supply
+
+
+@benchmark("discover")
+def discover_package() -> Callable[[], Any]:
+    root = workspace()
+    _write_package(root / DISCOVERED_PACKAGE, DISCOVERED_MODULES)
+
+    def run() -> None:
+        discover(DISCOVERED_PACKAGE, container=_reimported(DISCOVERED_PACKAGE))
+
+    return run
+
+
+@benchmark("decorate_1000_components")
+def decorate_components() -> Callable[[], Any]:
+    def init(self: Any, first: int, second: str = "", *, third: float = 0.0) -> None: ...
+
+    classes = [type(f"Service{index}", (), {"__init__": init}) for index in range(1_000)]
+
+    def run() -> None:
+        decorate = component(container=DependencyContainer())
+        for clazz in classes:
+            decorate(clazz)
+
+    return run
+
+
+@benchmark("load_compiled")
+def load_compiled_package() -> Callable[[], Any]:
+    root = workspace()
+    _write_package(root / COMPILED_PACKAGE, DISCOVERED_MODULES)
+
+    _reimported(COMPILED_PACKAGE)
+    output = root / COMPILED_PACKAGE / "dependencies.py"
+    compiler([COMPILED_PACKAGE, str(output), "--container", f"{COMPILED_PACKAGE}:container"])
+
+    def run() -> None:
+        load_compiled(f"{COMPILED_PACKAGE}.dependencies", container=_reimported(COMPILED_PACKAGE))
+
+    return run
+
+
+def workspace() -> Path:
+    """Temporary directory importable for the packages written, removed at exit."""
+    root = Path(tempfile.mkdtemp())
+    atexit.register(shutil.rmtree, root, ignore_errors=True)
+    sys.path.insert(0, str(root))
+    return root
+
+
+def _reimported(package: str) -> DependencyContainer:
+    """Container of the package imported again, with none of its modules imported."""
+    for module in [name for name in sys.modules if name.startswith(package)]:
+        del sys.modules[module]
+    return __import__(package).container  # type: ignore[no-any-return]
+
+
+def _write_package(root: Path, modules: int) -> None:
+    """Write a package of sub-packages of 100 modules, half of them registering a component."""
+    root.mkdir(parents=True)
+    (root / "__init__.py").write_text(
+        "from pyqure.container import DependencyContainer\n\ncontainer = DependencyContainer()\n"
+    )
+    for index in range(modules):
+        package = root / f"package{index // 100}"
+        if not package.exists():
+            package.mkdir()
+            (package / "__init__.py").write_text("")
+
+        source = "VALUE = 42\n"
+        if index % 2 == 0:
+            source = textwrap.dedent(
+                f"""
+                from pyqure.injection import component
+                from {root.name} import container
+
+                @component(container=container)
+                class Service{index}: ...
+                """
+            )
+        (package / f"module{index}.py").write_text(source)
@@ -0,0 +1,39 @@
+import sys
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from tests.benchmarks import suite
+from tests.benchmarks.suite import BENCHMARKS, regressions
+
+
+@pytest.fixture
+def workspace(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Write the benchmarked packages in the test directory, and forget them afterwards."""
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(suite, "workspace", lambda: tmp_path)
+
+    yield
+
+    packages = (suite.DISCOVERED_PACKAGE, suite.COMPILED_PACKAGE)
+    for module in [module for module in sys.modules if module.startswith(packages)]:
+        del sys.modules[module]
+
+
+@pytest.mark.usefixtures("workspace")
+@pytest.mark.parametrize("name", list(BENCHMARKS))
+def test_benchmark_runs(name: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    # only check the benchmarks do not rot, the timings are run with `python -m tests.benchmarks`.
+    monkeypatch.setattr(suite, "DISCOVERED_MODULES", 10)
+    monkeypatch.setattr(suite, "DISCOVERED_PACKAGE", f"pyqure_benchmarked_{name}")
+    monkeypatch.setattr(suite, "COMPILED_PACKAGE", f"pyqure_compiled_benchmark_{name}")
+
+    BENCHMARKS[name]()()
+
+
+def test_regressions() -> None:
+    results = {"fast": 1.0, "slow": 2.0, "new": 1.0}
+    baseline = {"fast": 1.0, "slow": 1.0, "removed": 1.0}
+
+    assert regressions(results, baseline, threshold=0.25) == {"slow": 2.0}
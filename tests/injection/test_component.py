@@ -1,8 +1,11 @@
+import threading
+
 import pytest
 
 from pyqure.container import Alias, Class, DependencyContainer, Key
-from pyqure.exceptions import InjectionError
-from pyqure.injection import component
+from pyqure.exceptions import CircularDependencyError, InjectionError, ScopeError
+from pyqure.injectables import Scoped, ThreadLocal
+from pyqure.injection import component, factory
 from tests.fixtures.abstracts import ABCService, HasA
 
 
@@ -85,3 +88,60 @@ class TestComponent:
         comp = self.container[Key(str, "hello")]
 
         assert comp == "Hello"
+
+    def test_raise_error_on_circular_components(self) -> None:
+        @component(qualifier="a", container=self.container)
+        def a(b: int) -> int:
+            return b
+
+        @component(qualifier="b", container=self.container)
+        def b(a: int) -> int:
+            return a
+
+        with pytest.raises(CircularDependencyError):
+            _a = self.container[Key(int, "a")]
+
+    def test_on_class_with_scoped_lifetime(self) -> None:
+        @component(container=self.container, lifetime=Scoped)
+        class UnitOfWork: ...
+
+        with self.container.scope():
+            comp = self.container[Class(UnitOfWork)]
+            assert comp is self.container[Class(UnitOfWork)]
+
+        with self.container.scope():
+            assert comp is not self.container[Class(UnitOfWork)]
+
+        with pytest.raises(ScopeError):
+            self.container[Class(UnitOfWork)]
+
+    def test_on_class_with_thread_local_lifetime(self) -> None:
+        @component(container=self.container, lifetime=ThreadLocal)
+        class Parser: ...
+
+        comp = self.container[Class(Parser)]
+        built: list[Parser] = []
+        other = threading.Thread(target=lambda: built.append(self.container[Class(Parser)]))
+        other.start()
+        other.join()
+
+        assert comp is self.container[Class(Parser)]
+        assert built[0] is not comp
+
+    def test_with_tags(self) -> None:
+        @component(container=self.container, tags=["handler"])
+        class Handler: ...
+
+        @factory(container=self.container, tags=["handler", "factory"])
+        def handler() -> str:
+            return "handler"
+
+        assert [type(comp) for comp in self.container.get_tagged("handler")] == [Handler, str]
+        assert self.container.get_tagged("factory") == ["handler"]
+
+    def test_raise_error_on_coroutine_function_with_lifetime(self) -> None:
+        async def session() -> str:
+            return "session"
+
+        with pytest.raises(InjectionError, match="lifetime"):
+            component(session, container=self.container, lifetime=Scoped)  # type: ignore[call-overload]
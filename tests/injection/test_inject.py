@@ -1,13 +1,15 @@
+import asyncio
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Any
 
 import pytest
 
-from pyqure.container import Class, DependencyContainer, Key
-from pyqure.exceptions import MissingDependencies
-from pyqure.injectables import Constant, qualifier
-from pyqure.injection import component, configuration, inject
+from pyqure.container import Alias, Class, DependencyContainer, Key
+from pyqure.exceptions import InjectionError, MissingDependencies
+from pyqure.injectables import Constant, Factory, Lazy, Pooled, Provider, Scoped, qualifier
+from pyqure.injection import component, configuration, factory, inject
+from pyqure.utils.function import INJECTION_PLAN_ATTRIBUTE
 
 
 class TestInject:
@@ -25,6 +27,17 @@ class TestInject:
         ):
             run()
 
+    def test_signature_parsed_on_first_call(self) -> None:
+        @inject(container=self.container)
+        def run(data: int) -> int:
+            return data
+
+        deferred = getattr(run, INJECTION_PLAN_ATTRIBUTE)
+        assert deferred.plan is None
+
+        assert run(1) == 1
+        assert deferred.plan is not None
+
     def test_with_component(self) -> None:
         @inject(container=self.container)
         def run(data: dict[str, str]) -> dict[str, str]:
@@ -91,6 +104,262 @@ class TestInject:
 
         assert run() == "test_path"
 
+    def test_coroutine_function(self) -> None:
+        calls = []
+
+        @component(container=self.container)
+        async def a() -> int:
+            calls.append("a")
+            await asyncio.sleep(0.01)
+            return 2
+
+        @factory(container=self.container)
+        async def b(a: int) -> int:
+            return a * 2
+
+        @component(qualifier="c", container=self.container)
+        def c() -> int:
+            return 3
+
+        @inject(container=self.container)
+        async def run(a: int, b: int, c: int) -> int:
+            return a * b * c
+
+        async def main() -> list[int]:
+            return await asyncio.gather(*(run() for _ in range(5)))
+
+        assert asyncio.run(main()) == [24] * 5
+        assert asyncio.run(run(1, 1)) == 3
+        assert calls == ["a"]
+
+    def test_raise_error_when_async_injectable_in_sync_function(self) -> None:
+        @component(container=self.container)
+        async def a() -> int:
+            return 2
+
+        @inject(container=self.container)
+        def run(a: int) -> int:
+            return a
+
+        with pytest.raises(InjectionError, match="asynchronous dependencies"):
+            run()
+
+    def test_name_key_has_priority_over_qualifier_key(self) -> None:
+        self.container[Key(str, "name")] = Constant("by name")
+        self.container[Class(str)] = Constant("unqualified")
+        self.container.register(Key(int, "primary"), Constant(1), primary=True)
+        self.container[Key(int, "q")] = Constant(2)
+
+        @inject(container=self.container)
+        def run(name: str, number: Annotated[int, qualifier("q")]) -> tuple[str, int]:
+            return name, number
+
+        assert run() == ("by name", 1)
+
+    def test_with_collections(self) -> None:
+        class Handler: ...
+
+        @component(container=self.container, qualifier="create")
+        class CreateHandler(Handler): ...
+
+        @component(container=self.container)
+        class DeleteHandler(Handler): ...
+
+        @inject(container=self.container)
+        def run(
+            handlers: list[Handler], by_name: dict[str, Handler], numbers: list[int] | None = None
+        ) -> tuple[list[Handler], dict[str, Handler], list[int] | None]:
+            return handlers, by_name, numbers
+
+        handlers, by_name, numbers = run()
+
+        assert [type(handler) for handler in handlers] == [CreateHandler, DeleteHandler]
+        assert by_name == {"create": handlers[0], "DeleteHandler": handlers[1]}
+        assert numbers is None
+
+        class OverridingHandler(CreateHandler): ...
+
+        with self.container.override(Key(CreateHandler, "create"), Constant(OverridingHandler())):
+            assert type(run()[0][0]) is OverridingHandler
+
+        @component(container=self.container)
+        class PrettyDeleteHandler(DeleteHandler): ...
+
+        assert [type(handler) for handler in run()[0]] == [
+            CreateHandler,
+            DeleteHandler,
+            PrettyDeleteHandler,
+        ]
+
+    def test_lazy_dependencies(self) -> None:
+        built: list[str] = []
+
+        @factory(container=self.container)
+        def audit() -> str:
+            built.append("audit")
+            return "audit"
+
+        @factory(container=self.container, qualifier="mail")
+        def mailer() -> str:
+            built.append("mail")
+            return "mail"
+
+        @inject(container=self.container)
+        def run(fail: bool, audit: Lazy[str], mail: Annotated[Lazy[str], qualifier("mail")]) -> str:
+            return mail.upper() if fail else "ok"
+
+        assert run(False) == "ok"
+        assert not built
+        assert run(True) == "MAIL"
+        assert built == ["mail"]
+
+    def test_lazy_container(self) -> None:
+        container = DependencyContainer(lazy=True)
+        built: list[str] = []
+
+        def build() -> str:
+            built.append("service")
+            return "service"
+
+        container[Alias("name")] = Constant("name")
+        container[Alias("service")] = Factory(build)
+
+        @inject(container=container)
+        def run(name: Any, service: Any) -> tuple[Any, Any]:
+            return name, service
+
+        name, service = run()
+        assert type(name) is str
+        assert not built
+        assert service == "service"
+        assert built == ["service"]
+        assert container.child().lazy
+
+    def test_raise_error_when_lazy_asynchronous_dependency(self) -> None:
+        @factory(container=self.container)
+        async def data() -> str:
+            return "data"
+
+        @inject(container=self.container)
+        def run(data: Lazy[str]) -> str:
+            return data
+
+        with pytest.raises(InjectionError, match="Cannot inject lazily data"):
+            run()
+
+    def test_provider_dependencies(self) -> None:
+        @factory(container=self.container, qualifier="entity")
+        class Entity: ...
+
+        @inject(container=self.container)
+        def run(
+            count: int, new_entity: Annotated[Provider[Entity], qualifier("entity")]
+        ) -> list[Entity]:
+            return [new_entity() for _ in range(count)]
+
+        entities = run(3)
+        assert len(entities) == 3
+        assert len({id(entity) for entity in entities}) == 3
+        assert all(isinstance(entity, Entity) for entity in entities)
+
+    def test_raise_error_when_provider_of_pooled_dependency(self) -> None:
+        self.container[Alias("data")] = Pooled(list)
+
+        @inject(container=self.container)
+        def run(data: Provider[list[int]]) -> list[int]:
+            return data()
+
+        with pytest.raises(InjectionError, match="Cannot inject a provider of data"):
+            run()
+
+    def test_pooled_instance_is_returned_after_the_call(self) -> None:
+        pooled = Pooled(Path.cwd, max_size=1, timeout=0.01)
+        self.container[Class(Path)] = pooled
+
+        @inject(container=self.container)
+        def run(path: Path) -> Path:
+            assert pooled.stats().in_use == 1
+            return path
+
+        @inject(container=self.container)
+        def fail(path: Path) -> None:
+            raise ValueError(path)
+
+        assert run() is run()
+        with pytest.raises(ValueError):
+            fail()
+        assert pooled.stats().in_use == 0
+        assert pooled.stats().checkouts == 3
+
+    def test_pooled_instance_is_returned_after_the_coroutine_call(self) -> None:
+        pooled = Pooled(Path.cwd, max_size=1)
+        self.container[Class(Path)] = pooled
+
+        @inject(container=self.container)
+        async def run(path: Path) -> Path:
+            return path
+
+        async def main() -> list[Path]:
+            return await asyncio.gather(*(run() for _ in range(2)))
+
+        first, second = asyncio.run(main())
+
+        assert first is second
+        assert pooled.stats().in_use == 0
+
+    def test_pooled_instance_is_returned_when_the_injection_fails(self) -> None:
+        @factory(container=self.container)
+        async def name() -> str:
+            raise ValueError("failure")
+
+        pooled = Pooled(Path.cwd, max_size=1)
+        self.container[Class(Path)] = pooled
+
+        @inject(container=self.container)
+        async def run(path: Path, name: str) -> str:
+            return name
+
+        with pytest.raises(ValueError, match="failure"):
+            asyncio.run(run())
+        assert pooled.stats().in_use == 0
+
+    def test_raise_error_when_pooled_instance_injected_in_component(self) -> None:
+        pooled = Pooled(Path.cwd, max_size=1)
+        self.container[Class(Path)] = pooled
+
+        @component(container=self.container)
+        class Handler:
+            def __init__(self, path: Path) -> None:
+                self.path = path
+
+        with pytest.raises(InjectionError, match="pooled dependency path"):
+            self.container[Class(Handler)]
+        assert pooled.stats().in_use == 0
+
+    def test_raise_error_when_scoped_instance_injected_in_component(self) -> None:
+        built: list[Path] = []
+
+        def build() -> Path:
+            built.append(Path.cwd())
+            return built[-1]
+
+        self.container[Class(Path)] = Scoped(build)
+
+        @component(container=self.container)
+        class Handler:
+            def __init__(self, path: Path) -> None:
+                self.path = path
+
+        @inject(container=self.container)
+        def run(path: Path) -> Path:
+            return path
+
+        with self.container.scope():
+            with pytest.raises(InjectionError, match="scoped dependency path"):
+                self.container[Class(Handler)]
+            assert built == []
+            assert run() is self.container[Class(Path)]
+
     def test_complete_inline(self) -> None:
         @component
         class HttpClient:
@@ -0,0 +1,180 @@
+import sys
+import textwrap
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from pyqure.compiler import CompiledPlan, compile_container, load_compiled, main
+from pyqure.container import DependencyContainer, Key
+from pyqure.exceptions import InjectionError, MissingDependencies
+from pyqure.injectables import Constant, Pooled
+from pyqure.plan import DeferredPlan
+from pyqure.utils.function import INJECTION_PLAN_ATTRIBUTE
+
+PACKAGE = "pyqure_compiled"
+SERVICES = f"{PACKAGE}.services"
+COMPILED = f"{PACKAGE}.dependencies"
+
+
+def _container() -> DependencyContainer:
+    for module in [module for module in sys.modules if module.startswith(PACKAGE)]:
+        del sys.modules[module]
+
+    return __import__(PACKAGE).container  # type: ignore[no-any-return]
+
+
+def _plan(service: Any) -> Any:
+    return getattr(service, INJECTION_PLAN_ATTRIBUTE)
+
+
+class TestCompiler:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+        self.root = tmp_path / PACKAGE
+        self.root.mkdir()
+        (self.root / "__init__.py").write_text(
+            "from pyqure.container import DependencyContainer\n\ncontainer = DependencyContainer()\n"
+        )
+        (self.root / "services.py").write_text(
+            textwrap.dedent(
+                f"""
+                from typing import Annotated
+
+                from pyqure.injectables import qualifier
+                from pyqure.injection import component, factory, inject
+                from {PACKAGE} import container
+
+
+                @component(container=container)
+                class Repository: ...
+
+
+                @component(container=container)
+                def greeting() -> str:
+                    return "Hello"
+
+
+                @factory(container=container)
+                class Greeter:
+                    def __init__(
+                        self, repository: Repository, greeting: str, punctuation: str = "!"
+                    ) -> None:
+                        self.repository = repository
+                        self.text = greeting + punctuation
+
+
+                @inject(container=container)
+                def greet(
+                    name: str,
+                    greeter: Greeter,
+                    *,
+                    suffix: str = "",
+                    other: Annotated[Repository, qualifier("other")] | None = None,
+                ) -> str:
+                    return f"{{greeter.text}} {{name}}{{suffix}}"
+
+
+                @inject(container=container)
+                def positional_only(repository: Repository, /) -> Repository:
+                    return repository
+
+
+                @inject(container=container)
+                async def asynchronous(repository: Repository) -> Repository:
+                    return repository
+
+
+                class Handler:
+                    @inject(container=container)
+                    def handle(self, repository: Repository) -> Repository:
+                        return repository
+                """
+            )
+        )
+        (self.root / "settings.py").write_text(
+            textwrap.dedent(
+                f"""
+                from pyqure.container import Alias
+                from pyqure.injectables import Constant
+                from {PACKAGE} import container
+
+                container[Alias("locale")] = Constant("en")
+                """
+            )
+        )
+        (self.root / "helpers.py").write_text("VALUE = 42\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        yield
+
+        _container()
+
+    def _compile(self) -> str:
+        container = _container()
+        __import__(SERVICES)
+        source = compile_container(container, [SERVICES])
+        (self.root / "dependencies.py").write_text(source)
+        return source
+
+    def _load(self) -> Any:
+        load_compiled(COMPILED, container=_container())
+        return sys.modules[SERVICES]
+
+    def test_compiles_services(self) -> None:
+        source = self._compile()
+
+        compile(source, COMPILED, "exec")
+        assert f"MODULES = ({SERVICES!r},)" in source
+        for name in ("Repository", "greeting", "Greeter", "greet", "Handler.handle"):
+            assert f"'{SERVICES}.{name}': CompiledService(" in source
+        assert "positional_only" not in source
+        assert "asynchronous" not in source
+        # Repository and greeting, without parameters, share their functions.
+        assert source.count("def _keys_") == source.count("def _call_") == 4
+
+    def test_loads_compiled_services(self) -> None:
+        self._compile()
+        services = self._load()
+        container = services.container
+
+        assert isinstance(_plan(services.greet), CompiledPlan)
+        assert isinstance(_plan(services.positional_only), DeferredPlan)
+        assert services.greet("Bob") == "Hello! Bob"
+        assert services.greet(name="Bob", suffix="?") == "Hello! Bob?"
+        build_greeter = container.lookup(Key(services.Greeter, None)).supplier
+        assert isinstance(_plan(build_greeter), CompiledPlan)
+        assert services.greet("Bob", build_greeter(greeting="Hi")) == "Hi! Bob"
+        assert services.Handler().handle() is container[Key(services.Repository, None)]
+        assert services.greet.__name__ == "greet"
+        assert services.positional_only() is services.Handler().handle()
+
+        with pytest.raises(MissingDependencies, match="name"):
+            services.greet()
+
+    def test_follows_container_changes(self) -> None:
+        self._compile()
+        services = self._load()
+        container = services.container
+
+        container[Key(str, "greeting")] = Constant("Hey")
+        assert services.greet("Bob") == "Hey! Bob"
+
+        with container.override(Key(str, "greeting"), Constant("Hi")):
+            assert services.greet("Bob") == "Hi! Bob"
+
+        container[Key(services.Greeter, None)] = Pooled(services.Greeter)
+        with pytest.raises(InjectionError, match="compile the container again"):
+            services.greet("Bob")
+
+    def test_main(self) -> None:
+        output = self.root / "dependencies.py"
+        output.write_text("")
+        _container()
+
+        main([PACKAGE, str(output), "--container", f"{PACKAGE}:container"])
+
+        source = output.read_text()
+        # neither the package nor the helpers register or inject anything.
+        assert f"MODULES = ({SERVICES!r}, '{PACKAGE}.settings')" in source
+        assert source.count(f"'{SERVICES}.") == 5
@@ -1,14 +1,35 @@
+import asyncio
+import threading
+import time
 from pathlib import Path
 from typing import Any, Optional, Union
+from unittest.mock import patch
 
 import pytest
 
-from pyqure.container import Alias, Class, DependencyContainer, Key
-from pyqure.exceptions import DependencyError, InvalidRegisteredType
-from pyqure.injectables import Constant
+from pyqure.container import Alias, Class, DependencyContainer, Key, resolution_keys
+from pyqure.exceptions import (
+    CircularDependencyError,
+    DependencyError,
+    FrozenContainerError,
+    InvalidRegisteredType,
+    MissingComponents,
+)
+from pyqure.injectables import Constant, Factory, Singleton
+from pyqure.injection import component, factory
 from tests.fixtures.abstracts import ABCService, ConcreteService
 
 
+def test_resolution_keys() -> None:
+    assert resolution_keys("a", int | str, "q") == (
+        Alias("a"),
+        Key(str, "a"),
+        Key(str, "q"),
+        Key(int, "a"),
+        Key(int, "q"),
+    )
+
+
 class TestContainer:
     @pytest.fixture(autouse=True)
     def setup(self) -> None:
@@ -17,21 +38,21 @@ class TestContainer:
     def test_register(self) -> None:
         self.container.register(Key(int, "test"), Constant(42))
 
-        assert self.container._overrides == {}
+        assert not self.container.has_overrides
         assert self.container._primary == {}
         assert self.container._injectables == {(int, "test"): Constant(42)}
 
     def test_register_with_only_alias(self) -> None:
         self.container.register(Alias("test"), Constant(42))
 
-        assert self.container._overrides == {}
+        assert not self.container.has_overrides
         assert self.container._primary == {}
         assert self.container._injectables == {(None, "test"): Constant(42)}
 
     def test_register_with_only_type(self) -> None:
         self.container.register(Class(int), Constant(42))
 
-        assert self.container._overrides == {}
+        assert not self.container.has_overrides
         assert self.container._primary == {}
         assert self.container._injectables == {(int, None): Constant(42)}
 
@@ -39,7 +60,7 @@ class TestContainer:
         constant = Constant(ConcreteService())
         self.container.register(Key(ConcreteService, "test"), constant)
 
-        assert self.container._overrides == {}
+        assert not self.container.has_overrides
         assert self.container._primary == {}
         assert self.container._injectables == {
             (ConcreteService, "test"): constant,
@@ -49,7 +70,7 @@ class TestContainer:
     def test_register_with_generics_types(self) -> None:
         self.container.register(Key(dict[str, int], "test"), Constant({"count": 0}))
 
-        assert self.container._overrides == {}
+        assert not self.container.has_overrides
         assert self.container._primary == {}
         assert self.container._injectables == {
             (dict[str, int], "test"): Constant({"count": 0}),
@@ -64,7 +85,7 @@ class TestContainer:
     def test_register_with_primary(self) -> None:
         self.container.register(Key(int, "test"), Constant(42), primary=True)
 
-        assert len(self.container._overrides) == 0
+        assert not self.container.has_overrides
         assert self.container._primary == {int: (int, "test")}
         assert self.container._injectables == {(int, "test"): Constant(42)}
 
@@ -96,5 +117,503 @@ class TestContainer:
         with self.container.override(Key(int, "test"), Constant(0)):
             assert self.container[Key(int, "test")] == 0
 
-        assert self.container._overrides == {}
+        assert not self.container.has_overrides
         assert self.container[Key(int, "test")] == 42
+
+    def test_override_all(self) -> None:
+        self.container[Key(int, "a")] = Constant(1)
+        self.container[Alias("b")] = Constant(2)
+
+        with self.container.override_all({Key(int, "a"): Constant(10), Alias("b"): Constant(20)}):
+            assert self.container[Key(int, "a")] == 10
+            assert self.container[Alias("b")] == 20
+
+            with self.container.override(Key(int, "a"), Constant(100)):
+                assert self.container[Key(int, "a")] == 100
+                assert self.container[Alias("b")] == 20
+
+            assert self.container[Key(int, "a")] == 10
+
+        assert self.container[Key(int, "a")] == 1
+        assert not self.container.has_overrides
+
+    def test_override_parent_classes(self) -> None:
+        class Base: ...
+
+        class Child(Base): ...
+
+        class Other(Base): ...
+
+        self.container[Class(Child)] = Constant(Child())
+        with self.container.override(Class(Child), Constant(child := Child())):
+            assert self.container[Class(Base)] is child
+
+        with self.container.override_all(
+            {Class(Child): Constant(child), Class(Base): Constant(other := Other())}
+        ):
+            assert self.container[Class(Child)] is child
+            assert self.container[Class(Base)] is other
+
+    def test_override_is_local_to_the_context(self) -> None:
+        self.container[Key(int, "a")] = Constant(1)
+        overridden = threading.Event()
+        checked = threading.Event()
+
+        async def override(value: int) -> int:
+            with self.container.override(Key(int, "a"), Constant(value)):
+                await asyncio.sleep(0)
+                return self.container[Key(int, "a")]
+
+        async def run() -> list[int]:
+            return list(await asyncio.gather(override(10), override(20)))
+
+        def thread() -> None:
+            with self.container.override(Key(int, "a"), Constant(0)):
+                overridden.set()
+                checked.wait(1)
+
+        other = threading.Thread(target=thread)
+        other.start()
+        overridden.wait(1)
+        try:
+            assert self.container[Key(int, "a")] == 1
+            assert asyncio.run(run()) == [10, 20]
+        finally:
+            checked.set()
+            other.join()
+
+    def test_resolve_not_cached_while_overridden(self) -> None:
+        self.container[Key(int, "a")] = Constant(1)
+        assert self.container.resolve("a", int) == Constant(1)
+
+        with self.container.override(Key(int, "a"), Constant(2)):
+            assert self.container.resolve("a", int) == Constant(2)
+
+        assert self.container.resolve("a", int) == Constant(1)
+
+    def test_child_reads_through_parent(self) -> None:
+        self.container[Key(Path, "shared")] = Singleton(lambda: Path("shared"))
+        self.container[Key(int, "value")] = Constant(1)
+
+        child = self.container.child()
+        child[Key(int, "value")] = Constant(2)
+
+        assert child[Key(int, "value")] == 2
+        assert self.container[Key(int, "value")] == 1
+        assert child[Key(Path, "shared")] is self.container[Key(Path, "shared")]
+        assert list(child._injectables) == [Key(int, "value")]
+
+    def test_child_sees_parent_changes(self) -> None:
+        child = self.container.child()
+        assert child.resolve("a", int) is None
+        generation = child.generation
+
+        self.container[Key(int, "a")] = Constant(1)
+
+        assert child.generation > generation
+        assert child.resolve("a", int) == Constant(1)
+
+        with self.container.override(Key(int, "a"), Constant(2)):
+            assert child.has_overrides
+            assert child[Key(int, "a")] == 2
+
+    def test_child_primary_falls_back_to_parent(self) -> None:
+        self.container.register(Key(int, "a"), Constant(1), primary=True)
+        child = self.container.child()
+        child[Key(int, "b")] = Constant(2)
+
+        assert child[Class(int)] == 1
+
+        child.register(Key(int, "c"), Constant(3), primary=True)
+
+        assert child[Class(int)] == 3
+
+    @pytest.mark.parametrize("mode", ["read_through", "flatten", "freeze"])
+    def test_child_parent_key_has_priority_over_child_primary(self, mode: str) -> None:
+        self.container[Key(str, "q")] = Constant("parent-q")
+        self.container.register(Key(str, "p"), Constant("parent-primary"), primary=True)
+        child = self.container.child()
+        child.register(Key(str, "c"), Constant("child-primary"), primary=True)
+        if mode == "flatten":
+            child.flatten()
+        elif mode == "freeze":
+            self.container.freeze()
+            child.freeze()
+
+        assert child[Key(str, "q")] == "parent-q"
+        assert child[Key(str, "other")] == "child-primary"
+        assert child[Class(str)] == "child-primary"
+
+    def test_flatten(self) -> None:
+        self.container.register(Key(int, "a"), Constant(1), primary=True)
+        child = self.container.child()
+        child[Key(str, "b")] = Constant("b")
+        grandchild = child.child().flatten()
+
+        with patch.object(child, "lookup", wraps=child.lookup) as lookup:
+            assert grandchild[Key(int, "a")] == 1
+            assert grandchild[Class(int)] == 1
+            assert grandchild[Key(str, "b")] == "b"
+            lookup.assert_not_called()
+
+        self.container[Key(int, "c")] = Constant(3)
+
+        assert grandchild[Key(int, "c")] == 3
+
+    def test_freeze(self) -> None:
+        self.container.register(Key(list[int], "a"), Constant([1]), primary=True)
+        self.container[Key(int, "b")] = Constant(2)
+
+        self.container.freeze()
+
+        assert self.container.frozen
+        assert self.container[Key(list[int], "a")] == [1]
+        assert self.container[Class(list[int])] == [1]
+        assert self.container[Key(list[int], "unknown")] == [1]
+        assert self.container[Key(int, "b")] == 2
+        assert Key(str, "c") not in self.container
+        with self.container.override(Key(int, "b"), Constant(3)):
+            assert self.container[Key(int, "b")] == 3
+
+        with pytest.raises(FrozenContainerError):
+            self.container[Key(str, "c")] = Constant("c")
+
+        self.container.thaw()
+        self.container[Key(str, "c")] = Constant("c")
+
+        assert not self.container.frozen
+        assert self.container[Key(str, "c")] == "c"
+
+    def test_freeze_child(self) -> None:
+        self.container[Key(int, "a")] = Constant(1)
+        child = self.container.child()
+        child[Key(int, "b")] = Constant(2)
+
+        with pytest.raises(FrozenContainerError, match="parent"):
+            child.freeze()
+
+        self.container.freeze()
+        child.freeze()
+
+        assert child[Key(int, "a")] == 1
+        assert child[Key(int, "b")] == 2
+
+        with pytest.raises(FrozenContainerError, match="children"):
+            self.container.thaw()
+
+        child.thaw()
+        self.container.thaw()
+        self.container[Key(int, "a")] = Constant(2)
+
+        assert child[Key(int, "a")] == 2
+
+    def test_resolve_many(self) -> None:
+        factory = Factory(object)
+        self.container[Key(int, "a")] = Constant(1)
+        self.container[Alias("b")] = factory
+        self.container[Alias("c")] = factory
+
+        first, second, third = self.container.resolve_many([Key(int, "a"), Alias("b"), Alias("c")])
+        named = self.container.resolve_many({"a": Key(int, "a"), "b": Alias("b")})
+
+        assert first == 1
+        # supplied once for the whole batch.
+        assert second is third
+        assert named["a"] == 1
+        assert named["b"] is not second
+
+    def test_resolve_many_raises_with_all_missing_keys(self) -> None:
+        supplied: list[int] = []
+
+        def supply() -> int:
+            supplied.append(1)
+            return 1
+
+        self.container[Key(int, "a")] = Factory(supply)
+
+        with pytest.raises(MissingComponents, match="Key\\(clazz=None, qualifier='b'\\)") as error:
+            self.container.resolve_many([Key(int, "a"), Alias("b"), Alias("c")])
+
+        assert error.value.missing == [Alias("b"), Alias("c")]
+        assert supplied == []
+
+    def test_get_all(self) -> None:
+        class Service: ...
+
+        class Implementation(Service): ...
+
+        parent = DependencyContainer()
+        parent[Key(Service, "parent")] = Constant(Service())
+        self.container = parent.child()
+        implementation = Constant(Implementation())
+        self.container[Class(Implementation)] = implementation
+        self.container[Key(Implementation, "same")] = implementation
+        self.container[Key(Service, "other")] = Constant(Service())
+        self.container[Key(int, "a")] = Constant(1)
+
+        services = self.container.get_all(Class(Service))
+
+        assert len(services) == 3
+        assert services[1] is implementation.value
+        assert self.container.get_all(Key(Service, "other")) == [services[2]]
+        assert list(self.container.lookup_all(Class(Implementation))) == [Class(Implementation)]
+        assert self.container.get_all(Class(str)) == []
+
+    def test_get_all_keeps_components_shadowed_by_a_subclass(self) -> None:
+        class Handler: ...
+
+        class JsonHandler(Handler): ...
+
+        class PrettyJsonHandler(JsonHandler): ...
+
+        self.container[Class(JsonHandler)] = Constant(json := JsonHandler())
+        self.container[Class(PrettyJsonHandler)] = Constant(pretty := PrettyJsonHandler())
+
+        assert self.container[Class(JsonHandler)] is pretty
+        assert self.container.get_all(Class(Handler)) == [json, pretty]
+
+        with self.container.override(
+            Class(PrettyJsonHandler), Constant(other := PrettyJsonHandler())
+        ):
+            assert self.container.get_all(Class(Handler)) == [json, other]
+
+    def test_get_all_is_restored_on_circular_registration(self) -> None:
+        container = DependencyContainer(detect_cycles=True)
+
+        @component(container=container)
+        def first(second: str) -> str:
+            return second
+
+        with pytest.raises(CircularDependencyError):
+
+            @component(container=container)
+            def second(first: str) -> str:
+                return first
+
+        assert list(container.lookup_all(Class(str))) == [Key(str, "first")]
+
+    def test_get_tagged(self) -> None:
+        self.container.register(Alias("a"), Constant("a"), tags=["handler", "billing"])
+        self.container.register(Alias("b"), Constant("b"), tags=["handler"])
+        self.container.register(Alias("c"), Constant("c"), tags=["billing"])
+        child = self.container.child()
+        child.register(Alias("d"), Constant("d"), tags=["handler", "billing"])
+
+        assert child.get_tagged("handler", "billing") == ["a", "d"]
+        assert child.get_tagged("handler", "billing", match="any") == ["a", "b", "d", "c"]
+        assert self.container.get_tagged("handler") == ["a", "b"]
+        assert self.container.get_tagged("unknown") == []
+        assert self.container.get_tagged() == []
+
+        # registering again replaces the tags.
+        self.container.register(Alias("a"), Constant("a"), tags=["other"])
+
+        assert self.container.get_tagged("handler", "billing", match="any") == ["b", "c"]
+        assert list(self.container.lookup_tagged("other")) == [Alias("a")]
+
+    def test_get_tagged_ignores_untagged_subclasses(self) -> None:
+        class Handler: ...
+
+        class Untagged(Handler): ...
+
+        self.container.register(Class(Handler), Constant(handler := Handler()), tags=["handler"])
+        self.container[Class(Untagged)] = Constant(Untagged())
+
+        assert self.container.get_tagged("handler") == [handler]
+
+    def test_registrations(self) -> None:
+        count = DependencyContainer.registrations_count()
+        self.container.register(Key(int, "a"), constant := Constant(1), primary=True)
+        child = self.container.child()
+        child[Alias("b")] = Constant(2)
+
+        assert dict(self.container.registrations) == {Key(int, "a"): constant}
+        assert list(child.registrations) == [Alias("b")]
+        assert self.container.primary_key(int) == Key(int, "a")
+        assert child.primary_key(int) is None
+        assert DependencyContainer.registrations_count() == count + 2
+        with pytest.raises(TypeError):
+            self.container.registrations[Alias("c")] = Constant(3)  # type: ignore[index]
+
+    def test_lookup(self) -> None:
+        constant = Constant(42)
+        self.container.register(Key(int, "42"), constant, primary=True)
+
+        assert self.container.lookup(Key(int, "42")) is constant
+        assert self.container.lookup(Class(int)) is constant
+        assert self.container.lookup(Key(str, "42")) is None
+
+    def test_generation_changes_on_mutation(self) -> None:
+        generation = self.container.generation
+
+        self.container[Key(int, "test")] = Constant(42)
+        assert self.container.generation > generation
+
+        generation = self.container.generation
+        with self.container.override(Key(int, "test"), Constant(0)):
+            # overrides are local to the context, they do not change the container.
+            assert self.container.generation == generation
+
+        assert self.container.generation == generation
+
+    def test_resolve(self) -> None:
+        self.container[Key(int, "a")] = Constant(1)
+        self.container[Key(int, "q")] = Constant(2)
+        self.container[Alias("b")] = Constant(3)
+
+        assert self.container.resolve("a", int) == Constant(1)
+        assert self.container.resolve("a", int, "q") == Constant(1)
+        assert self.container.resolve("p", int, "q") == Constant(2)
+        assert self.container.resolve("b", int, "q") == Constant(3)
+        assert self.container.resolve("c", str) is None
+
+    def test_resolve_is_cached_until_mutation(self) -> None:
+        with patch.object(self.container, "lookup", wraps=self.container.lookup) as lookup:
+            assert self.container.resolve("a", int) is None
+            assert self.container.resolve("a", int) is None
+            assert lookup.call_count == len(resolution_keys("a", int))
+
+            self.container[Key(int, "a")] = Constant(1)
+
+            assert self.container.resolve("a", int) == Constant(1)
+            assert self.container.resolve("a", int) == Constant(1)
+            # found by the name key, right after the alias one.
+            assert lookup.call_count == len(resolution_keys("a", int)) + 2
+
+    def test_warmup_builds_singletons_in_dependencies_order(self) -> None:
+        built: list[str] = []
+
+        @component(container=self.container)
+        class A:
+            def __init__(self) -> None:
+                built.append("A")
+
+        @factory(container=self.container)
+        class B:
+            def __init__(self, a: A) -> None:
+                built.append("B")
+
+        @component(container=self.container)
+        class C:
+            def __init__(self, b: B) -> None:
+                built.append("C")
+
+        self.container[Key(int, "constant")] = Constant(42)
+
+        timings = self.container.warmup()
+
+        assert set(timings) == {Class(A), Class(C)}
+        assert built == ["A", "B", "C"]
+        assert all(duration >= 0 for duration in timings.values())
+
+    def test_warmup_builds_independent_singletons_concurrently(self) -> None:
+        def sleeping() -> float:
+            time.sleep(0.1)
+            return 0.1
+
+        self.container[Key(float, "a")] = Singleton(sleeping)
+        self.container[Key(float, "b")] = Singleton(sleeping)
+        self.container[Key(float, "c")] = Factory(sleeping)
+
+        start = time.perf_counter()
+        timings = self.container.warmup(max_workers=2)
+
+        assert time.perf_counter() - start < sum(timings.values())
+        assert set(timings) == {Key(float, "a"), Key(float, "b")}
+
+    def test_warmup_raises_on_circular_dependencies(self) -> None:
+        @component(qualifier="a", container=self.container)
+        def a(b: int) -> int:
+            return b
+
+        @component(qualifier="b", container=self.container)
+        def b(a: int) -> int:
+            return a
+
+        with pytest.raises(CircularDependencyError):
+            self.container.warmup()
+
+    def test_awarmup(self) -> None:
+        built: list[str] = []
+
+        @component(container=self.container)
+        class A:
+            def __init__(self) -> None:
+                built.append("A")
+
+        @component(container=self.container)
+        async def b(a: A) -> str:
+            built.append("b")
+            return "b"
+
+        timings = asyncio.run(self.container.awarmup())
+
+        assert set(timings) == {Class(A), Key(str, "b")}
+        assert built == ["A", "b"]
+
+    def test_graph(self) -> None:
+        @component(container=self.container)
+        class A: ...
+
+        @factory(container=self.container)
+        class B:
+            def __init__(self, a: A) -> None: ...
+
+        @component(container=self.container)
+        class C:
+            def __init__(self, a: A, b: B) -> None: ...
+
+        graph = self.container.graph()
+
+        assert graph.topological_order() == [Class(A), Class(B), Class(C)]
+        assert graph.dependents(Class(A)) == (Class(B), Class(C))
+        assert self.container.graph() is graph
+
+        self.container[Key(int, "test")] = Constant(42)
+        assert self.container.graph() is not graph
+
+    def test_validate_raises_on_circular_dependencies(self) -> None:
+        @component(qualifier="a", container=self.container)
+        def a(b: int) -> int:
+            return b
+
+        assert self.container.validate() is self.container
+
+        @component(qualifier="b", container=self.container)
+        def b(a: int) -> int:
+            return a
+
+        with pytest.raises(CircularDependencyError, match="Circular dependencies detected"):
+            self.container.validate()
+
+    def test_detect_cycles_on_registration(self) -> None:
+        container = DependencyContainer(detect_cycles=True)
+
+        @component(qualifier="a", container=container)
+        def a(b: int) -> int:
+            return b
+
+        with pytest.raises(CircularDependencyError):
+
+            @component(qualifier="b", container=container)
+            def b(a: int) -> int:
+                return a
+
+        assert Key(int, "b") not in container
+        assert container.lookup(Key(int, "a")) is not None
+
+    def test_detect_cycles_restores_replaced_registration(self) -> None:
+        container = DependencyContainer(detect_cycles=True)
+        container.register(Alias("second"), Constant("second"), primary=True)
+
+        @component(container=container)
+        def first(second: str) -> Any:
+            return second
+
+        with pytest.raises(CircularDependencyError):
+
+            @component(container=container)
+            def second(first: str) -> Any:
+                return first
+
+        assert container[Alias("first")] == "second"
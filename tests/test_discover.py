@@ -0,0 +1,387 @@
+import importlib
+import json
+import os
+import sys
+import textwrap
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from pyqure.container import Class, DependencyContainer, Key
+from pyqure.discover import discover
+
+PACKAGE = "pyqure_discovered"
+
+
+def _write(path: Path, source: str) -> None:
+    path.write_text(textwrap.dedent(source))
+    # ensure the modification is seen whatever the filesystem time resolution.
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _container() -> DependencyContainer:
+    for module in [module for module in sys.modules if module.startswith(PACKAGE)]:
+        del sys.modules[module]
+
+    return __import__(PACKAGE).container  # type: ignore[no-any-return]
+
+
+class TestDiscoverWithStateFile:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+        self.root = tmp_path / PACKAGE
+        self.root.mkdir()
+        self.state_file = tmp_path / ".dependencies.pyq"
+        _write(
+            self.root / "__init__.py",
+            """
+            from pyqure.container import DependencyContainer
+
+            container = DependencyContainer()
+            """,
+        )
+        _write(
+            self.root / "services.py",
+            f"""
+            from pyqure.injection import component
+            from {PACKAGE} import container
+
+            @component(container=container, primary=True)
+            class Service: ...
+            """,
+        )
+        _write(self.root / "helpers.py", "VALUE = 42\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        yield
+
+        _container()
+
+    def _discover(self, prescreen: bool = False) -> DependencyContainer:
+        container = _container()
+        discover(PACKAGE, container=container, state_file=self.state_file, prescreen=prescreen)
+        return container
+
+    def test_writes_manifest(self) -> None:
+        self._discover()
+
+        manifest = json.loads(self.state_file.read_text())
+        modules = manifest["packages"][PACKAGE]["modules"]
+
+        assert modules[f"{PACKAGE}.services"]["registers"]
+        assert modules[f"{PACKAGE}.services"]["keys"] == [
+            {"type": f"{PACKAGE}.services:Service", "qualifier": None, "primary": True}
+        ]
+        assert not modules[f"{PACKAGE}.helpers"]["registers"]
+        assert modules[f"{PACKAGE}.helpers"]["hash"]
+
+    def test_skips_unchanged_modules_not_registering(self) -> None:
+        self._discover()
+        container = self._discover()
+
+        assert f"{PACKAGE}.helpers" not in sys.modules
+        assert Class(sys.modules[f"{PACKAGE}.services"].Service) in container
+
+    def test_rescans_changed_modules(self) -> None:
+        self._discover()
+        _write(
+            self.root / "helpers.py",
+            f"""
+            from pyqure.container import Key
+            from pyqure.injectables import Constant
+            from {PACKAGE} import container
+
+            container[Key(int, "value")] = Constant(42)
+            """,
+        )
+
+        container = self._discover()
+
+        assert container[Key(int, "value")] == 42
+        manifest = json.loads(self.state_file.read_text())
+        assert manifest["packages"][PACKAGE]["modules"][f"{PACKAGE}.helpers"]["registers"]
+
+    def test_walks_again_when_modules_are_added(self) -> None:
+        self._discover()
+        _write(
+            self.root / "others.py",
+            f"""
+            from pyqure.injection import component
+            from {PACKAGE} import container
+
+            @component(container=container)
+            class Other: ...
+            """,
+        )
+        os.utime(self.root, ns=(0, self.root.stat().st_mtime_ns + 1_000_000_000))
+
+        container = self._discover()
+
+        assert Class(sys.modules[f"{PACKAGE}.others"].Other) in container
+
+    def test_examines_again_screened_out_modules_without_prescreen(self) -> None:
+        # registering through a re-exported decorator, without mentioning the library.
+        _write(self.root / "api.py", "from pyqure.injection import component as service\n")
+        _write(
+            self.root / "plugins.py",
+            """
+            from . import container
+            from .api import service
+
+            @service(container=container)
+            class Plugin: ...
+            """,
+        )
+
+        self._discover(prescreen=True)
+        assert f"{PACKAGE}.plugins" not in sys.modules
+
+        container = self._discover()
+        assert Class(sys.modules[f"{PACKAGE}.plugins"].Plugin) in container
+
+        container = self._discover(prescreen=True)
+        assert f"{PACKAGE}.plugins" in sys.modules
+
+    def test_ignores_invalid_manifest(self) -> None:
+        self.state_file.write_text("not a manifest")
+
+        container = self._discover()
+
+        assert Class(sys.modules[f"{PACKAGE}.services"].Service) in container
+
+
+class TestLazyDiscover:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+        root = tmp_path / PACKAGE
+        root.mkdir()
+        _write(
+            root / "__init__.py",
+            """
+            from pyqure.container import DependencyContainer
+
+            container = DependencyContainer()
+            """,
+        )
+        _write(
+            root / "ports.py",
+            """
+            from abc import ABC, abstractmethod
+
+            class Port(ABC):
+                @abstractmethod
+                def get(self) -> str: ...
+            """,
+        )
+        _write(
+            root / "adapters.py",
+            f"""
+            from pyqure.injection import component
+            from {PACKAGE} import container
+            from {PACKAGE}.ports import Port
+
+            @component(container=container)
+            class Adapter(Port):
+                def get(self) -> str:
+                    return "adapter"
+            """,
+        )
+        _write(
+            root / "functions.py",
+            f"""
+            from pyqure import injection
+            from {PACKAGE} import container
+
+            @injection.factory(container=container, qualifier="answer")
+            def compute() -> int:
+                return 42
+            """,
+        )
+        _write(
+            root / "configs.py",
+            f"""
+            from pyqure.container import Alias, DependencyContainer
+            from pyqure.injectables import Constant
+            from pyqure.injection import configuration
+            from {PACKAGE} import container
+
+            @configuration(container=container)
+            def config(container: DependencyContainer) -> None:
+                container[Alias("name")] = Constant("pyqure")
+            """,
+        )
+        _write(
+            root / "settings.py",
+            f"""
+            from pyqure.container import Alias
+            from pyqure.injectables import Constant
+            from {PACKAGE} import container
+
+            container[Alias("db_url")] = Constant("sqlite://")
+            """,
+        )
+        _write(
+            root / "renamed.py",
+            f"""
+            from pyqure.injection import component as service
+            from {PACKAGE} import container
+
+            @service(container=container, qualifier="renamed")
+            def renamed() -> str:
+                return "renamed"
+            """,
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+        self.container = _container()
+
+        discover(PACKAGE, container=self.container, lazy=True)
+
+        yield
+
+        _container()
+
+    def test_imports_configuration_modules(self) -> None:
+        assert f"{PACKAGE}.configs" in sys.modules
+        assert self.container[Key(None, "name")] == "pyqure"
+
+    def test_imports_modules_registering_otherwise(self) -> None:
+        assert f"{PACKAGE}.settings" in sys.modules
+        assert self.container[Key(None, "db_url")] == "sqlite://"
+
+    def test_imports_modules_with_renamed_decorators(self) -> None:
+        assert f"{PACKAGE}.renamed" in sys.modules
+        assert self.container[Key(str, "renamed")] == "renamed"
+
+    def test_defers_components_import(self) -> None:
+        assert f"{PACKAGE}.adapters" not in sys.modules
+        assert f"{PACKAGE}.functions" not in sys.modules
+
+    def test_imports_on_lookup_by_parent_class(self) -> None:
+        port = importlib.import_module(f"{PACKAGE}.ports").Port
+
+        assert self.container[Class(port)].get() == "adapter"
+        assert f"{PACKAGE}.adapters" in sys.modules
+        assert f"{PACKAGE}.functions" not in sys.modules
+
+    def test_imports_on_lookup_by_qualifier(self) -> None:
+        assert self.container[Key(int, "answer")] == 42
+        assert f"{PACKAGE}.functions" in sys.modules
+
+    def test_unknown_key_is_still_missing(self) -> None:
+        assert Key(str, "unknown") not in self.container
+
+    def test_cannot_use_state_file(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError, match="lazy"):
+            discover(PACKAGE, lazy=True, state_file=tmp_path / ".dependencies.pyq")
+
+
+class TestFilteredDiscover:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+        root = tmp_path / PACKAGE
+        (root / "tests").mkdir(parents=True)
+        (root / "domain" / "models").mkdir(parents=True)
+        _write(
+            root / "__init__.py",
+            """
+            from pyqure.container import DependencyContainer
+
+            container = DependencyContainer()
+            """,
+        )
+        _write(root / "scripts.py", "VALUE = 42\n")
+        _write(root / "tests" / "__init__.py", "")
+        _write(root / "tests" / "test_services.py", "VALUE = 42\n")
+        _write(root / "domain" / "__init__.py", "")
+        _write(
+            root / "domain" / "services.py",
+            f"""
+            from pyqure.injection import component
+            from {PACKAGE} import container
+
+            @component(container=container)
+            class Service: ...
+            """,
+        )
+        _write(root / "domain" / "models" / "__init__.py", "")
+        _write(root / "domain" / "models" / "entities.py", "VALUE = 42\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        self.container = _container()
+
+        yield
+
+        _container()
+
+    def test_reports_import_durations(self) -> None:
+        report = discover(PACKAGE, container=self.container)
+
+        assert sorted(report.durations) == [
+            f"{PACKAGE}.domain",
+            f"{PACKAGE}.domain.models",
+            f"{PACKAGE}.domain.models.entities",
+            f"{PACKAGE}.domain.services",
+            f"{PACKAGE}.scripts",
+            f"{PACKAGE}.tests",
+            f"{PACKAGE}.tests.test_services",
+        ]
+        assert report.total == sum(report.durations.values())
+        assert report.registering == [f"{PACKAGE}.domain.services"]
+        assert [name for name, _ in report.slowest(2)] == [
+            name for name, _ in sorted(report.durations.items(), key=lambda item: -item[1])[:2]
+        ]
+
+    def test_excludes_packages_without_walking_them(self) -> None:
+        report = discover(PACKAGE, container=self.container, exclude=["*.tests", "*.scripts"])
+
+        assert f"{PACKAGE}.tests" not in sys.modules
+        assert f"{PACKAGE}.scripts" not in sys.modules
+        assert f"{PACKAGE}.domain.services" in report.durations
+
+    def test_includes_only_matching_modules(self) -> None:
+        discover(PACKAGE, container=self.container, include=["*.domain.*"])
+
+        assert f"{PACKAGE}.domain.services" in sys.modules
+        assert f"{PACKAGE}.domain.models.entities" in sys.modules
+        assert f"{PACKAGE}.scripts" not in sys.modules
+        assert f"{PACKAGE}.tests.test_services" not in sys.modules
+
+    @pytest.mark.parametrize(
+        ("max_depth", "imported"),
+        [
+            (1, {"domain", "scripts", "tests"}),
+            (
+                2,
+                {
+                    "domain",
+                    "domain.models",
+                    "domain.services",
+                    "scripts",
+                    "tests",
+                    "tests.test_services",
+                },
+            ),
+        ],
+    )
+    def test_limits_depth(self, max_depth: int, imported: set[str]) -> None:
+        report = discover(PACKAGE, container=self.container, max_depth=max_depth)
+
+        assert set(report.durations) == {f"{PACKAGE}.{name}" for name in imported}
+
+    def test_prescreens_modules_not_mentioning_pyqure(self) -> None:
+        report = discover(PACKAGE, container=self.container, prescreen=True)
+
+        assert report.skipped == [
+            f"{PACKAGE}.domain.models.entities",
+            f"{PACKAGE}.scripts",
+            f"{PACKAGE}.tests.test_services",
+        ]
+        assert f"{PACKAGE}.scripts" not in sys.modules
+        assert Class(sys.modules[f"{PACKAGE}.domain.services"].Service) in self.container
+
+    def test_prescreens_lazily(self) -> None:
+        report = discover(PACKAGE, container=self.container, lazy=True, prescreen=True)
+
+        assert f"{PACKAGE}.scripts" in report.skipped
+        assert f"{PACKAGE}.domain.services" not in sys.modules
@@ -0,0 +1,52 @@
+import pytest
+
+from pyqure.exceptions import CircularDependencyError
+from pyqure.graph import DependencyGraph
+
+
+class TestDependencyGraph:
+    @pytest.fixture(autouse=True)
+    def setup(self) -> None:
+        self.graph = DependencyGraph(
+            {"app": ["service", "cache"], "service": ["db", "cache"], "cache": ["db"]}
+        )
+
+    def test_nodes(self) -> None:
+        assert list(self.graph) == ["app", "service", "cache", "db"]
+        assert len(self.graph) == 4
+        assert "db" in self.graph
+
+    def test_dependencies(self) -> None:
+        assert self.graph.dependencies("service") == ("db", "cache")
+        assert self.graph.dependencies("db") == ()
+
+    def test_dependents(self) -> None:
+        assert self.graph.dependents("cache") == ("app", "service")
+        assert self.graph.dependents("app") == ()
+
+    def test_transitive_dependents(self) -> None:
+        assert self.graph.transitive_dependents("db") == ["service", "cache", "app"]
+
+    def test_topological_order(self) -> None:
+        assert self.graph.topological_order() == ["db", "cache", "service", "app"]
+
+    def test_no_cycles(self) -> None:
+        assert self.graph.cycles() == []
+        self.graph.check()
+
+
+class TestDependencyGraphWithCycles:
+    @pytest.fixture(autouse=True)
+    def setup(self) -> None:
+        self.graph = DependencyGraph({"a": ["b"], "b": ["c"], "c": ["a"], "d": ["d"], "e": ["a"]})
+
+    def test_cycles(self) -> None:
+        assert self.graph.cycles() == [["a", "b", "c"], ["d"]]
+
+    def test_topological_order_raises(self) -> None:
+        with pytest.raises(CircularDependencyError, match="a -> b -> c -> a; d -> d"):
+            self.graph.topological_order()
+
+    def test_check_raises(self) -> None:
+        with pytest.raises(CircularDependencyError):
+            self.graph.check()
@@ -1,6 +1,28 @@
+import asyncio
+import gc
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from threading import Barrier, Event, Thread
+from typing import Callable, Iterator
 
-from pyqure.injectables import Constant, Factory, Singleton
+import pytest
+
+from pyqure.exceptions import CircularDependencyError, PoolError, PoolExhaustedError, ScopeError
+from pyqure.injectables import (
+    AsyncFactory,
+    AsyncSingleton,
+    Constant,
+    Factory,
+    LazyProxy,
+    Pooled,
+    Proxied,
+    Scope,
+    Scoped,
+    Singleton,
+    ThreadLocal,
+    is_async,
+)
 
 
 def test_constant() -> None:
@@ -27,3 +49,412 @@ def test_factory() -> None:
     createds = [factory.supply() for _ in range(5)]
 
     assert all(created == value and created is not value for created in createds)
+
+
+def test_singleton_supplying_none_is_built_once() -> None:
+    calls = []
+    singleton = Singleton(lambda: calls.append(1))
+
+    assert singleton.supply() is None
+    assert singleton.supply() is None
+    assert len(calls) == 1
+
+
+def test_singleton_is_built_once_across_threads() -> None:
+    calls = []
+    barrier = Barrier(8)
+
+    def build() -> object:
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    singleton = Singleton(build)
+
+    def supply() -> object:
+        barrier.wait()
+        return singleton.supply()
+
+    with ThreadPoolExecutor(8) as executor:
+        values = list(executor.map(lambda _: supply(), range(8)))
+
+    assert len(calls) == 1
+    assert all(value is values[0] for value in values)
+
+
+def test_singleton_is_rebuilt_after_failure() -> None:
+    attempts: Iterator[Exception | str] = iter([ValueError("boom"), "built"])
+
+    def build() -> str:
+        attempt = next(attempts)
+        if isinstance(attempt, Exception):
+            raise attempt
+        return attempt
+
+    singleton = Singleton(build)
+
+    with pytest.raises(ValueError, match="boom"):
+        singleton.supply()
+
+    assert singleton.supply() == "built"
+
+
+def test_singleton_raises_on_reentrant_construction() -> None:
+    singleton: Singleton[object] = Singleton(lambda: singleton.supply())  # noqa: PLW0108
+
+    with pytest.raises(CircularDependencyError, match="depends on itself"):
+        singleton.supply()
+
+
+def test_singleton_raises_on_construction_deadlock() -> None:
+    started = {"a": Event(), "b": Event()}
+
+    def build_after(name: str, other: str) -> Callable[[], object]:
+        def build() -> object:
+            started[name].set()
+            started[other].wait(timeout=1)
+            return singletons[other].supply()
+
+        return build
+
+    singletons = {"a": Singleton(build_after("a", "b")), "b": Singleton(build_after("b", "a"))}
+
+    with ThreadPoolExecutor(2) as executor:
+        futures = [executor.submit(singleton.supply) for singleton in singletons.values()]
+
+    assert all(isinstance(future.exception(), CircularDependencyError) for future in futures)
+
+
+def test_async_singleton_is_built_once_across_tasks() -> None:
+    calls = []
+
+    async def build() -> object:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return object()
+
+    singleton = AsyncSingleton(build)
+
+    async def run() -> list[object]:
+        return await asyncio.gather(*(singleton.supply() for _ in range(10)))
+
+    values = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(value is values[0] for value in values)
+    assert asyncio.run(singleton.supply()) is values[0]
+
+
+def test_async_singleton_is_rebuilt_after_failure() -> None:
+    attempts: Iterator[Exception | str] = iter([ValueError("boom"), "built"])
+
+    async def build() -> str:
+        attempt = next(attempts)
+        if isinstance(attempt, Exception):
+            raise attempt
+        return attempt
+
+    singleton = AsyncSingleton(build)
+
+    with pytest.raises(ValueError, match="boom"):
+        asyncio.run(singleton.supply())
+
+    assert asyncio.run(singleton.supply()) == "built"
+
+
+def test_async_singleton_raises_on_reentrant_construction() -> None:
+    async def build() -> object:
+        return await singleton.supply()
+
+    singleton: AsyncSingleton[object] = AsyncSingleton(build)
+
+    with pytest.raises(CircularDependencyError, match="depends on itself"):
+        asyncio.run(singleton.supply())
+
+
+def test_async_factory() -> None:
+    async def build() -> Path:
+        return Path(".factory")
+
+    factory = AsyncFactory(build)
+
+    async def run() -> list[Path]:
+        return await asyncio.gather(*(factory.supply() for _ in range(5)))
+
+    createds = asyncio.run(run())
+
+    assert all(created == Path(".factory") for created in createds)
+    assert len({id(created) for created in createds}) == len(createds)
+
+
+def test_is_async() -> None:
+    async def build() -> int:
+        return 42
+
+    assert is_async(AsyncSingleton(build))
+    assert is_async(AsyncFactory(build))
+    assert not is_async(Singleton(lambda: 42))
+    assert not is_async(Constant(42))
+
+
+class Resource:
+    def __init__(self, name: str = "resource", closed: list[str] | None = None) -> None:
+        self.name = name
+        self.closed = [] if closed is None else closed
+
+    def close(self) -> None:
+        self.closed.append(self.name)
+
+
+def test_scoped_is_built_once_by_scope() -> None:
+    scoped = Scoped(Resource)
+
+    with Scope():
+        value = scoped.supply()
+        assert scoped.supply() is value
+        with Scope():
+            assert scoped.supply() is not value
+        assert scoped.supply() is value
+
+
+def test_scoped_raises_outside_of_scope() -> None:
+    with pytest.raises(ScopeError, match="outside of a scope"):
+        Scoped(Resource).supply()
+
+
+def test_scoped_are_disposed_in_reverse_order() -> None:
+    closed: list[str] = []
+    first = Scoped(lambda: Resource("first", closed))
+    second = Scoped(lambda: Resource("second", closed))
+    disposed = Scoped(lambda: Resource("disposed"), dispose=lambda value: closed.append("custom"))
+
+    with Scope():
+        first.supply()
+        disposed.supply()
+        second.supply()
+        assert closed == []
+
+    assert closed == ["second", "custom", "first"]
+
+
+def test_scoped_is_shared_across_threads_and_tasks() -> None:
+    scoped = Scoped(Resource)
+
+    async def run() -> None:
+        async with Scope():
+            values = await asyncio.gather(
+                asyncio.to_thread(scoped.supply),
+                asyncio.create_task(asyncio.to_thread(scoped.supply)),
+            )
+            assert values[0] is values[1] is scoped.supply()
+
+    asyncio.run(run())
+
+
+def test_scoped_is_isolated_across_concurrent_scopes() -> None:
+    scoped = Scoped(Resource)
+
+    async def request() -> Resource:
+        async with Scope():
+            value = scoped.supply()
+            await asyncio.sleep(0)
+            assert scoped.supply() is value
+            return value
+
+    async def run() -> tuple[Resource, Resource]:
+        return await asyncio.gather(request(), request())
+
+    first, second = asyncio.run(run())
+
+    assert first is not second
+
+
+def test_scope_awaits_asynchronous_disposal() -> None:
+    closed: list[str] = []
+
+    class AsyncResource:
+        async def aclose(self) -> None:
+            closed.append("aclose")
+
+    scoped = Scoped(AsyncResource)
+
+    async def run() -> None:
+        async with Scope():
+            scoped.supply()
+
+    asyncio.run(run())
+
+    assert closed == ["aclose"]
+
+
+def test_scoped_raises_on_reentrant_construction() -> None:
+    scoped: Scoped[object] = Scoped(lambda: scoped.supply())  # noqa: PLW0108
+
+    with Scope(), pytest.raises(CircularDependencyError, match="depends on itself"):
+        scoped.supply()
+
+
+def test_pooled_reuses_released_instances() -> None:
+    pooled = Pooled(Resource, max_size=2)
+
+    first, second = pooled.supply(), pooled.supply()
+    pooled.release(first)
+
+    assert first is not second
+    assert pooled.supply() is first
+    stats = pooled.stats()
+    assert (stats.size, stats.in_use, stats.checkouts, stats.misses) == (2, 2, 3, 2)
+    assert stats.utilization == 1.0
+
+
+def test_pooled_waits_for_a_released_instance() -> None:
+    pooled = Pooled(Resource, max_size=1)
+    value = pooled.supply()
+
+    with ThreadPoolExecutor() as executor:
+        checkout = executor.submit(pooled.supply)
+        time.sleep(0.05)
+        assert not checkout.done()
+        pooled.release(value)
+        assert checkout.result(timeout=1) is value
+
+    stats = pooled.stats()
+    assert stats.waits == 1
+    assert stats.wait_time > 0
+
+
+def test_pooled_raises_when_exhausted_until_timeout() -> None:
+    pooled = Pooled(Resource, max_size=1, timeout=0.01)
+    pooled.supply()
+
+    with pytest.raises(PoolExhaustedError, match="No instance of Pooled"):
+        pooled.supply()
+
+
+def test_pooled_disposes_invalid_and_idle_instances() -> None:
+    closed: list[str] = []
+    names = iter(["first", "second", "third"])
+    pooled = Pooled(
+        lambda: Resource(next(names), closed),
+        validate=lambda value: value.name != "first",
+        max_idle=0.01,
+    )
+
+    pooled.release(pooled.supply())
+    second = pooled.supply()
+    pooled.release(second)
+    time.sleep(0.02)
+    third = pooled.supply()
+
+    assert second.name == "second"
+    assert third.name == "third"
+    assert closed == ["first", "second"]
+    stats = pooled.stats()
+    assert (stats.size, stats.checkouts, stats.invalidations, stats.evictions) == (1, 3, 1, 1)
+
+
+def test_pooled_frees_its_place_when_the_construction_fails() -> None:
+    def fail() -> Resource:
+        raise ValueError("failure")
+
+    pooled = Pooled(fail, max_size=1, timeout=0.01)
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match="failure"):
+            pooled.supply()
+    assert pooled.stats().size == 0
+
+
+def test_pooled_close_disposes_idle_instances() -> None:
+    closed: list[str] = []
+    pooled = Pooled(lambda: Resource("pooled", closed))
+    value = pooled.supply()
+    pooled.release(value)
+
+    pooled.close()
+
+    assert closed == ["pooled"]
+    assert pooled.stats().size == 0
+
+
+def test_pooled_raises_on_release_of_instance_not_checked_out() -> None:
+    pooled = Pooled(Resource, max_size=1)
+    value = pooled.supply()
+    pooled.release(value)
+
+    with pytest.raises(PoolError, match="is not checked out"):
+        pooled.release(value)
+    with pytest.raises(PoolError, match="is not checked out"):
+        pooled.release(Resource())
+    assert pooled.stats().idle == 1
+
+
+def test_thread_local_is_built_once_by_thread() -> None:
+    thread_local = ThreadLocal(Resource)
+    value = thread_local.supply()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        others = list(executor.map(lambda _: thread_local.supply(), range(10)))
+
+    assert thread_local.supply() is value
+    assert value not in others
+    assert len({id(other) for other in others}) <= 2
+
+
+def test_thread_local_is_disposed_when_the_thread_ends() -> None:
+    closed: list[str] = []
+    thread_local = ThreadLocal(lambda: Resource("local", closed))
+
+    thread = Thread(target=thread_local.supply)
+    thread.start()
+    thread.join()
+    gc.collect()
+
+    assert closed == ["local"]
+
+
+def test_thread_local_raises_on_reentrant_construction() -> None:
+    thread_local: ThreadLocal[object] = ThreadLocal(lambda: thread_local.supply())  # noqa: PLW0108
+
+    with pytest.raises(CircularDependencyError, match="depends on itself"):
+        thread_local.supply()
+    with pytest.raises(CircularDependencyError, match="depends on itself"):
+        thread_local.supply()
+
+
+def test_proxied_supplies_on_first_use() -> None:
+    built: list[list[int]] = []
+
+    def build() -> list[int]:
+        built.append([1, 2])
+        return built[-1]
+
+    proxy = Proxied(Factory(build)).supply()
+    assert not built
+    assert repr(proxy) == f"LazyProxy({Factory(build)!r})"
+
+    assert len(proxy) == 2
+    assert isinstance(proxy, list)
+    assert proxy == [1, 2]
+    assert proxy[0] == 1
+    assert 2 in proxy
+    assert list(proxy) == [1, 2]
+    proxy.append(3)
+    assert built == [[1, 2, 3]]
+    assert repr(proxy) == "[1, 2, 3]"
+
+
+def test_lazy_proxy_forwards_attributes_and_calls() -> None:
+    class Service:
+        def __init__(self) -> None:
+            self.value = 1
+
+        def __call__(self, increment: int) -> int:
+            return self.value + increment
+
+    proxy = LazyProxy(Singleton(Service))
+    proxy.value = 2
+
+    assert proxy.value == 2
+    assert proxy(1) == 3
+    assert type(proxy) is LazyProxy
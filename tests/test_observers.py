@@ -0,0 +1,187 @@
+import asyncio
+from typing import Any, Callable
+
+import pytest
+
+from pyqure.container import Alias, Class, DependencyContainer, Key
+from pyqure.injectables import Constant, Factory, Injectable
+from pyqure.injection import component, inject
+from pyqure.observers import Histogram, HistogramObserver, LookupPath, SampledObserver
+
+
+class RecordingObserver:
+    def __init__(self) -> None:
+        self.lookups: list[tuple[Key[Any], LookupPath]] = []
+        self.supplies: list[tuple[Injectable[Any], BaseException | None]] = []
+        self.injections: list[Callable[..., Any]] = []
+
+    def on_lookup(self, key: Key[Any], path: LookupPath) -> None:
+        self.lookups.append((key, path))
+
+    def on_supply(
+        self, injectable: Injectable[Any], duration: float, error: BaseException | None
+    ) -> None:
+        assert duration >= 0
+        self.supplies.append((injectable, error))
+
+    def on_inject(self, service: Callable[..., Any], duration: float) -> None:
+        assert duration >= 0
+        self.injections.append(service)
+
+
+class TestObservers:
+    @pytest.fixture(autouse=True)
+    def setup(self) -> None:
+        self.observer = RecordingObserver()
+        self.container = DependencyContainer(observer=self.observer)
+
+    def test_lookup_paths(self) -> None:
+        self.container.register(Key(int, "a"), Constant(1), primary=True)
+        child = self.container.child()
+
+        self.container.lookup(Key(int, "a"))
+        self.container.lookup(Key(int, "other"))
+        self.container.lookup(Key(str, "missing"))
+        with self.container.override(Key(int, "a"), Constant(2)):
+            self.container.lookup(Key(int, "a"))
+        child.lookup(Key(int, "a"))
+
+        assert [path for _, path in self.observer.lookups] == [
+            "registered",
+            "primary",
+            "miss",
+            "override",
+            "parent",
+        ]
+
+    def test_child_lookup_is_notified_once(self) -> None:
+        observer = HistogramObserver()
+        self.container.observe(observer)
+        self.container.register(Key(int, "a"), Constant(1), primary=True)
+        child = self.container.child()
+
+        child.lookup(Key(int, "a"))
+        child.lookup(Key(int, "other"))
+        child.lookup(Key(str, "missing"))
+
+        assert observer.lookups == {"parent": 1, "primary": 1, "miss": 1}
+
+    def test_lookup_paths_when_frozen(self) -> None:
+        self.container.register(Key(int, "a"), Constant(1), primary=True).freeze()
+
+        self.container.lookup(Key(int, "a"))
+        self.container.lookup(Key(int, "other"))
+        self.container.lookup(Key(str, "missing"))
+
+        assert [path for _, path in self.observer.lookups] == ["registered", "primary", "miss"]
+
+    def test_supply(self) -> None:
+        def fail() -> int:
+            raise ValueError("failed")
+
+        failing = Factory(fail)
+        self.container[Key(int, "a")] = Constant(1)
+        self.container[Key(int, "b")] = failing
+
+        assert self.container[Key(int, "a")] == 1
+        with pytest.raises(ValueError, match="failed"):
+            self.container[Key(int, "b")]
+
+        assert self.observer.supplies[0] == (Constant(1), None)
+        assert self.observer.supplies[1][0] is failing
+        assert isinstance(self.observer.supplies[1][1], ValueError)
+
+    def test_inject(self) -> None:
+        self.container[Alias("a")] = Constant(1)
+
+        @inject(container=self.container)
+        def service(a: int) -> int:
+            return a
+
+        assert service() == 1
+        assert service(2) == 2
+
+        assert self.observer.injections == [service.__wrapped__]  # type: ignore[attr-defined]
+        assert self.observer.supplies == [(Constant(1), None)]
+
+    def test_inject_coroutine_function(self) -> None:
+        @component(container=self.container, qualifier="a")
+        async def a() -> int:
+            return 1
+
+        @inject(container=self.container)
+        async def service(a: int) -> int:
+            return a
+
+        assert asyncio.run(service()) == 1
+
+        assert len(self.observer.injections) == 1
+        assert len(self.observer.supplies) == 1
+
+    def test_no_observer(self) -> None:
+        self.container.observe(None)
+        self.container[Key(int, "a")] = Constant(1)
+
+        assert self.container[Key(int, "a")] == 1
+        assert self.observer.lookups == []
+
+
+def test_histogram() -> None:
+    histogram = Histogram()
+    for duration in [0.5e-6, 3e-6, 3e-6, 100e-6]:
+        histogram.add(duration)
+
+    assert histogram.count == 4
+    assert histogram.max == 100e-6
+    assert histogram.mean == pytest.approx(106.5e-6 / 4)
+    assert histogram.quantile(0.25) == 1e-6
+    assert histogram.quantile(0.75) == 4e-6
+    assert histogram.quantile(1) == 100e-6
+
+
+def test_histogram_observer() -> None:
+    observer = HistogramObserver()
+    container = DependencyContainer(observer=observer)
+
+    @component(container=container)
+    class Service: ...
+
+    container[Class(Service)]
+    container[Class(Service)]
+    container.lookup(Class(int))
+
+    assert observer.lookups == {"registered": 2, "miss": 1}
+    assert observer.supplies[Service.__qualname__].count == 2
+
+
+def test_sampled_observer() -> None:
+    observer = RecordingObserver()
+    samples = iter([0.5, 0.05, 0.5, 0.05])
+    sampled = SampledObserver(observer, rate=0.1, sample=lambda: next(samples))
+
+    assert [sampled.sampled() for _ in range(4)] == [False, True, False, True]
+
+    sampled.on_lookup(Class(int), "miss")
+    assert observer.lookups == [(Class(int), "miss")]
+
+
+def test_sampled_observer_drops_events_before_measuring_them() -> None:
+    observer = RecordingObserver()
+    draws: list[float] = []
+
+    def sample() -> float:
+        draws.append(0.5)
+        return 0.5
+
+    container = DependencyContainer(observer=SampledObserver(observer, rate=0.1, sample=sample))
+    container[Alias("a")] = Factory(lambda: 1)
+
+    @inject(container=container)
+    def run(a: int) -> int:
+        return a
+
+    assert run() == 1
+    assert container[Alias("a")] == 1
+    # one draw by look up, by supply of the container, and by injection with its supplies.
+    assert len(draws) == 4
+    assert (observer.lookups, observer.supplies, observer.injections) == ([], [], [])
@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pytest
+
+from pyqure.container import DependencyContainer, Key
+from pyqure.exceptions import MissingDependencies
+from pyqure.injectables import Constant
+from pyqure.plan import DeferredPlan, InjectionPlan
+from pyqure.utils.function import Parameters
+
+
+def _plan(func: Any, container: DependencyContainer) -> InjectionPlan[Any]:
+    return InjectionPlan(func, Parameters(func), container)
+
+
+class TestInjectionPlan:
+    @pytest.fixture(autouse=True)
+    def setup(self) -> None:
+        self.container = DependencyContainer()
+
+    @pytest.mark.parametrize(
+        ("args", "kwargs", "expected"),
+        [
+            ((1, 2), {}, True),
+            ((1,), {"b": 2}, True),
+            ((1,), {"b": 2, "c": 3}, True),
+            ((), {"b": 2}, False),
+            ((1,), {}, False),
+            ((1, 2, 3), {}, False),
+            ((1,), {"a": 1, "b": 2}, False),
+            ((1, 2), {"d": 4}, False),
+        ],
+    )
+    def test_binds(self, args: tuple[Any, ...], kwargs: dict[str, Any], expected: bool) -> None:
+        def foo(a, /, b, *, c=3): ...  # type: ignore[no-untyped-def]
+
+        assert _plan(foo, self.container).binds(args, kwargs) is expected
+
+    def test_binds_with_var_parameters(self) -> None:
+        def foo(a, *args, **kwargs): ...  # type: ignore[no-untyped-def]
+
+        plan = _plan(foo, self.container)
+
+        assert plan.binds((1, 2, 3), {"d": 4})
+        assert not plan.binds((), {"d": 4})
+
+    def test_resolve_injects_missing_parameters(self) -> None:
+        def foo(a: int, /, b: str, *, c: bool = True) -> None: ...
+
+        self.container[Key(int, "a")] = Constant(1)
+        self.container[Key(str, "b")] = Constant("b")
+
+        assert _plan(foo, self.container).resolve((), {"c": False}) == ([1, "b"], {"c": False})
+
+    def test_resolve_raises_on_missing(self) -> None:
+        def foo(a: int, b: str) -> None: ...
+
+        with pytest.raises(MissingDependencies, match=r"parameters: a, b\."):
+            _plan(foo, self.container).resolve((), {})
+
+    def test_bindings_recompiled_when_container_changes(self) -> None:
+        def foo(a: int) -> None: ...
+
+        plan = _plan(foo, self.container)
+        assert plan.bindings() == (None,)
+        assert plan.bindings() is plan.bindings()
+
+        self.container[Key(int, "a")] = Constant(1)
+
+        assert plan.bindings() == (Constant(1),)
+
+        with self.container.override(Key(int, "a"), Constant(2)):
+            assert plan.bindings() == (Constant(2),)
+
+        assert plan.bindings() == (Constant(1),)
+
+
+class TestDeferredPlan:
+    def test_compiled_once_on_first_use(self) -> None:
+        def foo(a: int) -> None: ...
+
+        deferred = DeferredPlan(foo, DependencyContainer(), retains=True)
+        assert deferred.plan is None
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            plans = list(executor.map(lambda _: deferred.get(), range(32)))
+
+        assert deferred.plan is not None
+        assert deferred.plan.retains
+        assert all(plan is deferred.plan for plan in plans)
+        assert deferred.bindings() == (None,)
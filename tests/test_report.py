@@ -0,0 +1,92 @@
+import json
+from typing import Any
+
+import pytest
+
+from pyqure.container import Alias, Class, DependencyContainer, Key
+from pyqure.exceptions import DependencyError
+from pyqure.graph import DependencyGraph
+from pyqure.injection import component
+from pyqure.report import StartupReport, startup_report
+
+A: Key[Any] = Alias("a")
+B: Key[Any] = Alias("b")
+C: Key[Any] = Alias("c")
+D: Key[Any] = Alias("d")
+
+
+class TestStartupReport:
+    @pytest.fixture(autouse=True)
+    def setup(self) -> None:
+        # d depends on b and c, both depending on a.
+        graph: DependencyGraph[Key[Any]] = DependencyGraph({A: [], B: [A], C: [A], D: [B, C]})
+        self.report = StartupReport(graph, {A: 1.0, B: 3.0, C: 2.0, D: 0.5})
+
+    def test_durations(self) -> None:
+        assert self.report.exclusive(D) == 0.5
+        assert self.report.inclusive(D) == 6.5
+        assert self.report.inclusive(B) == 4.0
+        assert self.report.exclusive(Alias("unknown")) == 0.0
+
+    def test_fan_in(self) -> None:
+        assert self.report.fan_in(A) == 2
+        assert self.report.fan_in(D) == 0
+
+    def test_critical_path(self) -> None:
+        assert self.report.critical_path() == [A, B, D]
+        assert self.report.critical_duration() == 4.5
+
+    def test_to_json(self) -> None:
+        report = json.loads(self.report.to_json())
+
+        assert report["critical_path"] == ["@a", "@b", "@d"]
+        assert report["critical_duration"] == 4.5
+        assert report["components"][0] == {
+            "key": "@d",
+            "exclusive": 0.5,
+            "inclusive": 6.5,
+            "fan_in": 0,
+            "dependencies": ["@b", "@c"],
+        }
+
+    def test_to_dot(self) -> None:
+        dot = self.report.to_dot()
+
+        assert dot.startswith("digraph startup {")
+        assert '"@d" -> "@b" [color="red"];' in dot
+        assert '"@d" -> "@c";' in dot
+        assert '"@a" [label="@a\\n1000.000 ms / 1000.000 ms", color="red"];' in dot
+
+
+def test_startup_report_warms_up_the_container() -> None:
+    container = DependencyContainer()
+
+    @component(container=container)
+    class Repository: ...
+
+    @component(container=container, qualifier="main")
+    class Service:
+        def __init__(self, repository: Repository) -> None:
+            self.repository = repository
+
+    report = startup_report(container)
+
+    assert report.critical_path() == [Class(Repository), Key(Service, "main")]
+    assert report.fan_in(Class(Repository)) == 1
+    assert report.to_dict()["critical_path"] == [
+        "Repository",
+        "Service@main",
+    ]
+
+
+def test_startup_report_raises_when_already_warm() -> None:
+    container = DependencyContainer()
+
+    @component(container=container)
+    class Repository: ...
+
+    durations = container.warmup()
+
+    with pytest.raises(DependencyError, match="already built: Repository"):
+        startup_report(container)
+    assert startup_report(container, durations).critical_path() == [Class(Repository)]
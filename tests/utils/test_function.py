@@ -1,6 +1,6 @@
 from typing import Annotated
 
-from pyqure.injectables import Qualifier, qualifier
+from pyqure.injectables import Lazy, Provider, Qualifier, qualifier
 from pyqure.utils.function import AnyType, NoDefault, Param, Parameters
 
 
@@ -91,3 +91,13 @@ class TestParameters:
             "b": Param(AnyType, False, "b", NoDefault, None),
             "d": Param(AnyType, False, "d", "bar", None),
         }
+
+    def test_get_function_parameters_lazy_and_provider(self) -> None:
+        def foo(a: Lazy[int], b: Annotated[Provider[str], qualifier("b")]) -> None: ...
+
+        params = Parameters(foo)
+
+        assert params.value == {
+            "a": Param(int, False, "a", NoDefault, None, lazy=True),
+            "b": Param(str, False, "b", NoDefault, Qualifier("b"), provider=True),
+        }
@@ -5,14 +5,17 @@ from typing import Annotated, Any, Optional, Union
 
 import pytest
 
-from pyqure.injectables import Qualifier, qualifier
+from pyqure.injectables import Lazy, Provider, Qualifier, qualifier
 from pyqure.utils.types import (
+    collection_item,
     extract_type_info,
     filter_mro,
     has_parameter_type,
     is_annotated,
     is_interface,
+    is_lazy,
     is_optional,
+    is_provider,
     is_union,
     unpack_types,
 )
@@ -34,6 +37,46 @@ def test_unpack_types(t: type, expected: tuple[type, ...]) -> None:
     assert unpack_types(t) == expected
 
 
+@pytest.mark.parametrize(
+    ("type_", "expected"),
+    [
+        (list[ABCService], (ABCService, False)),
+        (dict[str, ABCService], (ABCService, True)),
+        (dict[int, ABCService], None),
+        (list, None),
+        (ABCService, None),
+    ],
+)
+def test_collection_item(type_: type, expected: tuple[type, bool] | None) -> None:
+    assert collection_item(type_) == expected
+
+
+@pytest.mark.parametrize(
+    ("type_", "expected"),
+    [
+        (Lazy[str], True),
+        (Annotated[Lazy[str], qualifier("name")], True),
+        (Annotated[str, qualifier("name")], False),
+        (str, False),
+    ],
+)
+def test_is_lazy(type_: type, expected: bool) -> None:
+    assert is_lazy(type_) is expected
+
+
+@pytest.mark.parametrize(
+    ("type_", "expected"),
+    [
+        (Provider[str], True),  # type: ignore[misc]
+        (Annotated[Provider[str], qualifier("name")], True),  # type: ignore[misc]
+        (Lazy[str], False),
+        (str, False),
+    ],
+)
+def test_is_provider(type_: type, expected: bool) -> None:
+    assert is_provider(type_) is expected
+
+
 @pytest.mark.parametrize(
     ("type_", "expected"),
     [(ABCService, True), (ConcreteService, False), (HasA, True), (HasAAndB, False)],